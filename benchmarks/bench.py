@@ -0,0 +1,180 @@
+"""Benchmark suite for the simulation and analysis hot paths.
+
+Usage (from the repository root):
+
+    PYTHONPATH=. python benchmarks/bench.py run --out results.json [--max-size 1e7] [--filter run_clocks]
+    PYTHONPATH=. python benchmarks/bench.py compare benchmarks/baseline.json results.json [--threshold 0.25]
+
+`run` times every case (best of several repeats), then measures peak traced
+memory in one extra run under tracemalloc. `compare` flags cases whose time
+or peak memory grew by more than the threshold and exits non-zero if any did.
+"""
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterator, Tuple
+
+import numpy as np
+
+from src import analysis
+from src.clocks.flicker_like import FlickerLikeFreqClock
+from src.clocks.ideal import IdealClock
+from src.clocks.noisy import NoisyOscillatorClock
+from src.clocks.random_walk import RandomWalkFreqClock
+
+SIZES = (10**3, 10**4, 10**5, 10**6, 10**7)
+CLOCK_COUNTS = (1, 8)
+# Skip cases whose traces would exceed this many float64 samples (~0.8 GB).
+MAX_ELEMENTS = 10**8
+
+MODELS = {
+    "IdealClock": lambda seed: IdealClock(),
+    "NoisyOscillatorClock": lambda seed: NoisyOscillatorClock(sigma_y=1e-11, seed=seed),
+    "RandomWalkFreqClock": lambda seed: RandomWalkFreqClock(sigma_rw=2e-14, seed=seed),
+    "FlickerLikeFreqClock": lambda seed: FlickerLikeFreqClock(sigma_w=5e-12, a=1e-3, seed=seed),
+}
+
+# A case: (name, size, steps, samples, setup) where setup() returns the callable to time.
+Case = Tuple[str, int, int, int, Callable[[], Callable[[], object]]]
+
+
+def _run_data(n: int, n_clocks: int = 3) -> Dict[str, np.ndarray]:
+    clocks = [IdealClock()] + [MODELS["NoisyOscillatorClock"](seed) for seed in range(1, n_clocks + 1)]
+    return analysis.run_clocks(clocks, duration=float(n - 1), dt=1.0)
+
+
+def iter_cases(max_size: int) -> Iterator[Case]:
+    for n in (s for s in SIZES if s <= max_size):
+        for model, make in MODELS.items():
+            for n_clocks in CLOCK_COUNTS:
+                if n * n_clocks > MAX_ELEMENTS:
+                    continue
+
+                def setup(make=make, n=n, n_clocks=n_clocks):
+                    return lambda: analysis.run_clocks([make(s) for s in range(n_clocks)], float(n - 1), 1.0)
+
+                yield f"run_clocks[{model}x{n_clocks}]", n, n * n_clocks, n * n_clocks, setup
+
+        def setup_compare(n=n):
+            ts = _run_data(n, 1)
+            return lambda: analysis.compare_clocks(ts["time"], ts["clock_0"], ts["clock_1"])
+
+        def setup_frac(n=n):
+            ts = _run_data(n, 1)
+            return lambda: analysis.fractional_frequency_from_time(ts["time"], ts["clock_1"], dt=1.0)
+
+        def setup_consensus(n=n, method="inv_var_frac"):
+            ts = _run_data(n, 3)
+            keys = ["clock_1", "clock_2", "clock_3"]
+            return lambda: analysis.consensus_weighted_average(ts, keys, method=method, tau=10.0)
+
+        def setup_adev(n=n):
+            y = np.random.default_rng(0).normal(0.0, 1e-11, n)
+            return lambda: analysis.adev_overlapping_allantools(y, dt=1.0)
+
+        yield "compare_clocks", n, 0, n, setup_compare
+        yield "fractional_frequency_from_time", n, 0, n, setup_frac
+        yield "consensus[inv_var_frac]", n, 0, 3 * n, setup_consensus
+        yield "consensus[inv_oadev_tau]", n, 0, 3 * n, lambda n=n: setup_consensus(n, "inv_oadev_tau")
+        yield "adev_overlapping_allantools", n, 0, n, setup_adev
+
+
+def measure(setup: Callable[[], Callable[[], object]], size: int) -> Tuple[float, int]:
+    """Best-of wall time [s] and peak traced memory [bytes] of one case."""
+    repeats = 5 if size <= 10**4 else (3 if size <= 10**6 else 1)
+    fn = setup()
+    best = float("inf")
+    for _ in range(repeats):
+        gc.collect()
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return best, peak
+
+
+def run(args: argparse.Namespace) -> int:
+    results = {}
+    for name, size, steps, samples, setup in iter_cases(int(float(args.max_size))):
+        if args.filter and args.filter not in name:
+            continue
+        try:
+            seconds, peak = measure(setup, size)
+        except ImportError as exc:  # optional dependency missing (e.g. allantools)
+            print(f"skip {name} n={size}: {exc}")
+            continue
+        key = f"{name}@{size}"
+        results[key] = {
+            "size": size,
+            "seconds": seconds,
+            "steps_per_s": steps / seconds if steps else None,
+            "samples_per_s": samples / seconds,
+            "peak_bytes": peak,
+        }
+        print(f"{key:55s} {seconds:10.4f} s  {samples / seconds:12.3e} samples/s  {peak / 2**20:9.1f} MiB")
+    meta = {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+    }
+    with open(args.out, "w", encoding="utf-8") as fh:
+        json.dump({"meta": meta, "results": results}, fh, indent=2, sort_keys=True)
+    print(f"wrote {len(results)} results to {args.out}")
+    return 0
+
+
+def compare(args: argparse.Namespace) -> int:
+    with open(args.baseline, encoding="utf-8") as fh:
+        base = json.load(fh)["results"]
+    with open(args.current, encoding="utf-8") as fh:
+        cur = json.load(fh)["results"]
+    limit = 1.0 + float(args.threshold)
+    regressions = 0
+    print(f"{'case':55s} {'time x':>8s} {'mem x':>8s}")
+    for key in sorted(set(base) & set(cur)):
+        t_ratio = cur[key]["seconds"] / base[key]["seconds"]
+        m_ratio = cur[key]["peak_bytes"] / max(base[key]["peak_bytes"], 1)
+        flag = ""
+        if t_ratio > limit or m_ratio > limit:
+            regressions += 1
+            flag = "  REGRESSION"
+        print(f"{key:55s} {t_ratio:8.2f} {m_ratio:8.2f}{flag}")
+    missing = sorted(set(base) - set(cur))
+    if missing:
+        print(f"{len(missing)} baseline cases not in current results")
+    print(f"{regressions} regression(s) beyond +{float(args.threshold):.0%}")
+    return 1 if regressions else 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_run = sub.add_parser("run", help="run the benchmark suite")
+    p_run.add_argument("--out", default="bench_results.json")
+    p_run.add_argument("--max-size", default="1e7", help="largest sample count (default 1e7)")
+    p_run.add_argument("--filter", default="", help="only cases whose name contains this string")
+    p_cmp = sub.add_parser("compare", help="compare results against a baseline")
+    p_cmp.add_argument("baseline")
+    p_cmp.add_argument("current")
+    p_cmp.add_argument("--threshold", default=0.25, help="allowed relative slowdown (default 0.25)")
+    args = parser.parse_args(argv)
+    return run(args) if args.command == "run" else compare(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
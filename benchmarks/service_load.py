@@ -0,0 +1,50 @@
+"""Load test for the asyncio clock service (src/service.py).
+
+Usage (from the repository root):
+
+    PYTHONPATH=. python benchmarks/service_load.py [--clients 1,10,100,1000,10000]
+        [--total-reads 200000] [--rate 5000] [--client-processes 4] [--out service_load.json]
+
+Serves an IdealClock and three noisy clocks from a separate process and
+reports p50/p99 read latency and reads/s per client count. Without --rate
+clients read back to back (throughput); with --rate the total load is fixed
+and spread over the clients (latency vs. client count).
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+
+from src.clocks.ideal import IdealClock
+from src.clocks.noisy import NoisyOscillatorClock
+from src.service import run_load_test
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", default="1,10,100,1000,10000", help="comma-separated client counts")
+    parser.add_argument("--total-reads", type=int, default=200_000, help="reads per client count (>= 10 per client)")
+    parser.add_argument("--rate", type=float, default=None, help="fixed total reads/s (default: back to back)")
+    parser.add_argument("--client-processes", type=int, default=1)
+    parser.add_argument("--dt", type=float, default=1e-3, help="clock step [s]")
+    parser.add_argument("--out", default="", help="also write the rows as JSON")
+    args = parser.parse_args(argv)
+
+    clocks = [IdealClock()] + [NoisyOscillatorClock(sigma_y=1e-11, seed=seed) for seed in (1, 2, 3)]
+    clients = [int(c) for c in args.clients.split(",") if c]
+    rows = run_load_test(
+        clocks, clients, total_reads=args.total_reads, rate=args.rate,
+        client_processes=args.client_processes, dt=args.dt,
+    )
+    print(f"{'clients':>8s} {'reads':>8s} {'p50 us':>10s} {'p99 us':>10s} {'max us':>10s} {'reads/s':>10s}")
+    for r in rows:
+        print(f"{r['clients']:8d} {r['reads']:8d} {r['p50_us']:10.1f} {r['p99_us']:10.1f} {r['max_us']:10.1f} {r['reads_per_s']:10.0f}")
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as fh:
+            json.dump(rows, fh, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
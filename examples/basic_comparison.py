@@ -3,7 +3,7 @@ from __future__ import annotations
 from src.clocks.ideal import IdealClock
 from src.clocks.noisy import NoisyOscillatorClock
 from src.analysis import run_clocks, compare_clocks, plot_comparison
-from src.core import Comparison
+from src.core import BufferComparison
 
 
 def main() -> None:
@@ -19,8 +19,7 @@ def main() -> None:
     for k, v in metrics.items():
         print(f"{k}: {v:.6e}")
 
-    cmp_obj = Comparison("Ideal", "Noisy", ts["time"].tolist(),
-                         ts["clock_0"].tolist(), ts["clock_1"].tolist())
+    cmp_obj = BufferComparison("Ideal", "Noisy", ts["time"], ts["clock_0"], ts["clock_1"])
     assert metrics == cmp_obj.measure()  # same numbers via delegation
 
     # Plot (optional; safe to comment in headless CI)
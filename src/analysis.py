@@ -1,48 +1,399 @@
 """Analysis utilities (pure functions): run and compare clocks."""
 from __future__ import annotations
-from typing import List, Dict
+from collections.abc import Mapping
+from typing import Dict, Iterable, Iterator, List, Optional
+import time as _time
 import numpy as np
 from .core import Clock
+from .instrument import active_report, timed
+from .offsets import REPRESENTATIONS, OffsetIntegrator, OffsetTrace, time_error
+from .series import TimeSeries, grid_denominator
+from .stability import oadev
 
 
-def run_clocks(clocks: List[Clock], duration: float, dt: float) -> Dict[str, np.ndarray]:
+# Default samples per chunk in iter_run_clocks (and hence per advance() call
+# in run_clocks); bounds the temporary noise buffers.
+_BLOCK_STEPS = 1 << 16
+
+
+def _trace_shape(clock, n_samples: int):
+    """(n_samples,) for a Clock, (M, n_samples) for a batched ClockEnsemble."""
+    n_members = getattr(clock, "n_members", None)
+    return (n_samples,) if n_members is None else (int(n_members), n_samples)
+
+
+def _block_steps(clocks, steps: int = _BLOCK_STEPS) -> int:
+    """steps divided by the largest ClockEnsemble's member count (at least 1)."""
+    members = max((int(getattr(c, "n_members", None) or 1) for c in clocks), default=1)
+    return max(1, steps // members)
+
+
+def _n_steps(duration: float, dt: float) -> int:
+    if not (0 < dt < np.inf and 0 < duration < np.inf):
+        raise ValueError("duration and dt must be finite and > 0")
+    return int(round(duration / dt))
+
+
+def _time_slice(k0: int, k1: int, n_steps: int, dt: float) -> np.ndarray:
+    """Samples k0..k1-1 of np.linspace(0, n_steps * dt, n_steps + 1), bit-exact."""
+    stop = n_steps * dt
+    t = np.arange(k0, k1, dtype=float) * (stop / n_steps)
+    if k1 == n_steps + 1:
+        t[-1] = stop
+    return t
+
+
+def _check_representation(representation: str) -> None:
+    if representation not in REPRESENTATIONS:
+        raise ValueError(f"Unknown representation: {representation!r} (expected one of {REPRESENTATIONS})")
+
+
+class _OffsetStepper:
+    """read/advance pair yielding time errors integrated from advance_frequency."""
+
+    def __init__(self, clock: Clock) -> None:
+        self._clock = clock
+        self._acc = None
+
+    def read(self):
+        x0 = self._clock.read_time()  # time[0] == 0
+        self._acc = OffsetIntegrator(x0)
+        return x0
+
+    def advance(self, n_steps: int, dt: float) -> np.ndarray:
+        return self._acc.integrate(self._clock.advance_frequency(n_steps, dt), dt)
+
+
+def _steppers(clocks, representation: str):
+    """(read, advance) per clock: readings, or time errors (offset representations)."""
+    if representation == "elapsed":
+        return [(c.read_time, c.advance) for c in clocks]
+    return [(s.read, s.advance) for s in map(_OffsetStepper, clocks)]
+
+
+def iter_run_clocks(
+    clocks: List[Clock], duration: float, dt: float, chunk_size: Optional[int] = None,
+    representation: str = "elapsed",
+) -> Iterator[Dict[str, np.ndarray]]:
+    """Streaming run_clocks: yield chunks of at most chunk_size samples.
+
+    Each chunk is a dict with the same keys as run_clocks ('time',
+    'clock_0', ...) holding consecutive samples along the last axis, so
+    memory stays bounded by chunk_size regardless of duration. Concatenating
+    the chunks reproduces run_clocks(clocks, duration, dt) exactly.
+    ``representation`` is as in run_clocks ('offset' chunks hold
+    OffsetTraces). The default chunk_size is _BLOCK_STEPS samples divided
+    by the member count of the largest ClockEnsemble in ``clocks``.
+
+    Inside an ``instrument.instrumented`` block, per-clock advance/read/write
+    times and the run's throughput are recorded; the progress heartbeat
+    fires at chunk boundaries.
+    """
+    duration = float(duration); dt = float(dt)
+    n_steps = _n_steps(duration, dt)
+    chunk_size = _block_steps(clocks) if chunk_size is None else int(chunk_size)
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be >= 1")
+    _check_representation(representation)
+    steppers = _steppers(clocks, representation)
+    dtype = np.float32 if representation == "offset32" else np.float64
+    report, stats = _run_stats(clocks)
+    run_started = _time.perf_counter()
+
+    k0 = 0
+    try:
+        while k0 <= n_steps:
+            k1 = min(k0 + chunk_size, n_steps + 1)
+            chunk = {"time": _time_slice(k0, k1, n_steps, dt)}
+            for i, c in enumerate(clocks):
+                read, advance = steppers[i]
+                arr = np.empty(_trace_shape(c, k1 - k0), dtype=float)
+                if report is not None:
+                    report.record_array(arr.nbytes)
+                _step_block(arr, read, advance, k0, dt, stats[i])
+                chunk[f"clock_{i}"] = arr if representation == "elapsed" else OffsetTrace.from_offsets(arr, dtype)
+            if report is not None:
+                report.record_array(chunk["time"].nbytes)
+                report.record_steps(k1 - 1, n_steps, run_started)
+            yield chunk
+            k0 = k1
+    finally:
+        if report is not None:
+            report.finish_run(max(k0 - 1, 0), _time.perf_counter() - run_started)
+
+
+def _run_stats(clocks) -> tuple:
+    """(active report or None, its per-clock stats entries or Nones) for a run over clocks."""
+    report = active_report()
+    if report is None:
+        return None, [None] * len(clocks)
+    stats = [report.clock_stats(str(c.get_metadata().get("type", type(c).__name__))) for c in clocks]
+    for st in stats:
+        st["instances"] += 1
+    return report, stats
+
+
+def _step_block(dest, read, advance, k0: int, dt: float, stats=None) -> None:
+    """Write samples k0 .. k0 + m - 1 of one clock into dest (..., m).
+
+    Sample 0 is the reading before the first tick, every later sample one
+    tick. This is the stepping loop of every runner (iter_run_clocks,
+    decimated recording, run_clocks_to_disk, the parallel drivers). With
+    ``stats`` (a RunReport.clock_stats entry) the read/advance/write times
+    are recorded.
+    """
+    m = dest.shape[-1]
+    start = 1 if k0 == 0 and m else 0
+    if stats is None:
+        if start:
+            dest[..., 0] = read()
+        if m > start:
+            dest[..., start:] = advance(m - start, dt)
+        return
+    perf = _time.perf_counter
+    if start:
+        t1 = perf()
+        first = read()
+        t2 = perf()
+        dest[..., 0] = first
+        stats["read_calls"] += 1
+        stats["read_s"] += t2 - t1
+        stats["write_s"] += perf() - t2
+    if m > start:
+        t1 = perf()
+        block = advance(m - start, dt)
+        t2 = perf()
+        dest[..., start:] = block
+        stats["advance_calls"] += 1
+        stats["advance_s"] += t2 - t1
+        stats["steps"] += m - start
+        stats["write_s"] += perf() - t2
+
+
+def concatenate_chunks(chunks: Iterable[Dict[str, np.ndarray]]) -> Dict[str, np.ndarray]:
+    """Join a chunk stream (e.g. from iter_run_clocks) into one run_clocks-style dict."""
+    parts: Dict[str, list] = {}
+    for chunk in chunks:
+        for key, arr in chunk.items():
+            parts.setdefault(key, []).append(arr)
+    return {
+        key: OffsetTrace.concatenate(arrs) if isinstance(arrs[0], OffsetTrace) else np.concatenate(arrs, axis=-1)
+        for key, arrs in parts.items()
+    }
+
+
+_REDUCTIONS = ("last", "mean", "minmax")
+
+
+def _record_times(n_steps: int, dt: float, every: int) -> np.ndarray:
+    """Samples 0, every, 2 * every, ... of the run_clocks time axis, bit-exact."""
+    stop = n_steps * dt
+    t = np.arange(0, n_steps + 1, every, dtype=float) * (stop / n_steps)
+    t[-1] = stop
+    return t
+
+
+def _run_decimated(clocks, n_steps: int, dt: float, every: int, reduce: str) -> Dict[str, np.ndarray]:
+    """run_clocks recording one value per interval of ``every`` steps."""
+    n_rec = n_steps // every
+    out = {"time": _record_times(n_steps, dt, every)}
+    block = _block_steps(clocks)
+    per_block = max(1, block // every)  # whole intervals per advance() call
+    report, stats = _run_stats(clocks)
+    run_started = _time.perf_counter()
+    for i, c in enumerate(clocks):
+        shape = _trace_shape(c, n_rec + 1)
+        lead = shape[:-1]
+        rec = np.empty(shape, dtype=float)
+        _step_block(rec[..., :1], c.read_time, c.advance, 0, dt, stats[i])
+        if reduce == "minmax":
+            lo = np.empty(shape, dtype=float)
+            hi = np.empty(shape, dtype=float)
+            lo[..., 0] = hi[..., 0] = rec[..., 0]
+        j = 0
+        while j < n_rec:
+            if every <= block:
+                m = min(per_block, n_rec - j)
+                k0 = j * every
+                r = np.empty(lead + (m * every,))
+                _step_block(r, c.read_time, c.advance, k0 + 1, dt, stats[i])
+                r = r.reshape(lead + (m, every))
+                rec[..., j + 1:j + 1 + m] = r[..., -1] if reduce != "mean" else r.mean(axis=-1)
+                if reduce == "minmax":
+                    err = r - _time_slice(k0 + 1, k0 + 1 + m * every, n_steps, dt).reshape(m, every)
+                    lo[..., j + 1:j + 1 + m] = err.min(axis=-1)
+                    hi[..., j + 1:j + 1 + m] = err.max(axis=-1)
+                j += m
+                continue
+            # interval longer than a block: accumulate it piece by piece
+            total, e_lo, e_hi, done = 0.0, np.inf, -np.inf, 0
+            k0 = j * every
+            while done < every:
+                n = min(block, every - done)
+                r = np.empty(lead + (n,))
+                _step_block(r, c.read_time, c.advance, k0 + done + 1, dt, stats[i])
+                if reduce == "mean":
+                    total = total + r.sum(axis=-1)
+                elif reduce == "minmax":
+                    err = r - _time_slice(k0 + done + 1, k0 + done + 1 + n, n_steps, dt)
+                    e_lo = np.minimum(e_lo, err.min(axis=-1))
+                    e_hi = np.maximum(e_hi, err.max(axis=-1))
+                done += n
+            rec[..., j + 1] = total / every if reduce == "mean" else r[..., -1]
+            if reduce == "minmax":
+                lo[..., j + 1] = e_lo
+                hi[..., j + 1] = e_hi
+            j += 1
+        out[f"clock_{i}"] = rec
+        if reduce == "minmax":
+            out[f"clock_{i}_min"] = lo
+            out[f"clock_{i}_max"] = hi
+    if report is not None:
+        for arr in out.values():
+            report.record_array(arr.nbytes)
+        report.finish_run(n_steps, _time.perf_counter() - run_started)
+    return out
+
+
+@timed
+def run_clocks(
+    clocks: List[Clock], duration: float, dt: float, record_every: int = 1, reduce: str = "last",
+    representation: str = "elapsed",
+) -> Dict[str, np.ndarray]:
     """Run multiple clocks in parallel with deterministic stepping (virtual time).
     Returns dict: 'time', 'clock_0', 'clock_1', ...
+
+    A ClockEnsemble in ``clocks`` contributes one (M, n_steps + 1) array
+    under its 'clock_i' key instead of M separate traces.
+
+    Each clock is stepped through its block API (Clock.advance) in blocks of
+    up to _BLOCK_STEPS ticks (divided by the member count of the largest
+    ClockEnsemble, so its (M, block) temporaries stay bounded); clocks
+    without a vectorized override fall back
+    to per-tick stepping, so traces are identical either way. Use
+    iter_run_clocks for long runs that should not be held in memory.
+
+    Inside an ``instrument.instrumented`` block the run is timed per clock
+    and blocks are capped at the report's progress_every steps so the
+    heartbeat fires on schedule (traces are unchanged).
+
+    Decimated recording: with record_every=R the clocks still tick every
+    dt, but only samples 0, R, 2R, ... are stored (n_steps must be a
+    multiple of R), so output size scales with the recorded samples. Sample
+    j > 0 summarizes the interval of steps ((j - 1) R, j R] according to
+    ``reduce``:
+
+    - 'last': reading at the interval end (equals run_clocks(...)[key][::R]);
+    - 'mean': mean reading over the interval;
+    - 'minmax': 'last', plus 'clock_i_min' / 'clock_i_max' holding the
+      extreme time error (reading - time) [s] within the interval.
+
+    'time' holds the interval end times. Sample 0 is the initial reading.
+
+    Offset representation: representation='offset' stores each clock as an
+    offsets.OffsetTrace of its time error x = reading - time, integrated
+    from Clock.advance_frequency with compensated summation instead of
+    being formed from the readings; 'offset32' stores x as float32
+    residuals on a float64 base per 4096 samples (half the memory). The
+    comparison and frequency functions here accept either form.
     """
     duration = float(duration); dt = float(dt)
-    if dt <= 0 or duration <= 0:
-        raise ValueError("duration and dt must be > 0")
-    n_steps = int(round(duration / dt))
-    time = np.linspace(0.0, n_steps * dt, n_steps + 1, dtype=float)
-    traces = [np.zeros(n_steps + 1, dtype=float) for _ in clocks]
-
-    # initial read before ticking
+    n_steps = _n_steps(duration, dt)
+    record_every = int(record_every)
+    if record_every < 1:
+        raise ValueError("record_every must be >= 1")
+    if reduce not in _REDUCTIONS:
+        raise ValueError(f"Unknown reduce: {reduce!r} (expected one of {_REDUCTIONS})")
+    _check_representation(representation)
+    if record_every > 1 or reduce != "last":
+        if representation != "elapsed":
+            raise ValueError("decimated recording stores readings; use representation='elapsed'")
+        if n_steps % record_every:
+            raise ValueError("duration / dt must be a multiple of record_every")
+        return _run_decimated(clocks, n_steps, dt, record_every, reduce)
+    out = {"time": np.empty(n_steps + 1, dtype=float)}
     for i, c in enumerate(clocks):
-        traces[i][0] = c.read_time()
-
-    # advance
-    for k in range(1, n_steps + 1):
-        for c in clocks:
-            c.tick(dt)
-        for i, c in enumerate(clocks):
-            traces[i][k] = c.read_time()
-
-    out = {"time": time}
-    for i, arr in enumerate(traces):
-        out[f"clock_{i}"] = arr
+        shape = _trace_shape(c, n_steps + 1)
+        if representation == "elapsed":
+            out[f"clock_{i}"] = np.zeros(shape, dtype=float)
+        else:
+            out[f"clock_{i}"] = OffsetTrace.empty(shape, np.float32 if representation == "offset32" else np.float64)
+
+    chunk_size = _block_steps(clocks)
+    report = active_report()
+    if report is not None:
+        for arr in out.values():
+            report.record_array(arr.nbytes)
+        if report.progress is not None:
+            chunk_size = min(chunk_size, report.progress_every)
+
+    k0 = 0
+    chunk_representation = "elapsed" if representation == "elapsed" else "offset"
+    for chunk in iter_run_clocks(clocks, duration, dt, chunk_size, chunk_representation):
+        k1 = k0 + chunk["time"].size
+        for key, arr in chunk.items():
+            if isinstance(arr, OffsetTrace):
+                out[key].write(k0, arr.data)
+            else:
+                out[key][..., k0:k1] = arr
+        k0 = k1
     return out
 
 
+class _RunningMoments:
+    """Chunk-mergeable count/mean/M2 along the last axis (Chan et al.)."""
+
+    def __init__(self) -> None:
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def update(self, x) -> None:
+        x = np.asarray(x, dtype=float)
+        nb = x.shape[-1]
+        if nb == 0:
+            return
+        mean_b = np.mean(x, axis=-1)
+        m2_b = np.sum(np.square(x - mean_b[..., None]), axis=-1)
+        n = self.n + nb
+        delta = mean_b - self.mean
+        self.mean = self.mean + delta * (nb / n)
+        self.m2 = self.m2 + m2_b + np.square(delta) * (self.n * nb / n)
+        self.n = n
+
+    def var(self, ddof: int = 1):
+        if self.n <= ddof:
+            return np.zeros_like(np.asarray(self.mean, dtype=float))
+        return self.m2 / (self.n - ddof)
+
+
+def _pair(t: np.ndarray, a, b):
+    """Readings a, b as arrays, or both as time errors if either is an OffsetTrace."""
+    if isinstance(a, OffsetTrace) or isinstance(b, OffsetTrace):
+        if a.shape[-1] != t.size or b.shape[-1] != t.size:
+            raise ValueError("time, a, b lengths must match")
+        return time_error(t, a), time_error(t, b)
+    return np.asarray(a, dtype=float), np.asarray(b, dtype=float)
+
+
+@timed
 def compare_clocks(time_s, t_a_s, t_b_s) -> Dict[str, float]:
     """Simple metrics between two elapsed-time series (seconds).
     Returns mean_offset [s], std_offset [s], max_abs_error [s], final_drift_rate [s/s].
+    Either series may be an offsets.OffsetTrace; the difference is then
+    taken between time errors, without cancellation. ``time_s`` may be a
+    series.TimeSeries, with t_a_s / t_b_s keys; the difference is cached.
     """
-    t = np.asarray(time_s, dtype=float)
-    a = np.asarray(t_a_s, dtype=float)
-    b = np.asarray(t_b_s, dtype=float)
-    if t.size != a.size or t.size != b.size:
-        raise ValueError("time, a, b lengths must match")
-    diff = b - a
+    if isinstance(time_s, TimeSeries):
+        t, diff = time_s.time, time_s.difference(t_a_s, t_b_s)
+        if diff.shape != t.shape:
+            raise ValueError("time, a, b lengths must match")
+    else:
+        t = np.asarray(time_s, dtype=float)
+        a, b = _pair(t, t_a_s, t_b_s)
+        if t.size != a.size or t.size != b.size:
+            raise ValueError("time, a, b lengths must match")
+        diff = b - a
     mean_offset = float(np.mean(diff))
     std_offset = float(np.std(diff, ddof=1)) if diff.size > 1 else 0.0
     max_abs_error = float(np.max(np.abs(diff)))
@@ -55,12 +406,163 @@ def compare_clocks(time_s, t_a_s, t_b_s) -> Dict[str, float]:
     }
 
 
+@timed
+def compare_clocks_chunks(
+    chunks: Iterable[Dict[str, np.ndarray]], key_a: str = "clock_0", key_b: str = "clock_1"
+) -> Dict[str, float]:
+    """compare_clocks over a chunk stream (e.g. iter_run_clocks) in one pass.
+
+    Returns the same metrics as compare_clocks(time, chunk[key_a], chunk[key_b])
+    on the concatenated data (mean/std agree to rounding) while holding only
+    one chunk in memory.
+    """
+    moments = _RunningMoments()
+    max_abs_error = 0.0
+    first = last = None
+    for chunk in chunks:
+        t = np.asarray(chunk["time"], dtype=float)
+        a, b = _pair(t, chunk[key_a], chunk[key_b])
+        if t.size != a.size or t.size != b.size:
+            raise ValueError("time, a, b lengths must match")
+        if t.size == 0:
+            continue
+        diff = b - a
+        moments.update(diff)
+        max_abs_error = max(max_abs_error, float(np.max(np.abs(diff))))
+        if first is None:
+            first = (float(t[0]), float(diff[0]))
+        last = (float(t[-1]), float(diff[-1]))
+    if first is None:
+        raise ValueError("chunk stream is empty")
+    (t0, d0), (t1, d1) = first, last
+    return {
+        "mean_offset_s": float(moments.mean),
+        "std_offset_s": float(np.sqrt(moments.var(ddof=1))),
+        "max_abs_error_s": max_abs_error,
+        "final_drift_rate_s_per_s": float((d1 - d0) / (t1 - t0)) if t1 > t0 else 0.0,
+    }
+
+
+# Element budget for the (clocks, columns) difference strips of pairwise_metrics.
+_PAIR_BLOCK_ELEMENTS = 1 << 20
+
+
+def stack_traces(timeseries_dict, keys=None) -> np.ndarray:
+    """(N, n) array of the clock traces in a run_clocks dict.
+
+    keys defaults to every 'clock_i' key in order; ClockEnsemble entries
+    contribute one row per member.
+    """
+    if keys is None:
+        keys = _clock_keys(timeseries_dict)
+    rows = [np.atleast_2d(np.asarray(timeseries_dict[k], dtype=float)) for k in keys]
+    return np.concatenate(rows, axis=0)
+
+
+def _clock_keys(timeseries_dict) -> List[str]:
+    return sorted((k for k in timeseries_dict if k.startswith("clock_") and k[6:].isdigit()), key=lambda k: int(k[6:]))
+
+
+@timed
+def pairwise_metrics(time_s, traces=None) -> Dict[str, np.ndarray]:
+    """compare_clocks for every pair of clocks as N x N matrices.
+
+    Entry [i, j] equals compare_clocks(time_s, traces[i], traces[j]) (diff =
+    trace j - trace i); mean offsets and drift rates are antisymmetric, std
+    and max abs error symmetric. ``traces`` is an (N, n) array or a
+    run_clocks dict (rows as in stack_traces).
+
+    Mean, std and drift come from shared per-clock sums and a Gram matrix of
+    the time errors (trace - time), which keeps the variances free of the
+    common ramp. Only the max abs error needs the difference series; it is
+    evaluated one clock against all later ones over column tiles of at most
+    _PAIR_BLOCK_ELEMENTS elements, so memory stays bounded for any N and n.
+    A dict holding offsets.OffsetTrace entries is stacked as time errors.
+    A series.TimeSeries may be passed alone (pairwise_metrics(ts)) and
+    supplies its cached time errors.
+    """
+    if traces is None and isinstance(time_s, TimeSeries):
+        traces = time_s
+    t = np.asarray(time_s.time if isinstance(time_s, TimeSeries) else time_s, dtype=float)
+    t_ref = t  # subtracted from the rows to give time errors
+    if isinstance(traces, TimeSeries):
+        x = np.concatenate([np.atleast_2d(traces.time_error(k)) for k in _clock_keys(traces)], axis=0)
+        t_ref = np.zeros_like(t)
+    elif isinstance(traces, Mapping) and any(isinstance(traces[k], OffsetTrace) for k in _clock_keys(traces)):
+        x = np.concatenate([np.atleast_2d(time_error(t, traces[k])) for k in _clock_keys(traces)], axis=0)
+        t_ref = np.zeros_like(t)
+    elif isinstance(traces, Mapping):
+        x = stack_traces(traces)
+    else:
+        x = np.atleast_2d(np.asarray(traces, dtype=float))
+    n_clocks, n = x.shape
+    if t.size != n:
+        raise ValueError("time and trace lengths must match")
+    if n == 0:
+        raise ValueError("traces are empty")
+    cols = max(1, _PAIR_BLOCK_ELEMENTS // n_clocks)
+
+    # pass 1: means of the time errors
+    mean = np.zeros(n_clocks)
+    for c0 in range(0, n, cols):
+        mean += np.sum(x[:, c0:c0 + cols] - t_ref[c0:c0 + cols], axis=1)
+    mean /= n
+
+    # pass 2: centered Gram matrix and max |diff| (upper triangle, row strips)
+    gram = np.zeros((n_clocks, n_clocks))
+    max_abs = np.zeros((n_clocks, n_clocks))
+    work = np.empty((n_clocks, min(cols, n)))
+    for c0 in range(0, n, cols):
+        r = x[:, c0:c0 + cols] - t_ref[c0:c0 + cols]
+        rc = r - mean[:, None]
+        gram += rc @ rc.T
+        for i in range(n_clocks - 1):
+            v = work[:n_clocks - i - 1, :r.shape[1]]
+            np.subtract(r[i + 1:], r[i], out=v)
+            np.abs(v, out=v)
+            np.maximum(max_abs[i, i + 1:], v.max(axis=1), out=max_abs[i, i + 1:])
+    max_abs = np.maximum(max_abs, max_abs.T)
+
+    mean_offset = mean[None, :] - mean[:, None]
+    if n > 1:
+        diag = np.diag(gram)
+        var = (diag[:, None] + diag[None, :] - 2.0 * gram) / (n - 1)
+        std = np.sqrt(np.clip(var, 0.0, None))
+        np.fill_diagonal(std, 0.0)
+    else:
+        std = np.zeros((n_clocks, n_clocks))
+    span = t[-1] - t[0]
+    if span > 0:
+        change = (x[:, -1] - t_ref[-1]) - (x[:, 0] - t_ref[0])
+        drift = (change[None, :] - change[:, None]) / span
+    else:
+        drift = np.zeros((n_clocks, n_clocks))
+    return {
+        "mean_offset_s": mean_offset,
+        "std_offset_s": std,
+        "max_abs_error_s": max_abs,
+        "final_drift_rate_s_per_s": drift,
+    }
+
+
+@timed
 def fractional_frequency_from_time(time_s, elapsed_s, dt=None):
-    """Compute fractional frequency y_k from elapsed time samples."""
-    import numpy as np
+    """Compute fractional frequency y_k from elapsed time samples.
+
+    ``elapsed_s`` may be an offsets.OffsetTrace: y is then the difference
+    of time errors over the step, with no 1 - 1 cancellation. With a
+    series.TimeSeries as ``time_s``, ``elapsed_s`` is a key and y and the
+    grid check are cached.
+    """
+    if isinstance(time_s, TimeSeries):
+        return time_s.fractional_frequency(elapsed_s, dt)
+    return _fractional_frequency(time_s, elapsed_s, dt)
+
 
+def _fractional_frequency(time_s, elapsed_s, dt=None):
     t = np.asarray(time_s, dtype=float)
-    x = np.asarray(elapsed_s, dtype=float)
+    offset = isinstance(elapsed_s, OffsetTrace)
+    x = elapsed_s.offsets() if offset else np.asarray(elapsed_s, dtype=float)
     if t.shape != x.shape:
         raise ValueError("time_s and elapsed_s must have the same shape")
     if t.size < 2:
@@ -70,46 +572,316 @@ def fractional_frequency_from_time(time_s, elapsed_s, dt=None):
     if np.any(dt_array <= 0):
         raise ValueError("time grid must be strictly increasing")
 
-    if dt is None:
-        denom = dt_array
-    else:
-        denom = float(dt)
-        if denom <= 0:
-            raise ValueError("dt must be positive")
-        if not np.allclose(dt_array, denom, rtol=1e-6, atol=0.0):
-            raise ValueError("time grid spacing does not match provided dt")
-
+    denom = grid_denominator(dt_array, dt)
+    if offset:
+        return np.diff(x) / denom
     y = np.diff(x) / denom - 1.0
     return y
 
 
-def plot_comparison(timeseries_dict: Dict[str, np.ndarray], labels=None) -> None:
-    """Matplotlib plot: (1) elapsed time, (2) first pair difference."""
-    import matplotlib.pyplot as plt
+def iter_fractional_frequency(
+    chunks: Iterable[Dict[str, np.ndarray]], key: str, dt: Optional[float] = None
+) -> Iterator[np.ndarray]:
+    """Chunked fractional_frequency_from_time: yield y for each chunk of a stream.
+
+    The last sample of each chunk is carried into the next, so the yielded
+    pieces concatenate to exactly fractional_frequency_from_time(time, x, dt).
+    """
+    if dt is not None and float(dt) <= 0:
+        raise ValueError("dt must be positive")
+    prev_t = prev_x = None
+    for chunk in chunks:
+        t = np.asarray(chunk["time"], dtype=float)
+        trace = chunk[key]
+        offset = isinstance(trace, OffsetTrace)
+        x = trace.offsets() if offset else np.asarray(trace, dtype=float)
+        if t.shape != x.shape:
+            raise ValueError("time_s and elapsed_s must have the same shape")
+        if prev_t is not None:
+            t = np.concatenate(([prev_t], t))
+            x = np.concatenate(([prev_x], x))
+        if t.size == 0:
+            continue
+        prev_t, prev_x = t[-1], x[-1]
+        if t.size < 2:
+            continue
+        yield _fractional_frequency(t, OffsetTrace(x) if offset else x, dt=dt)
+
+
+class _MinMaxBuckets:
+    """Streaming min/max-per-bucket reducer with a bounded number of buckets.
+
+    Bucket b holds samples b*w .. (b+1)*w - 1 and keeps the time and value
+    of its minimum and maximum. The width w starts at 1 and doubles (adjacent
+    buckets merge) whenever 2 * n_buckets buckets are full, so the series
+    length need not be known in advance and memory stays O(n_buckets).
+    """
+
+    def __init__(self, n_buckets: int) -> None:
+        self.n_buckets = max(1, int(n_buckets))
+        self.width = 1
+        self._full = [np.empty(0) for _ in range(4)]  # t_lo, x_lo, t_hi, x_hi
+        self._open = None  # (filled, t_lo, x_lo, t_hi, x_hi) of the partial bucket
+        self._first = self._last = None
+
+    def update(self, t, x) -> None:
+        t = np.asarray(t, dtype=float)
+        x = np.asarray(x, dtype=float)
+        k0 = 0
+        while k0 < t.shape[0]:  # at most ~n_buckets new buckets between coarsenings
+            k1 = k0 + self.n_buckets * self.width
+            self._update(t[k0:k1], x[k0:k1])
+            k0 = k1
+
+    def _update(self, t: np.ndarray, x: np.ndarray) -> None:
+        n = t.shape[0]
+        if self._first is None:
+            self._first = (t[0], x[0])
+        self._last = (t[-1], x[-1])
+        i = 0
+        if self._open is not None:
+            i = min(self.width - self._open[0], n)
+            self._open = self._merge(self._open, self._summary(t[:i], x[:i]))
+            if self._open[0] == self.width:
+                self._append(*[np.array([v]) for v in self._open[1:]])
+                self._open = None
+        n_full = (n - i) // self.width
+        if n_full:
+            k1 = i + n_full * self.width
+            tb = t[i:k1].reshape(n_full, self.width)
+            xb = x[i:k1].reshape(n_full, self.width)
+            rows = np.arange(n_full)
+            lo = np.argmin(xb, axis=1)
+            hi = np.argmax(xb, axis=1)
+            self._append(tb[rows, lo], xb[rows, lo], tb[rows, hi], xb[rows, hi])
+            i = k1
+        if i < n:
+            self._open = self._summary(t[i:], x[i:])
+        while self._full[0].size >= 2 * self.n_buckets:
+            self._coarsen()
+
+    @staticmethod
+    def _summary(t: np.ndarray, x: np.ndarray):
+        lo, hi = int(np.argmin(x)), int(np.argmax(x))
+        return (t.size, t[lo], x[lo], t[hi], x[hi])
+
+    @staticmethod
+    def _merge(a, b):
+        lo = a if not b[2] < a[2] else b
+        hi = a if not b[4] > a[4] else b
+        return (a[0] + b[0], lo[1], lo[2], hi[3], hi[4])
+
+    def _append(self, *fields) -> None:
+        self._full = [np.concatenate((f, g)) for f, g in zip(self._full, fields)]
+
+    def _coarsen(self) -> None:
+        """Merge adjacent bucket pairs (width doubles); an odd last bucket reopens."""
+        t_lo, x_lo, t_hi, x_hi = self._full
+        m = t_lo.size // 2 * 2
+        if m < t_lo.size:
+            tail = (self.width, t_lo[-1], x_lo[-1], t_hi[-1], x_hi[-1])
+            self._open = tail if self._open is None else self._merge(tail, self._open)
+        rows = np.arange(m // 2)
+        lo = np.argmin(x_lo[:m].reshape(-1, 2), axis=1)
+        hi = np.argmax(x_hi[:m].reshape(-1, 2), axis=1)
+        self._full = [
+            t_lo[:m].reshape(-1, 2)[rows, lo], x_lo[:m].reshape(-1, 2)[rows, lo],
+            t_hi[:m].reshape(-1, 2)[rows, hi], x_hi[:m].reshape(-1, 2)[rows, hi],
+        ]
+        self.width *= 2
+
+    def result(self):
+        """(t, x) of the decimated series in time order."""
+        t_lo, x_lo, t_hi, x_hi = self._full
+        if self._open is not None:
+            t_lo, x_lo, t_hi, x_hi = [np.append(f, v) for f, v in zip(self._full, self._open[1:])]
+        if self.width == 1:
+            return t_lo, x_lo  # every sample is its own bucket
+        first = t_lo <= t_hi
+        t = np.column_stack((np.where(first, t_lo, t_hi), np.where(first, t_hi, t_lo))).ravel()
+        x = np.column_stack((np.where(first, x_lo, x_hi), np.where(first, x_hi, x_lo))).ravel()
+        if t.size and t[0] != self._first[0]:
+            t, x = np.insert(t, 0, self._first[0]), np.insert(x, 0, self._first[1])
+        if t.size and t[-1] != self._last[0]:
+            t, x = np.append(t, self._last[0]), np.append(x, self._last[1])
+        return t, x
+
+
+def decimate_minmax(time_s, values, max_points: int = 4000, chunk_size: int = _BLOCK_STEPS * 16):
+    """Reduce a series to at most max_points points, keeping every bucket's min and max.
+
+    ``values`` may be an array, a memory-mapped array or an OffsetTrace
+    (decimated as its time error); it is read chunk_size samples at a time.
+    Series of fewer than about max_points / 2 samples are returned unchanged; longer ones
+    keep between max_points / 2 and max_points points, including the first
+    and last sample. Returns (t, v) in time order.
+    """
+    if max_points < 8:
+        raise ValueError("max_points must be >= 8")
+    buckets = _MinMaxBuckets((max_points - 2) // 4)
+    n = len(time_s)
+    if len(values) != n:
+        raise ValueError("time_s and values must have the same length")
+    for k0 in range(0, n, int(chunk_size)):
+        k1 = min(k0 + int(chunk_size), n)
+        v = values.offsets(k0, k1) if isinstance(values, OffsetTrace) else values[k0:k1]
+        buckets.update(time_s[k0:k1], v)
+    return buckets.result()
+
+
+def _dict_chunks(timeseries_dict, chunk_size: int) -> Iterator[Dict[str, np.ndarray]]:
+    """Slices of a run_clocks dict (memory-mapped traces stay on disk until sliced)."""
     t = timeseries_dict["time"]
-    keys = [k for k in timeseries_dict if k.startswith("clock_")]
+    keys = _clock_keys(timeseries_dict)
+    for k0 in range(0, len(t), chunk_size):
+        k1 = min(k0 + chunk_size, len(t))
+        chunk = {"time": t[k0:k1]}
+        for k in keys:
+            v = timeseries_dict[k]
+            chunk[k] = OffsetTrace(v.offsets(k0, k1)) if isinstance(v, OffsetTrace) else v[..., k0:k1]
+        yield chunk
+
+
+def _decimate_chunks(chunks, max_points: int):
+    """One pass over a chunk stream: decimated rows per clock key and of clock_1 - clock_0.
+
+    Returns (keys, {key: [(t, x), ...] per row}, [(t, diff), ...], offset).
+    Offset traces are decimated as time errors.
+    """
+    keys, series, offset = None, {}, False
+    for chunk in chunks:
+        t = np.asarray(chunk["time"], dtype=float)
+        if keys is None:
+            keys = _clock_keys(chunk)
+            offset = any(isinstance(chunk[k], OffsetTrace) for k in keys)
+        values = {k: time_error(t, chunk[k]) if isinstance(chunk[k], OffsetTrace) else np.asarray(chunk[k], dtype=float) for k in keys}
+        if len(keys) >= 2:
+            values["diff"] = values[keys[1]] - values[keys[0]]
+        for k, v in values.items():
+            rows = np.atleast_2d(v)
+            if k not in series:
+                series[k] = [_MinMaxBuckets((max_points - 2) // 4) for _ in range(rows.shape[0])]
+            for buckets, row in zip(series[k], rows):
+                buckets.update(t, row)
+    if keys is None:
+        raise ValueError("empty chunk stream")
+    out = {k: [b.result() for b in bs] for k, bs in series.items()}
+    return keys, out, out.pop("diff", None), offset
+
+
+def _figures(path, n_axes: int):
+    """n_axes axes: on headless Agg figures when saving to path, else pyplot figures."""
+    if path is None:
+        import matplotlib.pyplot as plt
+        return None, [plt.figure().gca() for _ in range(n_axes)]
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+    fig = Figure(figsize=(8.0, 3.5 * n_axes), layout="constrained")
+    FigureCanvasAgg(fig)
+    return fig, list(np.atleast_1d(fig.subplots(n_axes, 1)))
+
+
+def _finish(fig, path) -> None:
+    if fig is None:
+        import matplotlib.pyplot as plt
+        plt.show()
+    else:
+        fig.savefig(path)
+
+
+def plot_comparison(timeseries_dict, labels=None, max_points: int = 4000, path=None, chunk_size: int = _BLOCK_STEPS * 16) -> None:
+    """Matplotlib plot: (1) elapsed time, (2) first pair difference.
+
+    ``timeseries_dict`` is a run_clocks dict (arrays may be memory-mapped)
+    or a chunk stream such as iter_run_clocks(); it is read once, chunk by
+    chunk, and every trace is min/max-decimated to about max_points points,
+    so the extremes of the time difference stay visible. Offset traces are
+    plotted as time errors. With ``path`` the plot is rendered to that file
+    (format from the extension, e.g. .png or .svg) through the Agg canvas,
+    without pyplot or a display; otherwise plt.show() is called.
+    """
+    chunks = _dict_chunks(timeseries_dict, chunk_size) if isinstance(timeseries_dict, Mapping) else timeseries_dict
+    if max_points < 8:
+        raise ValueError("max_points must be >= 8")
+    keys, series, diff, offset = _decimate_chunks(chunks, max_points)
     if labels is None:
         labels = keys
 
-    plt.figure()
+    fig, axes = _figures(path, 2 if diff is not None else 1)
+    ax = axes[0]
     for k, lab in zip(keys, labels):
-        plt.plot(t, timeseries_dict[k], label=lab)
-    plt.xlabel("Simulation time [s]")
-    plt.ylabel("Elapsed time reading [s]")
-    plt.title("Clock readings")
-    plt.legend()
-
-    if len(keys) >= 2:
-        diff = timeseries_dict[keys[1]] - timeseries_dict[keys[0]]
-        plt.figure()
-        plt.plot(t, diff)
-        plt.xlabel("Simulation time [s]")
-        plt.ylabel(f"{labels[1]} - {labels[0]} [s]")
-        plt.title("Time difference")
-    plt.show()
-
-
-def consensus_weighted_average(timeseries_dict, keys, method="inv_var_frac", dt=None, tau=None):
+        for j, (t, v) in enumerate(series[k]):
+            ax.plot(t, v, label=lab if len(series[k]) == 1 else f"{lab}[{j}]")
+    ax.set_xlabel("Simulation time [s]")
+    ax.set_ylabel("Time error [s]" if offset else "Elapsed time reading [s]")
+    ax.set_title("Clock time errors" if offset else "Clock readings")
+    ax.legend()
+
+    if diff is not None:
+        ax = axes[1]
+        for t, v in diff:
+            ax.plot(t, v)
+        ax.set_xlabel("Simulation time [s]")
+        ax.set_ylabel(f"{labels[1]} - {labels[0]} [s]")
+        ax.set_title("Time difference")
+    _finish(fig, path)
+
+
+@timed
+def n_cornered_hat(y, covariance: bool = False) -> Dict[str, np.ndarray]:
+    """N-cornered-hat noise estimates from pairwise differences only.
+
+    Parameters
+    ----------
+    y : array-like, shape (n_clocks, n_samples)
+        One series per clock (e.g. fractional frequency). Only differences
+        y_i - y_0 enter, so a common reference error cancels.
+    covariance : bool
+        Also solve for the full covariance matrix.
+
+    Returns
+    -------
+    dict with
+        var : (n_clocks,) per-clock variances from the classic uncorrelated
+            least-squares solution of pair_var[i, j] = var_i + var_j.
+        pair_var : (n_clocks, n_clocks) variances of y_i - y_j.
+        covariance : (n_clocks, n_clocks), only if covariance=True. Pairwise
+            differences fix the covariance up to C + a 1^T + 1 a^T; a is
+            chosen to minimise the sum of squared off-diagonal terms
+            (Tavella-Premoli style), which reduces to the three-cornered hat
+            for three clocks.
+    """
+    y = np.asarray(y, dtype=float)
+    if y.ndim != 2 or y.shape[0] < 3:
+        raise ValueError("n_cornered_hat needs a (n_clocks >= 3, n_samples) array")
+    if y.shape[1] < 2:
+        raise ValueError("need at least two samples per clock")
+    n = y.shape[0]
+    d = y[1:] - y[0]
+    d -= np.mean(d, axis=1, keepdims=True)
+    r = (d @ d.T) / (y.shape[1] - 1)  # covariance of differences vs clock 0
+
+    # Particular solution: clock 0 noiseless, the rest carry R.
+    c0 = np.zeros((n, n))
+    c0[1:, 1:] = r
+    diag = np.diag(c0)
+    pair_var = diag[:, None] + diag[None, :] - 2.0 * c0
+
+    # Classic N-cornered hat: var_i = (sum_j D_ij - sum_jk D_jk / (2(n-1))) / (n-2)
+    row = pair_var.sum(axis=1)
+    var = (row - row.sum() / (2.0 * (n - 1))) / (n - 2)
+    out = {"var": var, "pair_var": pair_var}
+
+    if covariance:
+        off = c0.sum(axis=1) - diag  # sum_{j != k} C0_kj
+        total = -off.sum() / (2.0 * n - 2.0)
+        a = (-off - total) / (n - 2)
+        out["covariance"] = c0 + a[:, None] + a[None, :]
+    return out
+
+
+@timed
+def consensus_weighted_average(timeseries_dict, keys, method="inv_var_frac", dt=None, tau=None, covariance=False):
     """
     Compute a consensus series via inverse-variance weighting.
 
@@ -122,41 +894,69 @@ def consensus_weighted_average(timeseries_dict, keys, method="inv_var_frac", dt=
     method : str
         'inv_var_frac'  -> inverse variance of fractional frequency y(t) [DEFAULT]
         'inv_oadev_tau' -> inverse square of overlapping Allan deviation σ_y(τ) at target τ.
+        'n_cornered_hat' -> inverse of per-clock variances of y estimated from
+                            pairwise differences only (see n_cornered_hat).
+                            Estimates <= 0 (listed in detail['negative_var'])
+                            are clipped to the smallest positive one.
         Legacy alias: 'inv_var' (mapped internally to 'inv_var_frac' for backward compatibility).
     dt : float | None
         Sampling interval [s]; required if it cannot be inferred from the time grid.
     tau : float | None
         Averaging time τ [s] used for method='inv_oadev_tau'.
+    covariance : bool
+        method='n_cornered_hat' only: also solve for covariances and use the
+        minimum-variance weights C⁻¹1 / (1ᵀC⁻¹1), which may be negative.
 
     Returns
     -------
     dict with fields:
         time, consensus, weights, method, detail
         where detail contains method-specific diagnostics (e.g., var_frac or sigma_y_tau).
+        If any selected trace is an offsets.OffsetTrace, all are averaged as
+        time errors and 'consensus' is an OffsetTrace.
+        A series.TimeSeries reuses its cached time errors, fractional
+        frequencies, grid check and (for 'inv_oadev_tau') phase prefix sums.
     """
     import numpy as np
 
     # --- inputs & guards ---
-    t = np.asarray(timeseries_dict["time"], dtype=float)
+    memo = timeseries_dict if isinstance(timeseries_dict, TimeSeries) else None
+    t = memo.time if memo is not None else np.asarray(timeseries_dict["time"], dtype=float)
     if any(k == "clock_0" for k in keys):
         raise ValueError("Do not include 'clock_0' (Ideal) in consensus keys; average only noisy clocks.")
 
-    data = [np.asarray(timeseries_dict[k], dtype=float) for k in keys]
+    offset = any(isinstance(timeseries_dict[k], OffsetTrace) for k in keys)
+    if offset and memo is not None:
+        data = [memo.time_error(k) for k in keys]
+    elif offset:
+        data = [time_error(t, timeseries_dict[k]) for k in keys]
+    else:
+        data = [np.asarray(timeseries_dict[k], dtype=float) for k in keys]
     arr = np.vstack(data)  # shape: (n_clocks, n_times)
+    rate = 0.0 if offset else 1.0  # nominal d(trace)/dt
 
     # --- infer/validate dt ---
-    dt_array = np.diff(t)
-    if np.any(dt_array <= 0):
-        raise ValueError("time grid must be strictly increasing")
-
-    if dt is None:
-        if not np.allclose(dt_array, dt_array[0], rtol=1e-9, atol=0.0):
-            raise ValueError("time grid must be uniform or provide dt explicitly")
-        dt_eff = float(dt_array[0])
+    if memo is not None:
+        memo.steps()
+        dt_eff = memo.uniform_step() if dt is None else float(dt)
     else:
-        dt_eff = float(dt)
-        if dt_eff <= 0:
-            raise ValueError("dt must be positive")
+        dt_array = np.diff(t)
+        if np.any(dt_array <= 0):
+            raise ValueError("time grid must be strictly increasing")
+        if dt is None:
+            if not np.allclose(dt_array, dt_array[0], rtol=1e-9, atol=0.0):
+                raise ValueError("time grid must be uniform or provide dt explicitly")
+            dt_eff = float(dt_array[0])
+        else:
+            dt_eff = float(dt)
+    if dt_eff <= 0:
+        raise ValueError("dt must be positive")
+
+    def _frac():
+        """Fractional frequency rows y = diff(arr) / dt_eff - rate."""
+        if memo is not None:
+            return np.vstack([memo.frequency(k, dt_eff, offset) for k in keys])
+        return np.diff(arr, axis=-1) / dt_eff - rate
 
     # --- helper: safe inverse to avoid divide-by-zero ---
     def _safe_inv(vec, floor=1e-24):
@@ -173,11 +973,9 @@ def consensus_weighted_average(timeseries_dict, keys, method="inv_var_frac", dt=
     detail = {}
 
     if method == "inv_var_frac":
-        # Weight by inverse variance of fractional frequency y
-        var_y = []
-        for row in arr:
-            y = np.diff(row) / dt_eff - 1.0
-            var_y.append(np.var(y, ddof=1) if y.size > 1 else 0.0)
+        # Weight by inverse variance of fractional frequency y (all rows at once)
+        y = _frac()
+        var_y = np.var(y, axis=-1, ddof=1) if y.shape[-1] > 1 else np.zeros(arr.shape[0])
         w = _safe_inv(var_y)
         w = w / np.sum(w)
         detail = {"var_frac": [float(v) for v in var_y]}
@@ -185,19 +983,50 @@ def consensus_weighted_average(timeseries_dict, keys, method="inv_var_frac", dt=
     elif method == "inv_oadev_tau":
         if tau is None:
             raise ValueError("tau (in seconds) is required for method='inv_oadev_tau'")
-        sigmas, errs = [], []
-        for row in arr:
-            y = np.diff(row) / dt_eff - 1.0
-            taus_s, adev, adev_err = adev_overlapping_allantools(y, dt=dt_eff, taus=[float(tau)])
-            sigmas.append(float(adev[0])); errs.append(float(adev_err[0]))
+        # all clocks in one pass of the native engine (matches allantools.oadev)
+        if memo is not None:
+            taus_s, adev, adev_err = memo.stability(keys, dt_eff, [float(tau)], ("oadev",), offset)["oadev"]
+        else:
+            taus_s, adev, adev_err = oadev(_frac(), dt=dt_eff, taus=[float(tau)])
+        if taus_s.size == 0:
+            raise ValueError("tau is too long for the series to estimate σ_y(τ)")
+        sigmas = [float(v) for v in adev[:, 0]]
+        errs = [float(v) for v in adev_err[:, 0]]
         w = _safe_inv(np.square(sigmas))
         w = w / np.sum(w)
         detail = {"sigma_y_tau": sigmas, "sigma_y_tau_err": errs, "tau": float(tau)}
 
+    elif method == "n_cornered_hat":
+        y = _frac()
+        hat = n_cornered_hat(y, covariance=covariance)
+        detail = {
+            "var_frac": [float(v) for v in hat["var"]],
+            "pair_var_frac": hat["pair_var"].tolist(),
+            "negative_var": [int(i) for i in np.flatnonzero(hat["var"] <= 0.0)],
+        }
+        if covariance:
+            cov = hat["covariance"]
+            try:
+                w = np.linalg.solve(cov, np.ones(cov.shape[0]))
+            except np.linalg.LinAlgError:
+                raise ValueError("N-cornered-hat covariance matrix is singular; use covariance=False") from None
+            w = w / np.sum(w)
+            detail["covariance_frac"] = cov.tolist()
+        else:
+            positive = hat["var"][hat["var"] > 0.0]
+            if positive.size == 0:
+                raise ValueError("N-cornered-hat variance estimates are all <= 0; cannot weight the clocks")
+            # a non-positive estimate is noise around a small variance: clip it
+            # to the smallest positive one instead of letting it take all the weight
+            w = 1.0 / np.maximum(hat["var"], positive.min())
+            w = w / np.sum(w)
+
     else:
         raise ValueError(f"Unknown method: {method}")
 
     consensus = np.average(arr, axis=0, weights=w)
+    if offset:
+        consensus = OffsetTrace(consensus)
     if original_method != method:
         detail["method_alias"] = {"requested": original_method, "canonical": method}
 
@@ -210,7 +1039,232 @@ def consensus_weighted_average(timeseries_dict, keys, method="inv_var_frac", dt=
     }
 
 
+@timed
+def consensus_weights_chunks(
+    chunks: Iterable[Dict[str, np.ndarray]], keys, dt: Optional[float] = None
+) -> Dict[str, object]:
+    """One-pass inverse-variance ('inv_var_frac') weights over a chunk stream.
+
+    Returns dict with fields weights, method, detail (var_frac, dt), matching
+    consensus_weighted_average(..., method='inv_var_frac') to rounding. Apply
+    them with iter_consensus on a second stream of the same run (rerun the
+    seeded clocks, or read the stored traces back).
+    """
+    if any(k == "clock_0" for k in keys):
+        raise ValueError("Do not include 'clock_0' (Ideal) in consensus keys; average only noisy clocks.")
+    if dt is not None and float(dt) <= 0:
+        raise ValueError("dt must be positive")
+    moments = _RunningMoments()
+    prev = None
+    dt_eff = None if dt is None else float(dt)
+    for chunk in chunks:
+        t = np.asarray(chunk["time"], dtype=float)
+        arr = np.vstack([np.asarray(chunk[k], dtype=float) for k in keys])
+        if prev is not None:
+            t = np.concatenate(([prev[0]], t))
+            arr = np.concatenate((prev[1], arr), axis=-1)
+        if t.size == 0:
+            continue
+        prev = (t[-1], arr[:, -1:])
+        if t.size < 2:
+            continue
+        dt_array = np.diff(t)
+        if np.any(dt_array <= 0):
+            raise ValueError("time grid must be strictly increasing")
+        if dt is None:
+            if dt_eff is None:
+                dt_eff = float(dt_array[0])
+            if not np.allclose(dt_array, dt_eff, rtol=1e-9, atol=0.0):
+                raise ValueError("time grid must be uniform or provide dt explicitly")
+        moments.update(np.diff(arr, axis=-1) / dt_eff - 1.0)
+    if dt_eff is None:
+        raise ValueError("need at least two samples to compute fractional frequency")
+
+    var_y = np.atleast_1d(moments.var(ddof=1))
+    w = 1.0 / np.where(var_y <= 0.0, 1e-24, var_y)
+    w = w / np.sum(w)
+    return {
+        "weights": w.tolist(),
+        "method": "inv_var_frac",
+        "detail": {"var_frac": [float(v) for v in var_y], "dt": dt_eff},
+    }
+
+
+def iter_consensus(chunks: Iterable[Dict[str, np.ndarray]], keys, weights) -> Iterator[Dict[str, np.ndarray]]:
+    """Yield {'time', 'consensus'} per chunk for fixed weights over keys.
+
+    Uses the same weighted average as consensus_weighted_average, so the
+    pieces concatenate to its 'consensus' series for the same weights.
+    """
+    w = np.asarray(weights, dtype=float)
+    for chunk in chunks:
+        arr = np.vstack([np.asarray(chunk[k], dtype=float) for k in keys])
+        yield {"time": np.asarray(chunk["time"], dtype=float),
+               "consensus": np.average(arr, axis=0, weights=w)}
+
+
+# Steps between exact recomputations of SlidingWindowConsensus's running sums
+# (at least one window), bounding their rounding drift on long runs.
+_WINDOW_ANCHOR_STEPS = 4096
+
+
+class SlidingWindowConsensus:
+    """Time-varying consensus with trailing-window inverse-variance weights.
+
+    Feed run_clocks-style chunks to ``update``; each call returns the
+    consensus and the per-sample weight matrix for that chunk. The weight
+    of clock i at sample k is the inverse variance of its fractional
+    frequency over the ``window`` increments before k, kept as running sums
+    (O(1) per step and clock, whatever the chunk size) that are recomputed
+    from the window every max(window, 4096) steps. NaN readings mark a clock as absent: it gets
+    zero weight while absent and re-enters once its window holds at least
+    two valid increments. The consensus integrates the weighted average of
+    the present clocks' increments, so membership changes do not cause
+    jumps; with constant weights it equals the fixed-weight average.
+
+    Parameters
+    ----------
+    keys : list[str]
+        'clock_*' keys to combine (not the ideal 'clock_0').
+    window : int
+        Number of trailing increments per variance estimate (>= 2).
+    dt : float | None
+        Sampling interval [s]; None uses the time grid spacing per step.
+    """
+
+    def __init__(self, keys, window: int, dt: Optional[float] = None) -> None:
+        if any(k == "clock_0" for k in keys):
+            raise ValueError("Do not include 'clock_0' (Ideal) in consensus keys; average only noisy clocks.")
+        if int(window) < 2:
+            raise ValueError("window must be >= 2")
+        if dt is not None and float(dt) <= 0:
+            raise ValueError("dt must be positive")
+        self._keys = list(keys)
+        self._window = int(window)
+        self._dt = None if dt is None else float(dt)
+        n = len(self._keys)
+        self._ring = np.full((n, self._window), np.nan)  # last `window` increments' y, oldest at _head
+        self._head = 0
+        self._sums = np.zeros((3, n))  # count, sum and sum of squares of the window's valid y - _shift
+        self._since_anchor = 0  # steps since _sums were last recomputed from _ring
+        self._shift = np.full(n, np.nan)  # per-clock offset removed before summing squares
+        self._last_t = None
+        self._last_x = None
+        self._value = None
+
+    def _weights(self, present: np.ndarray, var: np.ndarray) -> np.ndarray:
+        w = np.where(present & np.isfinite(var), 1.0 / np.where(var > 0.0, var, 1e-24), 0.0)
+        total = w.sum(axis=0)
+        fallback = present / np.maximum(present.sum(axis=0), 1)
+        return np.where(total > 0.0, w / np.where(total > 0.0, total, 1.0), fallback)
+
+    def _moments(self, y: np.ndarray) -> np.ndarray:
+        """(count, sum, sum of squares) terms of y - _shift, NaNs contributing zero."""
+        ok = np.isfinite(y)
+        centred = np.where(ok, y - self._shift[:, None], 0.0)
+        return np.stack((ok.astype(float), centred, centred * centred))
+
+    def _anchor(self) -> None:
+        """Recompute the running sums from the ring, dropping accumulated rounding."""
+        self._sums = self._moments(self._ring).sum(axis=2)
+        self._since_anchor = 0
+
+    def _slide(self, y: np.ndarray) -> np.ndarray:
+        """Window variances for the increments y (N, n), then push y into the window.
+
+        The window for step k holds the `window` increments before k. Each
+        step adds its increment and drops the oldest one, so a call costs
+        O(n) per clock whatever the window length.
+        """
+        n, size = y.shape[1], self._window
+        j = np.arange(n)
+        leaving = np.empty_like(y)
+        first = min(n, size)
+        leaving[:, :first] = self._ring[:, (self._head + j[:first]) % size]
+        leaving[:, first:] = y[:, :n - first]
+        delta = self._moments(y) - self._moments(leaving)
+        sums = self._sums[:, :, None] + np.concatenate((np.zeros((3, y.shape[0], 1)), np.cumsum(delta, axis=2)), axis=2)
+        self._sums = sums[:, :, -1]
+        cnt, s1, s2 = sums[:, :, :-1]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            var = np.where(cnt >= 2, (s2 - s1 * s1 / cnt) / (cnt - 1), np.nan)
+
+        keep = j[-size:]
+        self._ring[:, (self._head + keep) % size] = y[:, keep]
+        self._head = (self._head + n) % size
+        self._since_anchor += n
+        return var
+
+    def update(self, chunk: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """Process one chunk; return {'time', 'consensus', 'weights'} for its samples."""
+        t = np.asarray(chunk["time"], dtype=float)
+        x = np.vstack([np.asarray(chunk[k], dtype=float) for k in self._keys])
+        m = t.size
+        weights = np.zeros((len(self._keys), m))
+        consensus = np.empty(m)
+        if m == 0:
+            return {"time": t, "consensus": consensus, "weights": weights}
+
+        start = 0
+        if self._last_t is None:
+            present = np.isfinite(x[:, 0])
+            weights[:, 0] = self._weights(present[:, None], np.full((len(self._keys), 1), np.nan))[:, 0]
+            self._value = float(np.sum(weights[:, 0] * np.where(present, x[:, 0], 0.0))) if present.any() else float(t[0])
+            consensus[0] = self._value
+            self._last_t, self._last_x = t[0], x[:, 0]
+            start = 1
+        if start == m:
+            return {"time": t, "consensus": consensus, "weights": weights}
+
+        t_prev = np.concatenate(([self._last_t], t[start:-1])) if m - start > 1 else np.array([self._last_t])
+        x_prev = np.concatenate((self._last_x[:, None], x[:, start:-1]), axis=1)
+        dt_step = t[start:] - t_prev
+        if np.any(dt_step <= 0):
+            raise ValueError("time grid must be strictly increasing")
+        dx = x[:, start:] - x_prev
+        y = dx / (self._dt if self._dt is not None else dt_step) - 1.0
+        valid = np.isfinite(y)
+
+        new_shift = np.isnan(self._shift)
+        if new_shift.any():
+            first = np.where(valid.any(axis=1), y[np.arange(y.shape[0]), valid.argmax(axis=1)], np.nan)
+            self._shift = np.where(new_shift, first, self._shift)
+
+        var = np.empty(y.shape)
+        anchor_every = max(self._window, _WINDOW_ANCHOR_STEPS)
+        k = 0
+        while k < y.shape[1]:
+            if self._since_anchor >= anchor_every:
+                self._anchor()
+            n = min(y.shape[1] - k, anchor_every - self._since_anchor)
+            var[:, k:k + n] = self._slide(y[:, k:k + n])
+            k += n
+
+        w = self._weights(valid, var)
+        weights[:, start:] = w
+        steps = np.where(w.sum(axis=0) > 0.0, np.sum(w * np.where(valid, dx, 0.0), axis=0), dt_step)
+        steps[0] += self._value
+        consensus[start:] = np.cumsum(steps)
+
+        self._value = float(consensus[-1])
+        self._last_t, self._last_x = t[-1], x[:, -1].copy()
+        return {"time": t, "consensus": consensus, "weights": weights}
+
+
+@timed
+def consensus_sliding_window(timeseries_dict, keys, window: int, dt: Optional[float] = None):
+    """Sliding-window consensus over a whole run_clocks dict (see SlidingWindowConsensus).
+
+    Returns dict with fields time, consensus, weights (n_clocks, n_times),
+    method ('sliding_inv_var_frac') and detail (window).
+    """
+    out = SlidingWindowConsensus(keys, window, dt=dt).update(timeseries_dict)
+    out.update({"method": "sliding_inv_var_frac", "detail": {"window": int(window)}})
+    return out
+
+
 # ===== Overlapping Allan deviation via allantools (Phase I+) =====
+@timed
 def adev_overlapping_allantools(y, dt, taus=None):
     """Compute overlapping Allan deviation using 'allantools' with uncertainties.
 
@@ -251,20 +1305,18 @@ def adev_overlapping_allantools(y, dt, taus=None):
     return np.asarray(taus_s, float), np.asarray(adev, float), np.asarray(adev_err, float)
 
 
-def plot_adev_with_uncertainties(taus_s, adev, adev_err, title="Overlapping Allan deviation (allantools)"):
-    """Log-log plot of ADEV with 1-σ error bars."""
-    import matplotlib.pyplot as plt
-    import numpy as np
-
-    plt.figure()
+def plot_adev_with_uncertainties(taus_s, adev, adev_err, title="Overlapping Allan deviation (allantools)", path=None):
+    """Log-log plot of ADEV with 1-σ error bars (saved headless to ``path`` if given)."""
+    taus_s, adev, adev_err = (np.asarray(a, dtype=float) for a in (taus_s, adev, adev_err))
+    fig, (ax,) = _figures(path, 1)
     yerr = adev_err
     # Avoid non-positive values on log scale; mask zeros if any
     mask = (taus_s > 0) & (adev > 0)
-    plt.errorbar(taus_s[mask], adev[mask], yerr=yerr[mask], fmt='o', capsize=3)
-    plt.xscale('log')
-    plt.yscale('log')
-    plt.xlabel("τ [s]")
-    plt.ylabel("σ_y(τ)")
-    plt.title(title)
-    plt.grid(True, which="both", ls=":")
-    plt.show()
+    ax.errorbar(taus_s[mask], adev[mask], yerr=yerr[mask], fmt='o', capsize=3)
+    ax.set_xscale('log')
+    ax.set_yscale('log')
+    ax.set_xlabel("τ [s]")
+    ax.set_ylabel("σ_y(τ)")
+    ax.set_title(title)
+    ax.grid(True, which="both", ls=":")
+    _finish(fig, path)
@@ -0,0 +1,305 @@
+"""Content-addressed on-disk cache of run_clocks results.
+
+An entry is keyed by a SHA-256 over, per clock, its ``get_metadata()`` and
+its full instance state (parameters, seed-derived generator state, elapsed
+time), plus duration, dt, the package version and the source of the clock's
+implementation modules. Editing a clock model therefore invalidates its
+entries, and a clock that has already been stepped never hits an entry
+recorded from a fresh one.
+
+Traces are stored as one ``.npy`` file per key and memory-mapped read-only
+on a hit, so a hit costs the same for any trace length. Unlike
+analysis.run_clocks, a hit's arrays are therefore read-only; copy them
+(np.array(ts[key])) before modifying them in place. The clocks' final
+states (Clock.get_state) are stored alongside in a statefile .npz (JSON
+plus arrays), never pickled, and restored with Clock.set_state on a hit,
+so the clocks continue exactly as if ``run_clocks`` had been called. The
+least recently used entries are evicted once the cache exceeds its size
+budget.
+
+    cache = ResultCache("~/.cache/clocksandbox", max_bytes=20 * 2**30)
+    ts = cache.run_clocks(clocks, duration=86400.0, dt=1.0)
+"""
+from __future__ import annotations
+
+import hashlib
+import inspect
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import types
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from . import statefile
+from .analysis import run_clocks
+from .core import Clock
+
+# Code every built-in clock's trace depends on besides its own module: the
+# runner functions of analysis.py (not the whole module) and shared kernels.
+_RUNNER_FUNCTIONS = ("run_clocks", "iter_run_clocks", "_step_block", "_steppers", "_time_slice", "_n_steps", "_trace_shape")
+_SHARED_MODULES = ("src.clocks._kernels", "src.clocks.counter")
+_STAMP = "last_used"  # holds time.time_ns() of the last access (file mtimes are too coarse)
+_source_hashes: Dict[Any, tuple] = {}
+
+
+def _package_version() -> str:
+    try:
+        from importlib.metadata import PackageNotFoundError, version
+        try:
+            return version("clocksandbox")
+        except PackageNotFoundError:
+            return "unknown"
+    except ImportError:  # pragma: no cover
+        return "unknown"
+
+
+def _module_hash(name: str) -> str:
+    """SHA-256 of a module's source file (memoised per file mtime)."""
+    module = sys.modules.get(name)
+    path = getattr(module, "__file__", None)
+    if not path or not os.path.exists(path):
+        return name
+    mtime = os.stat(path).st_mtime_ns
+    cached = _source_hashes.get(path)
+    if cached is None or cached[0] != mtime:
+        with open(path, "rb") as fh:
+            cached = (mtime, hashlib.sha256(fh.read()).hexdigest())
+        _source_hashes[path] = cached
+    return cached[1]
+
+
+def _runner_hash() -> str:
+    """SHA-256 of the analysis.py functions a run_clocks result depends on."""
+    from . import analysis
+
+    path = analysis.__file__
+    mtime = os.stat(path).st_mtime_ns
+    cached = _source_hashes.get(("runner", path))
+    if cached is None or cached[0] != mtime:
+        digest = hashlib.sha256()
+        for name in _RUNNER_FUNCTIONS:
+            digest.update(inspect.getsource(getattr(analysis, name)).encode())
+        cached = (mtime, digest.hexdigest())
+        _source_hashes[("runner", path)] = cached
+    return cached[1]
+
+
+def _touch(path: str) -> None:
+    with open(path, "w", encoding="ascii") as fh:
+        fh.write(str(time.time_ns()))
+
+
+def _fingerprint(obj: Any) -> Any:
+    """JSON-able, exact description of obj's value (floats via repr).
+
+    Objects with a ``cache_key()`` method are described by its result
+    (e.g. clocks.CorrelatedNoise, whose channel registry holds weak
+    references); other objects by their instance attributes. Raises
+    TypeError for objects that have neither, rather than keying on a repr
+    that may hold memory addresses.
+    """
+    hook = getattr(obj, "cache_key", None)
+    if callable(hook) and not isinstance(obj, type):
+        return {f"{type(obj).__module__}.{type(obj).__qualname__}": _fingerprint(hook())}
+    if obj is None or isinstance(obj, (bool, int, str)):
+        return obj
+    if isinstance(obj, float):
+        return repr(obj)
+    if isinstance(obj, np.generic):
+        return _fingerprint(obj.item())
+    if isinstance(obj, np.ndarray):
+        data = np.ascontiguousarray(obj)
+        return {"ndarray": [str(data.dtype), list(data.shape), hashlib.sha256(data.tobytes()).hexdigest()]}
+    if isinstance(obj, np.random.Generator):
+        return {"Generator": _fingerprint(obj.bit_generator.state)}
+    if isinstance(obj, np.random.SeedSequence):
+        return {"SeedSequence": _fingerprint([obj.entropy, obj.spawn_key, obj.pool_size, obj.n_children_spawned])}
+    if isinstance(obj, dict):
+        return {str(k): _fingerprint(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_fingerprint(v) for v in obj]
+    if isinstance(obj, (type, types.FunctionType, types.BuiltinFunctionType, types.MethodType)):
+        return f"{getattr(obj, '__module__', '')}.{getattr(obj, '__qualname__', repr(obj))}"
+    state = getattr(obj, "__dict__", None)
+    if state is None:
+        raise TypeError(f"cannot fingerprint {type(obj).__name__} objects for the cache key")
+    return {f"{type(obj).__module__}.{type(obj).__qualname__}": _fingerprint(state)}
+
+
+def clock_fingerprint(clock: Clock) -> Dict[str, Any]:
+    """Metadata, full state and implementation hash identifying a clock's trace."""
+    modules = [cls.__module__ for cls in type(clock).__mro__ if cls.__module__ not in ("builtins", "abc")]
+    return {
+        "metadata": _fingerprint(clock.get_metadata()),
+        "state": _fingerprint(vars(clock)),
+        "source": [_module_hash(m) for m in dict.fromkeys(modules)],
+    }
+
+
+def result_key(clocks: List[Clock], duration: float, dt: float) -> str:
+    """Stable content hash of a run_clocks call.
+
+    Raises TypeError if a clock holds state that cannot be fingerprinted.
+    """
+    payload = {
+        "clocks": [clock_fingerprint(c) for c in clocks],
+        "duration": repr(float(duration)),
+        "dt": repr(float(dt)),
+        "version": _package_version(),
+        "runner": [_runner_hash()] + [_module_hash(m) for m in _SHARED_MODULES],
+    }
+    blob = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(blob.encode()).hexdigest()
+
+
+class ResultCache:
+    """Directory of cached run_clocks results with an LRU size budget.
+
+    Parameters
+    ----------
+    directory : str
+        Cache root (created if missing); one subdirectory per entry.
+    max_bytes : int
+        Size budget; least recently used entries are evicted after a store
+        pushes the total above it.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = 10 * 2**30) -> None:
+        if int(max_bytes) <= 0:
+            raise ValueError("max_bytes must be > 0")
+        self.directory = os.path.abspath(os.path.expanduser(directory))
+        self.max_bytes = int(max_bytes)
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key)
+
+    def __contains__(self, key: str) -> bool:
+        return os.path.exists(os.path.join(self._path(key), "meta.json"))
+
+    def keys(self) -> List[str]:
+        return [k for k in os.listdir(self.directory) if k in self]
+
+    def __len__(self) -> int:
+        return len(self.keys())
+
+    def size_bytes(self) -> int:
+        return sum(self._entry_size(k) for k in self.keys())
+
+    def _entry_size(self, key: str) -> int:
+        path = self._path(key)
+        return sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path))
+
+    def get(self, key: str, clocks: Optional[List[Clock]] = None) -> Optional[Dict[str, np.ndarray]]:
+        """Read-only memory-mapped traces for key (None on a miss).
+
+        If ``clocks`` is given, their final states from the cached run are
+        restored into them with Clock.set_state. Every state is read before
+        any is applied, and the clocks are rolled back if one is rejected,
+        so a miss leaves them unchanged.
+        """
+        path = self._path(key)
+        try:
+            with open(os.path.join(path, "meta.json"), encoding="utf-8") as fh:
+                meta = json.load(fh)
+            out = {k: np.load(os.path.join(path, f"{k}.npy"), mmap_mode="r") for k in meta["keys"]}
+            if clocks is not None:
+                with open(os.path.join(path, "states.npz"), "rb") as fh:
+                    states = statefile.loads(fh.read())
+                if len(states) != len(clocks):
+                    raise ValueError("cached states do not match the clocks")
+        except statefile.LOAD_ERRORS:
+            return None
+        if clocks is not None:
+            previous = [c.get_state() for c in clocks]
+            try:
+                for clock, state in zip(clocks, states):
+                    clock.set_state(state)
+            except (ValueError, KeyError, TypeError):
+                for clock, state in zip(clocks, previous):
+                    clock.set_state(state)
+                return None
+        _touch(os.path.join(path, _STAMP))
+        return out
+
+    def put(self, key: str, result: Dict[str, np.ndarray], clocks: Optional[List[Clock]] = None) -> None:
+        """Store result (and the clocks' current states) under key, then evict.
+
+        Raises TypeError if a clock's get_state() holds values other than
+        JSON types and ndarrays.
+        """
+        states = statefile.dumps([c.get_state() for c in clocks or []])
+        tmp = tempfile.mkdtemp(prefix=".tmp-", dir=self.directory)
+        try:
+            for name, arr in result.items():
+                np.save(os.path.join(tmp, f"{name}.npy"), np.asarray(arr))
+            with open(os.path.join(tmp, "states.npz"), "wb") as fh:
+                fh.write(states)
+            meta = {"keys": list(result), "created": time.time(),
+                    "metadata": [c.get_metadata() for c in clocks or []]}
+            with open(os.path.join(tmp, "meta.json"), "w", encoding="utf-8") as fh:
+                json.dump(meta, fh, default=repr)
+            _touch(os.path.join(tmp, _STAMP))
+            try:
+                os.rename(tmp, self._path(key))
+            except OSError:  # another process stored the same key first
+                shutil.rmtree(tmp, ignore_errors=True)
+        except BaseException:
+            shutil.rmtree(tmp, ignore_errors=True)
+            raise
+        self.evict(keep=key)
+
+    def evict(self, keep: Optional[str] = None) -> List[str]:
+        """Drop least recently used entries until within max_bytes."""
+        entries = []
+        for key in self.keys():
+            stamp = os.path.join(self._path(key), _STAMP)
+            try:
+                with open(stamp, encoding="ascii") as fh:
+                    last = int(fh.read() or 0)
+            except (OSError, ValueError):
+                last = 0
+            entries.append((last, key, self._entry_size(key)))
+        total = sum(size for _, _, size in entries)
+        removed = []
+        for _, key, size in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            shutil.rmtree(self._path(key), ignore_errors=True)
+            total -= size
+            removed.append(key)
+        return removed
+
+    def clear(self) -> None:
+        for key in self.keys():
+            shutil.rmtree(self._path(key), ignore_errors=True)
+
+    def run_clocks(self, clocks: List[Clock], duration: float, dt: float) -> Dict[str, np.ndarray]:
+        """analysis.run_clocks through the cache.
+
+        A hit returns read-only memory-mapped arrays (a miss returns the
+        writable arrays of the fresh run) and leaves the clocks in the state
+        a fresh run would have left them in. Clocks whose get_state() cannot
+        be stored as JSON and arrays, or whose state cannot be fingerprinted,
+        are run but not cached.
+        """
+        try:
+            key = result_key(clocks, duration, dt)
+        except TypeError:
+            return run_clocks(clocks, duration, dt)
+        hit = self.get(key, clocks)
+        if hit is not None:
+            return hit
+        result = run_clocks(clocks, duration, dt)
+        try:
+            self.put(key, result, clocks)
+        except (TypeError, ValueError):
+            pass
+        return result
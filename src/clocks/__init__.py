@@ -4,10 +4,16 @@ from .ideal import IdealClock
 from .noisy import NoisyOscillatorClock
 from .random_walk import RandomWalkFreqClock
 from .flicker_like import FlickerLikeFreqClock
+from .power_law import PowerLawNoiseClock
+from .ensemble import ClockEnsemble
+from .correlated import CorrelatedNoise
 
 __all__ = [
     "IdealClock",
     "NoisyOscillatorClock",
     "RandomWalkFreqClock",
     "FlickerLikeFreqClock",
+    "PowerLawNoiseClock",
+    "ClockEnsemble",
+    "CorrelatedNoise",
 ]
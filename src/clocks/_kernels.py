@@ -0,0 +1,60 @@
+"""Vectorized block kernels shared by the built-in clock models.
+
+Every helper works along the last axis, so the same code advances a single
+clock (1-D arrays) or a stack of clocks (2-D, one row per clock). Each one
+reproduces the corresponding per-tick recurrence bit-for-bit: running sums
+are sequential ``np.cumsum`` calls and the IIR recursion keeps the operand
+order of ``tick``.
+"""
+from __future__ import annotations
+
+import numpy as np
+
+
+def integrate_elapsed(elapsed0, y, dt: float) -> np.ndarray:
+    """Readings after each step of ``e_k = e_{k-1} + dt * (1 + y_k)``.
+
+    ``elapsed0`` is the reading before the block (scalar, or shape
+    ``y.shape[:-1]``). Returns a new array shaped like ``y``.
+    """
+    out = dt * (1.0 + np.asarray(y, dtype=float))
+    out[..., 0] += elapsed0
+    np.cumsum(out, axis=-1, out=out)
+    return out
+
+
+def random_walk(y0, steps) -> np.ndarray:
+    """Random-walk states ``y_k = y_{k-1} + steps_k`` starting from ``y0``."""
+    out = np.array(steps, dtype=float)
+    out[..., 0] += y0
+    np.cumsum(out, axis=-1, out=out)
+    return out
+
+
+def iir_lowpass(y0, x, a) -> np.ndarray:
+    """First-order IIR states ``y_k = (1 - a) * y_{k-1} + a * x_k``.
+
+    ``a`` and ``y0`` are scalars or one value per row of ``x``. Uses
+    ``scipy.signal.lfilter`` (one call per distinct row coefficient) when
+    available, otherwise loops over time steps vectorized across rows.
+    """
+    x = np.asarray(x, dtype=float)
+    rows = x.reshape(-1, x.shape[-1])
+    a_rows = np.broadcast_to(np.asarray(a, dtype=float), rows.shape[:1])
+    y0_rows = np.broadcast_to(np.asarray(y0, dtype=float), rows.shape[:1])
+    out = np.empty_like(rows)
+    try:
+        from scipy.signal import lfilter
+    except ImportError:  # pragma: no cover - scipy ships with requirements.txt
+        y = np.array(y0_rows)
+        for k in range(rows.shape[-1]):
+            y = (1.0 - a_rows) * y + a_rows * rows[:, k]
+            out[:, k] = y
+        return out.reshape(x.shape)
+
+    for coef in np.unique(a_rows):
+        sel = a_rows == coef
+        # Direct form II transposed: y_k = a * x_k + z, z = (1 - a) * y_k.
+        zi = ((1.0 - coef) * y0_rows[sel])[:, None]
+        out[sel], _ = lfilter([coef], [1.0, -(1.0 - coef)], rows[sel], axis=-1, zi=zi)
+    return out.reshape(x.shape)
@@ -0,0 +1,191 @@
+"""Correlated fractional-frequency noise shared by several clocks.
+
+``CorrelatedNoise(matrix, seed)`` factors an N x N correlation (or
+covariance) matrix once and produces correlated standard normals for N
+channels, one (N, block) matrix multiply per block. ``channel(i)`` returns
+the generator-like object that the i-th clock draws from. Pass it as
+``noise=`` to NoisyOscillatorClock, RandomWalkFreqClock or
+FlickerLikeFreqClock. The clock still applies its own sigma, so only the
+correlation structure comes from the matrix. ClockEnsemble takes the
+matrix directly (``correlation=``) and correlates its members' draws.
+
+Factors are cached per matrix content (correlation_factor), so repeated
+runs and seeds reuse one factorization.
+"""
+from __future__ import annotations
+
+import hashlib
+import weakref
+from collections import OrderedDict
+from typing import Any, Dict, List
+
+import numpy as np
+
+_FACTOR_CACHE: "OrderedDict[tuple, np.ndarray]" = OrderedDict()
+_FACTOR_CACHE_SIZE = 16
+
+
+def correlation_factor(matrix) -> np.ndarray:
+    """Read-only L with L @ L.T equal to the correlation matrix of ``matrix``.
+
+    A covariance matrix is normalized to its correlation matrix first.
+    Cholesky is used when the matrix is positive definite, an eigen
+    decomposition when it is only semi-definite (e.g. perfectly correlated
+    clocks). Results are cached per matrix content.
+    """
+    m = np.asarray(matrix, dtype=float)
+    if m.ndim != 2 or m.shape[0] != m.shape[1]:
+        raise ValueError("matrix must be square")
+    key = (m.shape, hashlib.sha256(np.ascontiguousarray(m).tobytes()).hexdigest())
+    cached = _FACTOR_CACHE.get(key)
+    if cached is not None:
+        _FACTOR_CACHE.move_to_end(key)
+        return cached
+    if not np.allclose(m, m.T, rtol=1e-10, atol=0.0):
+        raise ValueError("matrix must be symmetric")
+    d = np.sqrt(np.diag(m))
+    if np.any(d <= 0):
+        raise ValueError("matrix diagonal must be positive")
+    corr = m / np.outer(d, d)
+    try:
+        factor = np.linalg.cholesky(corr)
+    except np.linalg.LinAlgError:
+        w, v = np.linalg.eigh(corr)
+        if w.min() < -1e-10 * max(w.max(), 1.0):
+            raise ValueError("matrix must be positive semi-definite") from None
+        factor = v * np.sqrt(np.clip(w, 0.0, None))
+    factor.setflags(write=False)
+    _FACTOR_CACHE[key] = factor
+    if len(_FACTOR_CACHE) > _FACTOR_CACHE_SIZE:
+        _FACTOR_CACHE.popitem(last=False)
+    return factor
+
+
+class CorrelatedNoise:
+    """Correlated standard normals for N channels drawn block by block.
+
+    Parameters
+    ----------
+    matrix : (N, N) array-like
+        Correlation or covariance matrix of the clocks' frequency noise.
+    seed : int | None
+        Seed of the single generator driving all channels.
+    block_size : int
+        Minimum number of columns generated per matrix multiply.
+
+    Columns are kept until every live channel has read them, so channels
+    should be advanced together (as run_clocks does). Channels no longer
+    referenced (e.g. the siblings left behind when one clock is copied) stop
+    holding columns back. Copying one clock copies its source; copy
+    correlated clocks together (core.fork_clocks or copy.deepcopy of the
+    list) to keep them correlated.
+    """
+
+    def __init__(self, matrix, seed=0, block_size: int = 1 << 14) -> None:
+        self._factor = correlation_factor(matrix)
+        self._n = self._factor.shape[0]
+        self._block = max(1, int(block_size))
+        self._rng = np.random.default_rng(seed)
+        self._buf = np.empty((self._n, 0))
+        self._start = 0  # global column index of _buf[:, 0]
+        self._pos = [0] * self._n
+        self._live: "weakref.WeakSet[NoiseChannel]" = weakref.WeakSet()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = dict(self.__dict__)
+        del state["_live"]  # channels re-register when they are copied or unpickled
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._live = weakref.WeakSet()
+
+    @property
+    def n_channels(self) -> int:
+        return self._n
+
+    def channel(self, i: int) -> "NoiseChannel":
+        if not 0 <= int(i) < self._n:
+            raise ValueError(f"channel index out of range: {i}")
+        return NoiseChannel(self, int(i))
+
+    def channels(self) -> List["NoiseChannel"]:
+        return [NoiseChannel(self, i) for i in range(self._n)]
+
+    def _take(self, i: int, n: int) -> np.ndarray:
+        if self._pos[i] < self._start:
+            raise ValueError(f"channel {i} fell behind columns already discarded; keep its clock alive")
+        end = self._pos[i] + n
+        have = self._start + self._buf.shape[1]
+        if end > have:
+            k = max(end - have, self._block)
+            # column-major draws: column j is the same for any block split
+            fresh = self._factor @ self._rng.standard_normal((k, self._n)).T
+            self._buf = np.concatenate((self._buf, fresh), axis=1)
+        lo = self._pos[i] - self._start
+        out = self._buf[i, lo:lo + n].copy()
+        self._pos[i] = end
+        drop = min(self._pos[ch._index] for ch in self._live) - self._start
+        if drop > 0:
+            self._buf = self._buf[:, drop:]
+            self._start += drop
+        return out
+
+    def cache_key(self) -> Dict[str, Any]:
+        """Value identity of the source for cache.result_key: factor, block size and state."""
+        return {"factor": self._factor, "block_size": self._block, **self.get_state()}
+
+    def get_state(self) -> Dict[str, Any]:
+        return {"rng": self._rng.bit_generator.state, "buf": self._buf.copy(), "start": self._start, "pos": list(self._pos)}
+
+    def set_state(self, state: Dict[str, Any]) -> None:
+        self._rng.bit_generator.state = state["rng"]
+        self._buf = np.array(state["buf"], dtype=float).reshape(self._n, -1)
+        self._start = int(state["start"])
+        self._pos = [int(p) for p in state["pos"]]
+
+
+class NoiseChannel:
+    """Channel i of a CorrelatedNoise, usable where a clock expects its Generator.
+
+    Implements the subset of numpy.random.Generator the built-in clocks use
+    (normal, standard_normal, spawn, bit_generator.state). The state covers
+    the whole shared source, so restoring any one channel rewinds all of
+    them; the clocks sharing a source are checkpointed together.
+    """
+
+    def __init__(self, source: CorrelatedNoise, index: int) -> None:
+        self._source = source
+        self._index = index
+        source._live.add(self)
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._source._live.add(self)
+
+    def standard_normal(self, size=None, out=None):
+        n = 1 if size is None and out is None else int(np.prod(size if out is None else out.shape))
+        z = self._source._take(self._index, n)
+        if out is not None:
+            out[...] = z.reshape(out.shape)
+            return out
+        return float(z[0]) if size is None else z.reshape(size)
+
+    def normal(self, loc=0.0, scale=1.0, size=None):
+        return loc + scale * self.standard_normal(size)
+
+    def spawn(self, n_children: int) -> List[np.random.Generator]:
+        """Independent (uncorrelated) generators, e.g. for independent forks."""
+        return self._source._rng.spawn(n_children)
+
+    @property
+    def bit_generator(self) -> "NoiseChannel":
+        return self
+
+    @property
+    def state(self) -> Dict[str, Any]:
+        return self._source.get_state()
+
+    @state.setter
+    def state(self, value: Dict[str, Any]) -> None:
+        self._source.set_state(value)
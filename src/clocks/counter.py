@@ -0,0 +1,201 @@
+"""Counter-based (step-addressable) noise and segment-affine integration.
+
+Clocks built with ``rng="counter"`` draw the standard normal for step k
+directly from (seed, k) using the Philox counter-based generator and a
+Box-Muller transform (two 64-bit words per step), so any step range can be
+regenerated without replaying earlier steps.
+
+To let disjoint time segments be simulated independently and stitched
+bit-for-bit, counter-mode clocks integrate on a fixed grid of
+SEGMENT_STEPS-step segments. Inside segment j the frequency and elapsed
+time are affine in the segment's starting state (Y_j, E_j):
+
+    y_k = P_k * Y_j + Ly_k
+    e_k = ((E_j + T_k) + Y_j * G_k) + CLy_k
+
+where Ly (frequency from a zero start), P (decay of the start state),
+T = cumsum(dt), G = cumsum(dt * P) and CLy = cumsum(dt * Ly) depend only on
+the segment's own noise. The state passed to segment j + 1 is the last
+(e, y) of segment j, so a scan over per-segment summaries reproduces the
+serial boundary states exactly.
+"""
+from __future__ import annotations
+
+from typing import Callable, Dict, Tuple
+
+import numpy as np
+
+SEGMENT_STEPS = 1 << 16
+
+# local frequency model: (ly0, p0, x) -> (Ly, P) along the last axis
+LocalModel = Callable[[float, float, np.ndarray], Tuple[np.ndarray, np.ndarray]]
+
+_TWO_PI = 2.0 * np.pi
+_INV_2_53 = 1.0 / 9007199254740992.0
+
+
+class CounterNormal:
+    """Standard normals z_k = f(seed, k) from Philox + Box-Muller."""
+
+    def __init__(self, seed=0) -> None:
+        seq = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+        self._seq = seq
+        self._key = seq.generate_state(2, dtype=np.uint64)
+
+    def spawn(self) -> "CounterNormal":
+        """Independent generator seeded from the next child of this seed."""
+        return CounterNormal(self._seq.spawn(1)[0])
+
+    def normals(self, k0: int, n: int) -> np.ndarray:
+        """Return z_{k0}, ..., z_{k0 + n - 1}."""
+        k0 = int(k0)
+        n = int(n)
+        if n <= 0:
+            return np.empty(0, dtype=float)
+        skip = 2 * (k0 % 2)
+        bitgen = np.random.Philox(key=self._key, counter=[k0 // 2, 0, 0, 0])
+        words = bitgen.random_raw(skip + 2 * n)[skip:].reshape(n, 2) >> np.uint64(11)
+        u1 = (words[:, 0] + 1.0) * _INV_2_53  # (0, 1]
+        u2 = words[:, 1] * _INV_2_53  # [0, 1)
+        return np.sqrt(-2.0 * np.log(u1)) * np.cos(_TWO_PI * u2)
+
+
+def white_model(ly0: float, p0: float, x: np.ndarray):
+    """Frequency is the scaled noise itself; no state carries over."""
+    return x, np.zeros_like(x)
+
+
+def random_walk_model(ly0: float, p0: float, x: np.ndarray):
+    out = np.array(x, dtype=float)
+    out[0] += ly0
+    np.cumsum(out, out=out)
+    return out, np.ones_like(out)
+
+
+class IIRModel:
+    """First-order IIR y_k = (1 - a) * y_{k-1} + a * x_k (picklable)."""
+
+    def __init__(self, a: float) -> None:
+        self.a = float(a)
+
+    def __call__(self, ly0: float, p0: float, x: np.ndarray):
+        from ._kernels import iir_lowpass
+        decay = np.full(x.shape, 1.0 - self.a)
+        decay[0] *= p0
+        return iir_lowpass(ly0, x, self.a), np.cumprod(decay)
+
+
+def _start_with(values: np.ndarray, start: float) -> np.ndarray:
+    values[0] += start
+    return np.cumsum(values, out=values)
+
+
+class CounterIntegrator:
+    """Counter-based noise plus segment-affine state for one clock."""
+
+    def __init__(self, seed, model: LocalModel) -> None:
+        self._noise = CounterNormal(seed)
+        self._model = model
+        self.step = 0  # global step index of the next tick
+        self.elapsed = 0.0  # E_j
+        self.y0 = 0.0  # Y_j
+        self.y = 0.0  # current frequency
+        self.last_reading = 0.0  # reading after the latest advance
+        self._reset_local()
+
+    def _reset_local(self) -> None:
+        self._ly = 0.0
+        self._p = 1.0
+        self._t = 0.0
+        self._g = 0.0
+        self._c = 0.0
+
+    def seek(self, step: int, elapsed: float, y: float) -> None:
+        """Place the state at a segment boundary (step % SEGMENT_STEPS == 0)."""
+        if int(step) % SEGMENT_STEPS:
+            raise ValueError("seek target must be a multiple of SEGMENT_STEPS")
+        self.step = int(step)
+        self.elapsed = float(elapsed)
+        self.y0 = self.y = float(y)
+        self._reset_local()
+
+    def spawn_noise(self, parent: "CounterIntegrator") -> None:
+        """Switch to a child noise stream of parent's (independent forks)."""
+        self._noise = parent._noise.spawn()
+
+    def get_state(self) -> Dict[str, float]:
+        return {
+            "step": self.step, "elapsed": self.elapsed, "y0": self.y0, "y": self.y,
+            "ly": self._ly, "p": self._p, "t": self._t, "g": self._g, "c": self._c,
+        }
+
+    def set_state(self, state: Dict[str, float]) -> None:
+        self.step = int(state["step"])
+        self.elapsed, self.y0, self.y = float(state["elapsed"]), float(state["y0"]), float(state["y"])
+        self._ly, self._p, self._t = float(state["ly"]), float(state["p"]), float(state["t"])
+        self._g, self._c = float(state["g"]), float(state["c"])
+
+    def _local(self, x: np.ndarray, dt: float) -> Dict[str, np.ndarray]:
+        ly, p = self._model(self._ly, self._p, x)
+        t = _start_with(np.full(x.shape, dt), self._t)
+        g = _start_with(dt * p, self._g)
+        c = _start_with(dt * ly, self._c)
+        return {"Ly": ly, "P": p, "T": t, "G": g, "CLy": c}
+
+    def advance(self, n_steps: int, scale: float, dt: float, frequency: bool = False) -> np.ndarray:
+        """Tick n_steps times with noise scale [y units]; return elapsed readings.
+
+        With frequency=True the per-step frequencies y_k are returned instead;
+        the last reading is left in ``last_reading`` either way.
+        """
+        out = np.empty(int(n_steps), dtype=float)
+        freq = np.empty(out.size) if frequency else None
+        i = 0
+        while i < out.size:
+            room = SEGMENT_STEPS - self.step % SEGMENT_STEPS
+            m = min(room, out.size - i)
+            loc = self._local(scale * self._noise.normals(self.step, m), dt)
+            out[i:i + m] = ((self.elapsed + loc["T"]) + self.y0 * loc["G"]) + loc["CLy"]
+            if frequency:
+                freq[i:i + m] = loc["P"] * self.y0 + loc["Ly"]
+            self.y = float(loc["P"][-1] * self.y0 + loc["Ly"][-1])
+            self._ly, self._p = float(loc["Ly"][-1]), float(loc["P"][-1])
+            self._t, self._g, self._c = float(loc["T"][-1]), float(loc["G"][-1]), float(loc["CLy"][-1])
+            self.step += m
+            i += m
+            if m == room:
+                self.seek(self.step, out[i - 1], self.y)
+        if out.size:
+            self.last_reading = float(out[-1])
+        return freq if frequency else out
+
+    def summary(self, segment: int, n_steps: int, scale: float, dt: float) -> Tuple[float, ...]:
+        """(T, Ly, P, G, CLy) after n_steps of segment ``segment`` from its start.
+
+        Depends only on (seed, segment); does not touch the current state.
+        """
+        saved = (self._ly, self._p, self._t, self._g, self._c)
+        self._reset_local()
+        x = scale * self._noise.normals(int(segment) * SEGMENT_STEPS, n_steps)
+        loc = self._local(x, dt)
+        self._ly, self._p, self._t, self._g, self._c = saved
+        return tuple(float(loc[k][-1]) for k in ("T", "Ly", "P", "G", "CLy"))
+
+
+def scan_boundaries(summaries, elapsed0: float, y0: float):
+    """Boundary states (E_j, Y_j) for consecutive segment summaries."""
+    states = [(float(elapsed0), float(y0))]
+    e, y = states[0]
+    for t, ly, p, g, c in summaries:
+        e, y = ((e + t) + y * g) + c, p * y + ly
+        states.append((e, y))
+    return states
+
+
+def make_integrator(rng: str, seed, model: LocalModel):
+    """CounterIntegrator for rng='counter', None for the default 'sequential'."""
+    if rng == "sequential":
+        return None
+    if rng == "counter":
+        return CounterIntegrator(seed, model)
+    raise ValueError(f"Unknown rng mode: {rng!r} (expected 'sequential' or 'counter')")
@@ -0,0 +1,212 @@
+"""ClockEnsemble: many same-model clocks held as NumPy arrays."""
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional, Type, Union
+
+import numpy as np
+
+from ..core import Clock, ClockSnapshot
+from .correlated import correlation_factor
+from ._kernels import iir_lowpass, integrate_elapsed, random_walk
+from .flicker_like import FlickerLikeFreqClock
+from .noisy import NoisyOscillatorClock
+from .random_walk import RandomWalkFreqClock
+
+# Noise values (members x steps) drawn per sub-block of advance(), the
+# ensemble counterpart of analysis._BLOCK_STEPS.
+_BLOCK_VALUES = 1 << 16
+
+# model class -> (parameter names, defaults); parameters broadcast per member
+_MODELS: Dict[Type[Clock], Dict[str, float]] = {
+    NoisyOscillatorClock: {"sigma_y": 1e-12},
+    RandomWalkFreqClock: {"sigma_rw": 1e-14},
+    FlickerLikeFreqClock: {"sigma_w": 5e-12, "a": 1e-3},
+}
+
+
+class ClockEnsemble:
+    """M clocks of one built-in noise model advanced as one (M, n) array.
+
+    Batched sibling of the Clock interface: ``read_time()`` returns an
+    (M,) array and ``advance(n_steps, dt)`` an (M, n_steps) array. Member i
+    draws from its own generator seeded with the i-th child of
+    ``SeedSequence(seed)``, so it reproduces the standalone clock returned
+    by ``member_clock(i)`` bit-for-bit.
+
+    Parameters
+    ----------
+    model : type or str
+        NoisyOscillatorClock, RandomWalkFreqClock or FlickerLikeFreqClock
+        (class or class name).
+    n_members : int
+        Number of clocks M.
+    seed : int | None
+        Parent seed; member seeds are spawned from it.
+    correlation : (M, M) array-like | None
+        Correlation (or covariance) matrix of the members' frequency noise.
+        Each block of independent member draws is multiplied by its cached
+        factor (clocks.correlated.correlation_factor); members are then no
+        longer equivalent to member_clock(i).
+    **params
+        Model parameters (e.g. sigma_y=...), scalar or one value per member.
+    """
+
+    def __init__(
+        self,
+        model: Union[Type[Clock], str],
+        n_members: int,
+        seed: Optional[int] = 0,
+        correlation=None,
+        **params: Any,
+    ) -> None:
+        if isinstance(model, str):
+            by_name = {cls.__name__: cls for cls in _MODELS}
+            if model not in by_name:
+                raise ValueError(f"Unknown ensemble model: {model}")
+            model = by_name[model]
+        if model not in _MODELS:
+            raise ValueError(f"Unsupported ensemble model: {model!r}")
+        n_members = int(n_members)
+        if n_members <= 0:
+            raise ValueError("n_members must be > 0")
+        defaults = _MODELS[model]
+        unknown = set(params) - set(defaults)
+        if unknown:
+            raise ValueError(f"Unknown parameters for {model.__name__}: {sorted(unknown)}")
+
+        self._model = model
+        self._n = n_members
+        self._params = {
+            name: np.broadcast_to(np.asarray(params.get(name, default), dtype=float), (n_members,)).copy()
+            for name, default in defaults.items()
+        }
+        if "a" in self._params and np.any((self._params["a"] <= 0.0) | (self._params["a"] >= 1.0)):
+            raise ValueError("a must be between 0 and 1")
+        self._seed = seed
+        self._member_seeds = np.random.SeedSequence(seed).spawn(n_members)
+        self._rngs = [np.random.default_rng(s) for s in self._member_seeds]
+        self._factor = None
+        if correlation is not None:
+            self._factor = correlation_factor(correlation)
+            if self._factor.shape != (n_members, n_members):
+                raise ValueError("correlation must be (n_members, n_members)")
+        self._elapsed_time = np.zeros(n_members)
+        self._y = np.zeros(n_members)
+
+    @property
+    def n_members(self) -> int:
+        return self._n
+
+    def __len__(self) -> int:
+        return self._n
+
+    @property
+    def member_seeds(self) -> List[np.random.SeedSequence]:
+        """Per-member seed sequences derived from the parent seed."""
+        return list(self._member_seeds)
+
+    def member_clock(self, i: int) -> Clock:
+        """Fresh standalone clock equivalent to member i (state at t0)."""
+        kwargs = {name: float(values[i]) for name, values in self._params.items()}
+        return self._model(seed=self._member_seeds[i], **kwargs)
+
+    def _standard_normal(self, n_steps: int) -> np.ndarray:
+        z = np.empty((self._n, n_steps))
+        for rng, row in zip(self._rngs, z):
+            rng.standard_normal(out=row)
+        if self._factor is not None:
+            z = self._factor @ z
+        return z
+
+    def tick(self, dt: float) -> None:
+        self.advance(1, dt)
+
+    def read_time(self) -> np.ndarray:
+        return self._elapsed_time.copy()
+
+    def advance(self, n_steps: int, dt: float) -> np.ndarray:
+        """Tick all members n_steps times; return (M, n_steps) readings."""
+        return self._advance(n_steps, dt, frequency=False)
+
+    def advance_frequency(self, n_steps: int, dt: float) -> np.ndarray:
+        """Tick like advance(); return the (M, n_steps) member frequencies."""
+        return self._advance(n_steps, dt, frequency=True)
+
+    def _advance(self, n_steps: int, dt: float, frequency: bool) -> np.ndarray:
+        dt = float(dt)
+        n_steps = int(n_steps)
+        if n_steps <= 0:
+            return np.empty((self._n, 0), dtype=float)
+        if dt <= 0.0:
+            if frequency:
+                return np.zeros((self._n, n_steps))
+            return np.repeat(self._elapsed_time[:, None], n_steps, axis=1)
+        block = max(1, _BLOCK_VALUES // self._n)
+        if n_steps <= block:
+            return self._advance_block(n_steps, dt, frequency)
+        # bounded (M, block) noise temporaries; the draws and sums run in the
+        # same order as one block, so the result is unchanged
+        out = np.empty((self._n, n_steps))
+        for k0 in range(0, n_steps, block):
+            k1 = min(k0 + block, n_steps)
+            out[:, k0:k1] = self._advance_block(k1 - k0, dt, frequency)
+        return out
+
+    def _advance_block(self, n_steps: int, dt: float, frequency: bool) -> np.ndarray:
+        z = self._standard_normal(n_steps)
+        p = self._params
+        # Same scale expressions as the single-clock models (bit-identical draws).
+        if self._model is NoisyOscillatorClock:
+            y = z * (p["sigma_y"] / (dt ** 0.5))[:, None]
+        elif self._model is RandomWalkFreqClock:
+            y = random_walk(self._y, z * (p["sigma_rw"] * np.sqrt(dt))[:, None])
+            self._y = y[:, -1].copy()
+        else:
+            y = iir_lowpass(self._y, z * (p["sigma_w"] / np.sqrt(dt))[:, None], p["a"])
+            self._y = y[:, -1].copy()
+        out = integrate_elapsed(self._elapsed_time, y, dt)
+        self._elapsed_time = out[:, -1].copy()
+        return y if frequency else out
+
+    def get_state(self) -> Dict[str, Any]:
+        """Per-member elapsed time, frequency state and RNG positions."""
+        return {
+            "elapsed_time": self._elapsed_time.copy(),
+            "y": self._y.copy(),
+            "rngs": [rng.bit_generator.state for rng in self._rngs],
+        }
+
+    def set_state(self, state: Dict[str, Any]) -> None:
+        elapsed = np.asarray(state["elapsed_time"], dtype=float)
+        if elapsed.shape != (self._n,) or len(state["rngs"]) != self._n:
+            raise ValueError("state does not match the number of members")
+        self._elapsed_time = elapsed.copy()
+        self._y = np.asarray(state["y"], dtype=float).copy()
+        for rng, rng_state in zip(self._rngs, state["rngs"]):
+            rng.bit_generator.state = rng_state
+
+    def snapshot(self) -> ClockSnapshot:
+        """Capture the current state for a later restore()."""
+        return ClockSnapshot(clock_type="ClockEnsemble", state=self.get_state())
+
+    def restore(self, snapshot: ClockSnapshot) -> None:
+        if snapshot.clock_type != "ClockEnsemble":
+            raise ValueError(f"snapshot of {snapshot.clock_type} cannot restore ClockEnsemble")
+        self.set_state(snapshot.state)
+
+    def fork_streams(self, child: Clock) -> None:
+        child._rngs = [rng.spawn(1)[0] for rng in self._rngs]
+
+    def get_uncertainty(self) -> np.ndarray:
+        name = next(iter(_MODELS[self._model]))
+        return self._params[name].copy()
+
+    def get_metadata(self) -> Dict[str, Any]:
+        return {
+            "type": "ClockEnsemble",
+            "description": f"{self._n} x {self._model.__name__}",
+            "model": self._model.__name__,
+            "n_members": self._n,
+            "seed": self._seed,
+            **{name: values.tolist() for name, values in self._params.items()},
+        }
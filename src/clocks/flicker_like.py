@@ -1,33 +1,112 @@
 """Flicker-like fractional-frequency noise clock using a simple IIR model."""
 from __future__ import annotations
 
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Tuple
 
 import numpy as np
 
 from ..core import Clock
+from .counter import IIRModel, make_integrator
+from ._kernels import iir_lowpass, integrate_elapsed
 
 
 class FlickerLikeFreqClock(Clock):
-    """Clock with low-order IIR flicker-like fractional-frequency noise."""
+    """Clock with low-order IIR flicker-like fractional-frequency noise.
 
-    def __init__(self, sigma_w: float = 5e-12, a: float = 1e-3, seed: Optional[int] = 0) -> None:
+    rng="counter" switches to step-addressable Philox noise (see clocks.counter). Passing
+    noise=CorrelatedNoise(...).channel(i) draws correlated noise shared with
+    other clocks (see clocks.correlated).
+    """
+
+    def __init__(
+        self, sigma_w: float = 5e-12, a: float = 1e-3, seed: Optional[int] = 0, rng: str = "sequential",
+        noise=None,
+    ) -> None:
         if not 0.0 < a < 1.0:
             raise ValueError("a must be between 0 and 1")
         self._elapsed_time = 0.0
         self._y = 0.0
         self._sigma_w = float(sigma_w)
         self._a = float(a)
-        self._rng = np.random.default_rng(seed)
+        if noise is not None and rng != "sequential":
+            raise ValueError("noise= (a correlated channel) requires rng='sequential'")
+        self._rng = np.random.default_rng(seed) if noise is None else noise
+        self._counter = make_integrator(rng, seed, IIRModel(self._a))
 
     def tick(self, dt: float) -> None:
         dt = float(dt)
         if dt <= 0.0:
             return
+        if self._counter is not None:
+            self._advance_counter(1, dt)
+            return
         n = self._rng.normal(0.0, self._sigma_w / np.sqrt(dt))
         self._y = (1.0 - self._a) * self._y + self._a * n
         self._elapsed_time += dt * (1.0 + self._y)
 
+    def advance(self, n_steps: int, dt: float) -> np.ndarray:
+        return self._advance(n_steps, dt, frequency=False)
+
+    def advance_frequency(self, n_steps: int, dt: float) -> np.ndarray:
+        return self._advance(n_steps, dt, frequency=True)
+
+    def _advance(self, n_steps: int, dt: float, frequency: bool) -> np.ndarray:
+        dt = float(dt)
+        n_steps = int(n_steps)
+        if n_steps <= 0:
+            return np.empty(0, dtype=float)
+        if dt <= 0.0:
+            return np.zeros(n_steps) if frequency else np.full(n_steps, self._elapsed_time)
+        if self._counter is not None:
+            return self._advance_counter(n_steps, dt, frequency)
+        n = self._rng.normal(0.0, self._sigma_w / np.sqrt(dt), size=n_steps)
+        y = iir_lowpass(self._y, n, self._a)
+        out = integrate_elapsed(self._elapsed_time, y, dt)
+        self._y = float(y[-1])
+        self._elapsed_time = float(out[-1])
+        return y if frequency else out
+
+    def _advance_counter(self, n_steps: int, dt: float, frequency: bool = False) -> np.ndarray:
+        out = self._counter.advance(n_steps, self._sigma_w / np.sqrt(dt), dt, frequency)
+        self._elapsed_time = self._counter.last_reading
+        self._y = self._counter.y
+        return out
+
+    def segment_summary(self, segment: int, n_steps: int, dt: float):
+        """Counter mode: end-of-segment terms (see clocks.counter)."""
+        return self._counter.summary(segment, n_steps, self._sigma_w / np.sqrt(float(dt)), float(dt))
+
+    def segment_state(self) -> Optional[Tuple[int, float, float]]:
+        """Counter mode: (next step, elapsed, frequency) as taken by seek(); None otherwise."""
+        if self._counter is None:
+            return None
+        return self._counter.step, self._elapsed_time, self._counter.y
+
+    def seek(self, step: int, elapsed: float, y: float = 0.0) -> None:
+        """Counter mode: jump to a segment boundary with the given state."""
+        self._counter.seek(step, elapsed, y)
+        self._elapsed_time = float(elapsed)
+        self._y = float(y)
+
+    def get_state(self) -> Dict[str, Any]:
+        """Elapsed time, frequency state and RNG position (parameters excluded)."""
+        state = {"elapsed_time": self._elapsed_time, "y": self._y, "rng": self._rng.bit_generator.state}
+        if self._counter is not None:
+            state["counter"] = self._counter.get_state()
+        return state
+
+    def set_state(self, state: Dict[str, Any]) -> None:
+        self._elapsed_time = float(state["elapsed_time"])
+        self._y = float(state["y"])
+        self._rng.bit_generator.state = state["rng"]
+        if self._counter is not None:
+            self._counter.set_state(state["counter"])
+
+    def fork_streams(self, child: Clock) -> None:
+        child._rng = self._rng.spawn(1)[0]
+        if self._counter is not None:
+            child._counter.spawn_noise(self._counter)
+
     def read_time(self) -> float:
         return self._elapsed_time
 
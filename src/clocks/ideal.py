@@ -1,7 +1,9 @@
 """IdealClock: perfect timekeeper baseline for interface proof."""
 from __future__ import annotations
 from typing import Dict, Any
+import numpy as np
 from ..core import Clock
+from ._kernels import integrate_elapsed
 
 
 class IdealClock(Clock):
@@ -14,6 +16,27 @@ class IdealClock(Clock):
     def read_time(self) -> float:
         return self._elapsed_time
 
+    def advance(self, n_steps: int, dt: float) -> np.ndarray:
+        n_steps = int(n_steps)
+        if n_steps <= 0:
+            return np.empty(0, dtype=float)
+        out = integrate_elapsed(self._elapsed_time, np.zeros(n_steps), float(dt))
+        self._elapsed_time = float(out[-1])
+        return out
+
+    def advance_frequency(self, n_steps: int, dt: float) -> np.ndarray:
+        self.advance(n_steps, dt)
+        return np.zeros(max(int(n_steps), 0))
+
+    def get_state(self) -> Dict[str, Any]:
+        return {"elapsed_time": self._elapsed_time}
+
+    def set_state(self, state: Dict[str, Any]) -> None:
+        self._elapsed_time = float(state["elapsed_time"])
+
+    def fork_streams(self, child: Clock) -> None:
+        pass  # deterministic: nothing to re-seed
+
     def get_uncertainty(self) -> float:
         return 0.0
 
@@ -1,29 +1,101 @@
 """NoisyOscillatorClock: white fractional-frequency noise y ~ N(0, sigma_y) at τ=1 s."""
 from __future__ import annotations
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
 import numpy as np
 from ..core import Clock
+from .counter import white_model, make_integrator
+from ._kernels import integrate_elapsed
 
 
 class NoisyOscillatorClock(Clock):
     """Elapsed time integrates dt * (1 + y_k), where y_k ~ N(0, sigma_y / sqrt(dt)).
     Phase I: white frequency noise only, parameterized by sigma_y at τ=1 s.
-    Deterministic via NumPy Generator with seed.
+    Deterministic via NumPy Generator with seed; rng="counter" switches to
+    step-addressable Philox noise (see clocks.counter). Passing
+    noise=CorrelatedNoise(...).channel(i) draws correlated noise shared with
+    other clocks (see clocks.correlated).
     """
 
-    def __init__(self, sigma_y: float = 1e-12, seed: Optional[int] = 0) -> None:
+    def __init__(
+        self, sigma_y: float = 1e-12, seed: Optional[int] = 0, rng: str = "sequential",
+        noise=None,
+    ) -> None:
         self._elapsed_time: float = 0.0
         self._sigma_y = float(sigma_y)
-        self._rng = np.random.default_rng(seed)
+        if noise is not None and rng != "sequential":
+            raise ValueError("noise= (a correlated channel) requires rng='sequential'")
+        self._rng = np.random.default_rng(seed) if noise is None else noise
+        self._counter = make_integrator(rng, seed, white_model)
 
     def tick(self, dt: float) -> None:
         dt = float(dt)
         if dt <= 0:
             return
+        if self._counter is not None:
+            self._advance_counter(1, dt)
+            return
         std_y = self._sigma_y / (dt ** 0.5)  # scale to keep Allan @1s consistent (Phase I simplification)
         y = self._rng.normal(0.0, std_y)
         self._elapsed_time += dt * (1.0 + y)
 
+    def advance(self, n_steps: int, dt: float) -> np.ndarray:
+        return self._advance(n_steps, dt, frequency=False)
+
+    def advance_frequency(self, n_steps: int, dt: float) -> np.ndarray:
+        return self._advance(n_steps, dt, frequency=True)
+
+    def _advance(self, n_steps: int, dt: float, frequency: bool) -> np.ndarray:
+        dt = float(dt)
+        n_steps = int(n_steps)
+        if n_steps <= 0:
+            return np.empty(0, dtype=float)
+        if dt <= 0:
+            return np.zeros(n_steps) if frequency else np.full(n_steps, self._elapsed_time)
+        if self._counter is not None:
+            return self._advance_counter(n_steps, dt, frequency)
+        y = self._rng.normal(0.0, self._sigma_y / (dt ** 0.5), size=n_steps)
+        out = integrate_elapsed(self._elapsed_time, y, dt)
+        self._elapsed_time = float(out[-1])
+        return y if frequency else out
+
+    def _advance_counter(self, n_steps: int, dt: float, frequency: bool = False) -> np.ndarray:
+        out = self._counter.advance(n_steps, self._sigma_y / (dt ** 0.5), dt, frequency)
+        self._elapsed_time = self._counter.last_reading
+        return out
+
+    def segment_summary(self, segment: int, n_steps: int, dt: float):
+        """Counter mode: end-of-segment terms (see clocks.counter)."""
+        return self._counter.summary(segment, n_steps, self._sigma_y / (float(dt) ** 0.5), float(dt))
+
+    def segment_state(self) -> Optional[Tuple[int, float, float]]:
+        """Counter mode: (next step, elapsed, frequency) as taken by seek(); None otherwise."""
+        if self._counter is None:
+            return None
+        return self._counter.step, self._elapsed_time, self._counter.y
+
+    def seek(self, step: int, elapsed: float, y: float = 0.0) -> None:
+        """Counter mode: jump to a segment boundary with the given state."""
+        self._counter.seek(step, elapsed, y)
+        self._elapsed_time = float(elapsed)
+
+    def get_state(self) -> Dict[str, Any]:
+        """Elapsed time and RNG position (parameters excluded)."""
+        state = {"elapsed_time": self._elapsed_time, "rng": self._rng.bit_generator.state}
+        if self._counter is not None:
+            state["counter"] = self._counter.get_state()
+        return state
+
+    def set_state(self, state: Dict[str, Any]) -> None:
+        self._elapsed_time = float(state["elapsed_time"])
+        self._rng.bit_generator.state = state["rng"]
+        if self._counter is not None:
+            self._counter.set_state(state["counter"])
+
+    def fork_streams(self, child: Clock) -> None:
+        child._rng = self._rng.spawn(1)[0]
+        if self._counter is not None:
+            child._counter.spawn_noise(self._counter)
+
     def read_time(self) -> float:
         return self._elapsed_time
 
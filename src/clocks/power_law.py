@@ -0,0 +1,208 @@
+"""Power-law fractional-frequency noise clock (Kasdin–Walter FFT synthesis)."""
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from ..core import Clock
+from ._kernels import integrate_elapsed, random_walk
+
+
+def _white_variance(h_alpha: float, alpha: float, dt: float) -> float:
+    """Variance Q_d of the driving white noise for S_y(f) = h_alpha * f**alpha.
+
+    Kasdin & Walter (1992): the filtered sequence has one-sided PSD
+    2 Q_d dt (2 pi f dt)**alpha at low frequency.
+    """
+    return h_alpha / (2.0 * (2.0 * np.pi) ** alpha * dt ** (alpha + 1.0))
+
+
+def _kw_kernel(beta: float, length: int) -> np.ndarray:
+    """Impulse response of (1 - z^-1)^(-beta/2): h_0 = 1, h_k = h_{k-1} (beta/2 + k - 1) / k."""
+    k = np.arange(1, length, dtype=float)
+    return np.concatenate(([1.0], np.cumprod((0.5 * beta + k - 1.0) / k)))
+
+
+@lru_cache(maxsize=32)
+def _kernel_fft(beta: float, length: int, n_fft: int) -> np.ndarray:
+    """rfft of the length-``length`` kernel, cached per (beta, length, n_fft)."""
+    kernel = np.fft.rfft(_kw_kernel(beta, length), n_fft)
+    kernel.setflags(write=False)
+    return kernel
+
+
+def _n_fft(n: int) -> int:
+    return 1 << max(0, int(n - 1).bit_length())
+
+
+def _check_alpha(alpha: float) -> float:
+    alpha = float(alpha)
+    if not -2.0 <= alpha <= 2.0:
+        raise ValueError("alpha must be between -2 and 2")
+    return alpha
+
+
+def power_law_noise(n_samples: int, alpha: float, h_alpha: float = 1.0, dt: float = 1.0, seed=None) -> np.ndarray:
+    """Whole-trace fractional frequency with S_y(f) = h_alpha * f**alpha.
+
+    One FFT convolution of n_samples white normals with the full-length
+    Kasdin–Walter kernel, O(N log N). alpha = 0, -1, -2 give white, flicker
+    and random-walk FM; alpha = 1, 2 flicker and white PM.
+    """
+    alpha = _check_alpha(alpha)
+    n_samples = int(n_samples)
+    if n_samples <= 0:
+        return np.empty(0, dtype=float)
+    if dt <= 0:
+        raise ValueError("dt must be positive")
+    w = np.random.default_rng(seed).standard_normal(n_samples)
+    n_fft = _n_fft(2 * n_samples)
+    y = np.fft.irfft(np.fft.rfft(w, n_fft) * _kernel_fft(-alpha, n_samples, n_fft), n_fft)[:n_samples]
+    return y * np.sqrt(_white_variance(float(h_alpha), alpha, float(dt)))
+
+
+class PowerLawNoiseClock(Clock):
+    """Clock with h_alpha * f**alpha fractional-frequency noise, alpha in [-2, 2].
+
+    White normals are filtered by the Kasdin–Walter kernel of
+    (1 - z^-1)^(alpha/2) in blocks of ``block_size`` samples with FFT
+    overlap-save, so the stream is continuous across blocks. For alpha < -1
+    the filter is split into a short stationary kernel followed by a
+    running sum, which is carried exactly. For -1 <= alpha the kernel is
+    truncated to ``kernel_length`` taps (default block_size), which bounds
+    the memory of flicker FM (alpha = -1) to about kernel_length * dt.
+    power_law_noise generates a whole trace with the untruncated kernel.
+
+    Blocks are buffered in units of the driving noise and scaled by the
+    current dt on use, so tick/read_time and advance() return the same
+    readings for any split.
+    """
+
+    def __init__(
+        self,
+        h_alpha: float = 1e-24,
+        alpha: float = -1.0,
+        seed: Optional[int] = 0,
+        block_size: int = 1 << 16,
+        kernel_length: Optional[int] = None,
+    ) -> None:
+        self._alpha = _check_alpha(alpha)
+        if h_alpha < 0:
+            raise ValueError("h_alpha must be >= 0")
+        if int(block_size) < 1:
+            raise ValueError("block_size must be >= 1")
+        self._h_alpha = float(h_alpha)
+        self._block = int(block_size)
+        beta = -self._alpha
+        self._integrate = beta > 1.0
+        self._beta = beta - 2.0 if self._integrate else beta
+        self._taps = int(kernel_length) if kernel_length is not None else self._block
+        if self._taps < 1:
+            raise ValueError("kernel_length must be >= 1")
+        self._n_fft = _n_fft(self._block + self._taps - 1)
+        self._rng = np.random.default_rng(seed)
+        self._elapsed_time = 0.0
+        self._hist = np.zeros(self._taps - 1)  # white noise preceding the current block
+        self._white = np.empty(0)  # white noise of the current block
+        self._buf = np.empty(0)  # filtered unit-variance noise of the current block
+        self._pos = 0
+        self._carry = 0.0  # running-sum state before the current block (alpha < -1)
+
+    def _refill(self) -> None:
+        if self._buf.size:
+            self._hist = np.concatenate((self._hist, self._white))[self._white.size:]
+            if self._integrate:
+                self._carry = float(self._buf[-1])
+        w = self._rng.standard_normal(self._block)
+        x = np.concatenate((self._hist, w))
+        y = np.fft.irfft(np.fft.rfft(x, self._n_fft) * _kernel_fft(self._beta, self._taps, self._n_fft), self._n_fft)
+        y = y[self._taps - 1:self._taps - 1 + self._block]
+        self._white = w
+        self._buf = random_walk(self._carry, y) if self._integrate else y
+        self._pos = 0
+
+    def _unit_noise(self, n_steps: int) -> np.ndarray:
+        out = np.empty(n_steps)
+        i = 0
+        while i < n_steps:
+            if self._pos == self._buf.size:
+                self._refill()
+            m = min(n_steps - i, self._buf.size - self._pos)
+            out[i:i + m] = self._buf[self._pos:self._pos + m]
+            self._pos += m
+            i += m
+        return out
+
+    def tick(self, dt: float) -> None:
+        self.advance(1, dt)
+
+    def advance(self, n_steps: int, dt: float) -> np.ndarray:
+        return self._advance(n_steps, dt, frequency=False)
+
+    def advance_frequency(self, n_steps: int, dt: float) -> np.ndarray:
+        return self._advance(n_steps, dt, frequency=True)
+
+    def _advance(self, n_steps: int, dt: float, frequency: bool) -> np.ndarray:
+        dt = float(dt)
+        n_steps = int(n_steps)
+        if n_steps <= 0:
+            return np.empty(0, dtype=float)
+        if dt <= 0.0:
+            return np.zeros(n_steps) if frequency else np.full(n_steps, self._elapsed_time)
+        y = self._unit_noise(n_steps) * np.sqrt(_white_variance(self._h_alpha, self._alpha, dt))
+        out = integrate_elapsed(self._elapsed_time, y, dt)
+        self._elapsed_time = float(out[-1])
+        return y if frequency else out
+
+    def _rebase(self) -> None:
+        """Drop the unread part of the buffered block (history kept exact)."""
+        if not self._buf.size:
+            return
+        consumed = self._white[:self._pos]
+        self._hist = np.concatenate((self._hist, consumed))[consumed.size:]
+        if self._integrate and self._pos:
+            self._carry = float(self._buf[self._pos - 1])
+        self._white = np.empty(0)
+        self._buf = np.empty(0)
+        self._pos = 0
+
+    def get_state(self) -> Dict[str, Any]:
+        return {
+            "elapsed_time": self._elapsed_time,
+            "rng": self._rng.bit_generator.state,
+            "hist": self._hist.copy(),
+            "white": self._white.copy(),
+            "buf": self._buf.copy(),
+            "pos": self._pos,
+            "carry": self._carry,
+        }
+
+    def set_state(self, state: Dict[str, Any]) -> None:
+        self._elapsed_time = float(state["elapsed_time"])
+        self._rng.bit_generator.state = state["rng"]
+        self._hist = np.array(state["hist"], dtype=float)
+        self._white = np.array(state["white"], dtype=float)
+        self._buf = np.array(state["buf"], dtype=float)
+        self._pos = int(state["pos"])
+        self._carry = float(state["carry"])
+
+    def fork_streams(self, child: Clock) -> None:
+        child._rebase()
+        child._rng = self._rng.spawn(1)[0]
+
+    def read_time(self) -> float:
+        return self._elapsed_time
+
+    def get_uncertainty(self) -> float:
+        # Standard deviation of the driving noise at dt = 1 s.
+        return float(np.sqrt(_white_variance(self._h_alpha, self._alpha, 1.0)))
+
+    def get_metadata(self) -> Dict[str, Any]:
+        return {
+            "type": "PowerLawNoiseClock",
+            "description": "Power-law fractional-frequency noise (Kasdin-Walter FFT synthesis)",
+            "h_alpha": self._h_alpha,
+            "alpha": self._alpha,
+        }
@@ -2,14 +2,19 @@
 ClockSandbox core (Phase I)
 
 - Minimal Clock ABC (pure stdlib).
-- Thin Comparison dataclass delegating to analysis functions.
+- Thin Comparison dataclass delegating to analysis functions, plus
+  BufferComparison, a zero-copy variant over buffer-protocol data.
 - Units: seconds; epoch t0 = 0 s.
 - Readout = elapsed time since t0 (not cycles/radians).
 """
 from __future__ import annotations
+import copy
+import mmap
+import sys
+from array import array
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
-from typing import List, Dict, Any
+from typing import Any, Dict, List, Optional, Sequence
 
 
 class Clock(ABC):
@@ -21,6 +26,12 @@ class Clock(ABC):
     read_time(): return elapsed time [s] since t0.
     get_uncertainty(): return uncertainty [s] at τ=1 s (Phase I convention).
     get_metadata(): return descriptive metadata dict.
+    advance(n_steps, dt): optional block API; tick n_steps times and return
+        the reading after each tick.
+    get_state() / set_state(state): dynamic state (elapsed time, noise
+        state, RNG position) for checkpointing; parameters are not included.
+    snapshot() / restore(snap) / fork(independent): branch a simulation
+        from a shared warm-up.
     """
 
     @abstractmethod
@@ -43,6 +54,101 @@ class Clock(ABC):
         """Return human-readable metadata."""
         raise NotImplementedError
 
+    def advance(self, n_steps: int, dt: float) -> Sequence[float]:
+        """Tick n_steps times by dt [s]; return the n_steps readings.
+
+        Default steps tick()/read_time() one at a time. Subclasses may
+        override with a vectorized version, which must return exactly the
+        readings per-tick stepping would have produced.
+        """
+        readings = []
+        for _ in range(int(n_steps)):
+            self.tick(dt)
+            readings.append(self.read_time())
+        return readings
+
+    def advance_frequency(self, n_steps: int, dt: float) -> Sequence[float]:
+        """Tick like advance(); return the fractional frequency y_k of each tick.
+
+        Reading k is reading k-1 plus dt * (1 + y_k). The offset
+        representation (see offsets.py) integrates the time error from y
+        without forming the large readings. Default differences the readings
+        of advance(), which carries their rounding; built-in clocks return
+        the y they integrate.
+        """
+        prev = self.read_time()
+        freqs = []
+        for reading in self.advance(n_steps, dt):
+            freqs.append((reading - prev) / dt - 1.0 if dt > 0 else 0.0)
+            prev = reading
+        return freqs
+
+    def get_state(self) -> Dict[str, Any]:
+        """Return a picklable copy of the clock's dynamic state.
+
+        Default deep-copies the instance attributes; built-in clocks
+        override with an explicit state dict.
+        """
+        return copy.deepcopy(vars(self))
+
+    def set_state(self, state: Dict[str, Any]) -> None:
+        """Restore a state returned by get_state() on an equivalent clock."""
+        self.__dict__.update(copy.deepcopy(state))
+
+    def snapshot(self) -> "ClockSnapshot":
+        """Capture the current state for a later restore()."""
+        return ClockSnapshot(clock_type=type(self).__name__, state=self.get_state())
+
+    def restore(self, snapshot: "ClockSnapshot") -> None:
+        """Return to a state captured by snapshot() on this or an equivalent clock."""
+        if snapshot.clock_type != type(self).__name__:
+            raise ValueError(f"snapshot of {snapshot.clock_type} cannot restore {type(self).__name__}")
+        self.set_state(copy.deepcopy(snapshot.state))
+
+    def fork(self, independent: bool = False) -> "Clock":
+        """Return a copy of this clock at its current state.
+
+        independent=False: the copy continues the same random stream, so it
+        reproduces what this clock would draw next; this works for any
+        clock. independent=True: the copy draws from a fresh child stream
+        spawned from this clock's seed, so successive forks get distinct,
+        reproducible streams. That needs a ``fork_streams(child)`` method,
+        which gives the fresh copy its own stream; the built-in clocks
+        define it (deterministic ones as a no-op), and other clocks raise
+        ValueError (see fork_clocks).
+        """
+        return fork_clocks([self], independent)[0]
+
+
+def fork_clocks(clocks: List[Clock], independent: bool = False) -> List[Clock]:
+    """Fork several clocks together (see Clock.fork).
+
+    The clocks are copied in one deep copy, so clocks sharing a noise source
+    (clocks.CorrelatedNoise) keep sharing one copy of it. With
+    independent=True, raises ValueError before anything is copied if a
+    clock has no fork_streams(child) method.
+    """
+    if independent:
+        missing = sorted({type(c).__name__ for c in clocks if not callable(getattr(c, "fork_streams", None))})
+        if missing:
+            raise ValueError(
+                f"independent forks need fork_streams(child), which {', '.join(missing)} does not define; "
+                "use independent=False to continue the same stream"
+            )
+    children = copy.deepcopy(list(clocks))
+    if independent:
+        for clock, child in zip(clocks, children):
+            clock.fork_streams(child)
+    return children
+
+
+@dataclass
+class ClockSnapshot:
+    """State of one clock captured by Clock.snapshot()."""
+
+    clock_type: str
+    state: Dict[str, Any]
+
 
 @dataclass
 class Comparison:
@@ -58,3 +164,104 @@ class Comparison:
         """Delegate to analysis.compare_clocks (keeps core stdlib-only)."""
         from . import analysis  # local import to avoid non-stdlib deps
         return analysis.compare_clocks(self.time_s, self.t_a_s, self.t_b_s)
+
+
+def _float_view(data) -> memoryview:
+    """1-D float memoryview of data, without copying float buffers.
+
+    1-D float64/float32 buffers (arrays, memoryviews) in native byte order
+    are used as they are; float buffers with an explicit non-native byte
+    order (e.g. '>d', network or file order) are copied byteswapped into an
+    array('d') / array('f'). Raw byte buffers (bytes, bytearray, mmap, or
+    memoryviews of them) are reinterpreted as native float64. Integer
+    buffers (e.g. an int64 time axis) and other sequences are copied into
+    an array('d'). Multi-dimensional buffers and typed byte arrays (e.g.
+    uint8 ndarrays) raise ValueError rather than being reinterpreted.
+    """
+    try:
+        view = memoryview(data)
+    except TypeError:
+        return memoryview(array("d", data))
+    fmt = view.format.lstrip("@=")
+    if view.ndim != 1:
+        raise ValueError(f"buffers must be 1-D, got {view.ndim} dimensions")
+    if fmt in ("d", "f"):
+        return view
+    if fmt[:1] in ("<", ">", "!") and fmt[1:] in ("d", "f"):
+        native = fmt[0] == ("<" if sys.byteorder == "little" else ">")
+        if native and view.c_contiguous:
+            return view.cast("B").cast(fmt[1:])
+        out = array(fmt[1:])
+        out.frombytes(view.tobytes())
+        if not native:
+            out.byteswap()
+        return memoryview(out)
+    raw = data if not isinstance(data, memoryview) else data.obj
+    if fmt in ("B", "b", "c") and isinstance(raw, (bytes, bytearray, mmap.mmap)):
+        if not view.c_contiguous:
+            raise ValueError("byte buffers must be C-contiguous")
+        return view.cast("B").cast("d")
+    if fmt in ("h", "H", "i", "I", "l", "L", "q", "Q", "n", "N"):
+        return memoryview(array("d", view.tolist()))
+    raise ValueError(f"unsupported buffer format: {view.format!r}")
+
+
+class BufferComparison:
+    """Comparison over buffers (NumPy arrays, memoryviews, mmaps) without copies.
+
+    Holds memoryviews of the three series; slicing (``cmp[a:b]``) returns a
+    BufferComparison over sub-views of the same buffers. ``measure()`` and
+    ``difference`` delegate to analysis (NumPy) on first use and are cached
+    per instance, so repeated calls are free.
+    """
+
+    __slots__ = ("label_a", "label_b", "_time", "_a", "_b", "_metrics", "_diff")
+
+    def __init__(self, label_a: str, label_b: str, time_s, t_a_s, t_b_s) -> None:
+        self.label_a = label_a
+        self.label_b = label_b
+        self._time = _float_view(time_s)
+        self._a = _float_view(t_a_s)
+        self._b = _float_view(t_b_s)
+        if not len(self._time) == len(self._a) == len(self._b):
+            raise ValueError("time, a, b lengths must match")
+        self._metrics: Optional[Dict[str, float]] = None
+        self._diff = None
+
+    @property
+    def time_s(self) -> memoryview:
+        return self._time
+
+    @property
+    def t_a_s(self) -> memoryview:
+        return self._a
+
+    @property
+    def t_b_s(self) -> memoryview:
+        return self._b
+
+    def __len__(self) -> int:
+        return len(self._time)
+
+    def __getitem__(self, window: slice) -> "BufferComparison":
+        """Sub-window sharing the underlying buffers."""
+        if not isinstance(window, slice):
+            raise TypeError("BufferComparison supports slicing only")
+        return BufferComparison(self.label_a, self.label_b, self._time[window], self._a[window], self._b[window])
+
+    def measure(self) -> Dict[str, float]:
+        """analysis.compare_clocks on the buffers (computed once)."""
+        if self._metrics is None:
+            from . import analysis  # local import to avoid non-stdlib deps
+            self._metrics = analysis.compare_clocks(self._time, self._a, self._b)
+        return dict(self._metrics)
+
+    @property
+    def difference(self):
+        """t_b - t_a as a read-only NumPy array (computed once)."""
+        if self._diff is None:
+            import numpy as np  # local import to avoid non-stdlib deps
+            diff = np.subtract(np.asarray(self._b, dtype=float), np.asarray(self._a, dtype=float))
+            diff.setflags(write=False)
+            self._diff = diff
+        return self._diff
@@ -0,0 +1,479 @@
+"""Memory-mapped ingest of recorded clock-comparison data.
+
+Recorded logs hold one time column and one column per clock, either the
+clock's phase (time error x [s] against a common reference), its fractional
+frequency y, or its elapsed readings. The readers return a ``Recording``
+whose columns are memory-mapped views of the file, so a log of tens of GB
+is never loaded into RAM:
+
+- ``open_binary``: raw little-endian records (time, c1, c2, ...), mapped
+  with no copy; each column is a strided view of the same mapping. A time
+  column in MJD, or in seconds not starting at 0, is converted once into
+  a memory-mapped cache file next to the log (or in ``cache_dir``).
+- ``open_npy``: an (n, k) array or a structured array in a .npy file,
+  mapped the same way.
+- ``read_text``: CSV or whitespace-separated text. The text is parsed in
+  blocks of ``block_rows`` lines and written once to a raw binary cache
+  (plus a JSON sidecar). Later calls map the cache, as long as the source
+  file's size and mtime have not changed.
+- ``open_recording`` picks one of the three by file extension.
+
+``Recording.as_dict()`` and ``Recording.iter_chunks()`` produce the
+run_clocks dict / chunk interface. 'time' is in seconds from the first
+sample. Like an IdealClock in a simulation, 'clock_0' is the reference;
+the recorded clocks are 'clock_1', ... Phase and frequency columns are
+given as offsets.OffsetTrace time errors. compare_clocks,
+fractional_frequency_from_time, consensus_weighted_average and
+pairwise_metrics accept these directly, and the ADEV path takes y from
+fractional_frequency_from_time.
+
+Gaps and non-uniform timestamps are located by ``Recording.index`` (a
+TimeIndex built in one chunked pass). ``Recording.segment(i)`` returns the
+i-th uniformly sampled stretch as a zero-copy sub-recording.
+"""
+from __future__ import annotations
+
+import hashlib
+import itertools
+import json
+import os
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .offsets import OffsetTrace, compensated_cumsum
+
+KINDS = ("phase", "frequency", "elapsed")
+TIME_FORMATS = ("s", "mjd", "mjd_sod")
+
+_SECONDS_PER_DAY = 86400.0
+_CHUNK = 1 << 20
+
+
+@dataclass
+class TimeIndex:
+    """Breaks in the sampling of a time column.
+
+    ``breaks`` holds every sample k whose step t[k] - t[k-1] differs from
+    ``dt`` by more than rtol * dt, and ``steps`` holds those steps. A step
+    longer than dt is a gap. A shorter or non-positive step is an
+    irregular sample.
+    """
+
+    n: int
+    dt: float
+    breaks: np.ndarray
+    steps: np.ndarray
+
+    @property
+    def uniform(self) -> bool:
+        return self.breaks.size == 0
+
+    @property
+    def gaps(self) -> np.ndarray:
+        """Indices k that follow a gap (t[k] - t[k-1] > dt)."""
+        return self.breaks[self.steps > self.dt]
+
+    @property
+    def missing_samples(self) -> int:
+        """Samples missing from the gaps on the nominal grid."""
+        long = self.steps[self.steps > self.dt]
+        return int(np.sum(np.round(long / self.dt) - 1.0))
+
+    def segments(self) -> List[Tuple[int, int]]:
+        """(start, stop) of the uniformly sampled stretches, in order."""
+        edges = [0] + [int(k) for k in self.breaks] + [self.n]
+        return [(a, b) for a, b in zip(edges[:-1], edges[1:]) if b > a]
+
+
+def build_index(time_s, dt: Optional[float] = None, rtol: float = 1e-6, chunk_size: int = _CHUNK) -> TimeIndex:
+    """Scan a (memory-mapped) time column chunk by chunk for gaps and irregular steps.
+
+    dt defaults to the median step of the first chunk.
+    """
+    t = time_s
+    n = int(t.shape[0])
+    if n < 2:
+        return TimeIndex(n, float(dt or 0.0), np.empty(0, dtype=np.int64), np.empty(0))
+    if dt is None:
+        dt = float(np.median(np.diff(np.asarray(t[:min(n, chunk_size)], dtype=float))))
+    dt = float(dt)
+    if dt <= 0:
+        raise ValueError("time column must be increasing")
+    breaks, steps = [], []
+    for k0 in range(1, n, chunk_size):
+        k1 = min(k0 + chunk_size, n)
+        step = np.asarray(t[k0:k1], dtype=float) - np.asarray(t[k0 - 1:k1 - 1], dtype=float)
+        bad = np.flatnonzero(np.abs(step - dt) > rtol * dt)
+        breaks.append(bad + k0)
+        steps.append(step[bad])
+    return TimeIndex(n, dt, np.concatenate(breaks), np.concatenate(steps))
+
+
+class Recording:
+    """Recorded comparison data: a time column plus one column per clock.
+
+    ``time`` is in seconds from the first sample (``t0_mjd`` holds the MJD
+    of that sample when the source was in MJD). ``columns`` maps each clock
+    name to its (usually memory-mapped) column. ``kind`` says what the
+    columns hold: 'phase' (x [s] against the reference), 'frequency'
+    (y, averaged over the step ending at each sample) or 'elapsed'
+    (readings [s]).
+    """
+
+    def __init__(self, time_s, columns: Dict[str, np.ndarray], kind: str = "phase", t0_mjd: Optional[float] = None) -> None:
+        if kind not in KINDS:
+            raise ValueError(f"Unknown kind: {kind!r} (expected one of {KINDS})")
+        for name, col in columns.items():
+            if col.shape[0] != time_s.shape[0]:
+                raise ValueError(f"column {name!r} length does not match time")
+        self.time = time_s
+        self.columns = dict(columns)
+        self.kind = kind
+        self.t0_mjd = t0_mjd
+        self._index: Optional[TimeIndex] = None
+
+    @property
+    def names(self) -> List[str]:
+        """Clock names in key order: names[i] is 'clock_{i + 1}'."""
+        return list(self.columns)
+
+    def __len__(self) -> int:
+        return int(self.time.shape[0])
+
+    @property
+    def index(self) -> TimeIndex:
+        """TimeIndex of the time column (built on first use)."""
+        if self._index is None:
+            self._index = build_index(self.time)
+        return self._index
+
+    def slice(self, k0: int, k1: int) -> "Recording":
+        """Samples k0..k1-1 as a Recording sharing this one's buffers.
+
+        Frequency columns are sliced as they are, so the first sample's y
+        (which spans the step before k0) is not used by as_dict().
+        """
+        return Recording(self.time[k0:k1], {n: c[k0:k1] for n, c in self.columns.items()}, self.kind, self.t0_mjd)
+
+    def segment(self, i: int) -> "Recording":
+        """The i-th uniformly sampled stretch (see TimeIndex.segments)."""
+        k0, k1 = self.index.segments()[i]
+        return self.slice(k0, k1)
+
+    def _traces(self, t: np.ndarray, k0: int, k1: int, state: Optional[list]) -> Dict[str, object]:
+        out = {}
+        for i, col in enumerate(self.columns.values(), start=1):
+            block = col[k0:k1]
+            if self.kind == "elapsed":
+                out[f"clock_{i}"] = block
+            elif self.kind == "phase":
+                out[f"clock_{i}"] = OffsetTrace(block)
+            else:
+                out[f"clock_{i}"] = OffsetTrace(_integrate(t, block, state, i - 1))
+        return out
+
+    def as_dict(self) -> Dict[str, object]:
+        """run_clocks-style dict: 'time', reference 'clock_0', recorded 'clock_1', ...
+
+        Phase and elapsed columns stay memory-mapped. Frequency columns are
+        integrated to phase, x_k = x_{k-1} + y_k (t_k - t_{k-1}) from x_0 = 0,
+        with compensated summation, which allocates one array per clock.
+        """
+        t = np.asarray(self.time, dtype=float)
+        out = {"time": t, "clock_0": self._reference(t)}
+        out.update(self._traces(t, 0, len(self), [None] * len(self.columns)))
+        return out
+
+    def iter_chunks(self, chunk_size: int = 1 << 16) -> Iterator[Dict[str, object]]:
+        """as_dict() in chunks of at most chunk_size samples (the iter_run_clocks interface)."""
+        chunk_size = int(chunk_size)
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be >= 1")
+        state = [None] * len(self.columns)
+        for k0 in range(0, len(self), chunk_size):
+            k1 = min(k0 + chunk_size, len(self))
+            t = np.asarray(self.time[k0:k1], dtype=float)
+            chunk = {"time": t, "clock_0": self._reference(t)}
+            chunk.update(self._traces(t, k0, k1, state))
+            yield chunk
+
+    def _reference(self, t: np.ndarray):
+        if self.kind == "elapsed":
+            return t
+        return OffsetTrace(np.broadcast_to(np.zeros(1), t.shape))
+
+
+def _integrate(t: np.ndarray, y, state: list, i: int) -> np.ndarray:
+    """Phase from frequency over one chunk; state[i] carries (t, s, c) between chunks."""
+    y = np.asarray(y, dtype=float)
+    if y.size == 0:
+        return np.empty(0)
+    if state[i] is None:
+        t_prev = np.concatenate(([t[0]], t[:-1]))  # x_0 = 0: the first y is not used
+        s0 = c0 = 0.0
+    else:
+        t_last, s0, c0 = state[i]
+        t_prev = np.concatenate(([t_last], t[:-1]))
+    s, c = compensated_cumsum(s0, c0, y * (t - t_prev))
+    state[i] = (float(t[-1]), float(s[-1]), float(c[-1]))
+    return s + c
+
+
+def _time_seconds(raw: np.ndarray, time_format: str, origin: Optional[Tuple[float, float]]) -> np.ndarray:
+    """Seconds since ``origin`` = (day, seconds) of the first sample."""
+    if time_format == "s":
+        return raw[:, 0] - origin[1]
+    if time_format == "mjd":
+        return (raw[:, 0] - origin[0]) * _SECONDS_PER_DAY
+    return (raw[:, 0] - origin[0]) * _SECONDS_PER_DAY + (raw[:, 1] - origin[1])
+
+
+def _origin(first: np.ndarray, time_format: str) -> Tuple[float, float]:
+    if time_format == "s":
+        return 0.0, float(first[0])
+    if time_format == "mjd":
+        return float(first[0]), 0.0
+    return float(first[0]), float(first[1])
+
+
+def _t0_mjd(origin: Tuple[float, float], time_format: str) -> Optional[float]:
+    if time_format == "s":
+        return None
+    return origin[0] + origin[1] / _SECONDS_PER_DAY
+
+
+def _check(kind: str, time_format: str) -> int:
+    if kind not in KINDS:
+        raise ValueError(f"Unknown kind: {kind!r} (expected one of {KINDS})")
+    if time_format not in TIME_FORMATS:
+        raise ValueError(f"Unknown time format: {time_format!r} (expected one of {TIME_FORMATS})")
+    return 2 if time_format == "mjd_sod" else 1
+
+
+def _seconds_axis(path: str, cache_dir: Optional[str], options: Dict, n: int, time_format: str, rows) -> Tuple[np.ndarray, Tuple[float, float]]:
+    """Time in seconds from the first sample, converted once into a memory-mapped cache file.
+
+    ``rows(k0, k1)`` returns records k0..k1-1 with the time column(s)
+    first. The axis is written chunk by chunk to ``<file>.<hash>.f8`` (in
+    ``cache_dir``, default next to the file) with a JSON sidecar, as in
+    read_text, and is rebuilt only when the source's size or mtime changes.
+    Returns the mapped axis and the origin (day, seconds).
+    """
+    if n == 0:
+        return np.empty(0), (0.0, 0.0)
+    data_path, meta_path = _cache_paths(path, cache_dir, dict(options, axis="time", time_format=time_format))
+    stat = os.stat(path)
+    source = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+    if os.path.exists(meta_path) and os.path.exists(data_path):
+        with open(meta_path, encoding="utf-8") as fh:
+            meta = json.load(fh)
+        if meta["source"] == source and meta["rows"] == n:
+            return np.memmap(data_path, dtype="<f8", mode="r", shape=(n,)), tuple(meta["origin"])
+    origin = _origin(np.asarray(rows(0, 1), dtype=float)[0], time_format)
+    tmp = data_path + ".tmp"
+    with open(tmp, "wb") as dst:
+        for k0 in range(0, n, _CHUNK):
+            raw = np.asarray(rows(k0, min(k0 + _CHUNK, n)), dtype=float)
+            _time_seconds(raw, time_format, origin).astype("<f8").tofile(dst)
+    os.replace(tmp, data_path)
+    meta = {"source": source, "path": os.path.abspath(path), "rows": n, "origin": list(origin)}
+    with open(meta_path + ".tmp", "w", encoding="utf-8") as fh:
+        json.dump(meta, fh)
+    os.replace(meta_path + ".tmp", meta_path)
+    return np.memmap(data_path, dtype="<f8", mode="r", shape=(n,)), origin
+
+
+def _from_records(
+    records: np.ndarray, names: Sequence[str], kind: str, time_format: str,
+    path: str, cache_dir: Optional[str], options: Dict,
+) -> Recording:
+    """Recording over an (n, k) record array whose leading columns are time."""
+    n_time = _check(kind, time_format)
+    if records.shape[1] != n_time + len(names):
+        raise ValueError(f"expected {n_time + len(names)} columns, found {records.shape[1]}")
+    columns = {name: records[:, n_time + j] for j, name in enumerate(names)}
+    if time_format == "s" and records.shape[0] and records[0, 0] == 0.0:
+        return Recording(records[:, 0], columns, kind)  # zero-copy time
+    time_s, origin = _seconds_axis(path, cache_dir, options, records.shape[0], time_format, lambda k0, k1: records[k0:k1])
+    return Recording(time_s, columns, kind, _t0_mjd(origin, time_format))
+
+
+def open_binary(
+    path: str,
+    names: Sequence[str],
+    kind: str = "phase",
+    time_format: str = "s",
+    dtype: str = "<f8",
+    header_bytes: int = 0,
+    cache_dir: Optional[str] = None,
+) -> Recording:
+    """Map a raw little-endian record file (time column(s) then one column per name).
+
+    Clock columns are views. A time column that is not already seconds
+    from zero (MJD, or seconds not starting at 0) is converted once into a
+    memory-mapped cache file (in ``cache_dir``, default next to the file),
+    so it is not held in RAM either.
+    """
+    n_cols = _check(kind, time_format) + len(names)
+    dtype = np.dtype(dtype)
+    size = os.path.getsize(path) - int(header_bytes)
+    record = n_cols * dtype.itemsize
+    if size % record:
+        raise ValueError(f"{path}: {size} bytes is not a whole number of {n_cols}-column records")
+    records = np.memmap(path, dtype=dtype, mode="r", offset=int(header_bytes), shape=(size // record, n_cols))
+    options = {"dtype": dtype.str, "header_bytes": int(header_bytes), "columns": n_cols}
+    return _from_records(records, names, kind, time_format, path, cache_dir, options)
+
+
+def open_npy(
+    path: str,
+    names: Optional[Sequence[str]] = None,
+    kind: str = "phase",
+    time_format: str = "s",
+    time_field: str = "time",
+    cache_dir: Optional[str] = None,
+) -> Recording:
+    """Map a .npy file: an (n, k) array (time first) or a structured array.
+
+    For a structured array the clock columns default to every field but
+    ``time_field``; for a plain array names default to 'c1', 'c2', ...
+    A converted time axis is cached as in open_binary.
+    """
+    arr = np.load(path, mmap_mode="r")
+    if arr.dtype.names:
+        if time_format == "mjd_sod":
+            raise ValueError("structured arrays need a single time field")
+        names = [f for f in arr.dtype.names if f != time_field] if names is None else list(names)
+        t = arr[time_field]
+        columns = {name: arr[name] for name in names}
+        if time_format == "s" and (t.size == 0 or t[0] == 0.0):
+            return Recording(t, columns, kind)
+        time_s, origin = _seconds_axis(
+            path, cache_dir, {"time_field": time_field}, t.shape[0], time_format,
+            lambda k0, k1: np.asarray(t[k0:k1], dtype=float)[:, None],
+        )
+        return Recording(time_s, columns, kind, _t0_mjd(origin, time_format))
+    if arr.ndim != 2:
+        raise ValueError("expected an (n, k) array or a structured array")
+    n_time = _check(kind, time_format)
+    if names is None:
+        names = [f"c{j}" for j in range(1, arr.shape[1] - n_time + 1)]
+    return _from_records(arr, names, kind, time_format, path, cache_dir, {})
+
+
+def _cache_paths(path: str, cache_dir: Optional[str], options: Dict) -> Tuple[str, str]:
+    digest = hashlib.sha256(json.dumps([os.path.abspath(path), options], sort_keys=True).encode()).hexdigest()[:16]
+    base = os.path.join(cache_dir or os.path.dirname(os.path.abspath(path)), f"{os.path.basename(path)}.{digest}")
+    return base + ".f8", base + ".json"
+
+
+def _split_header(line: str, delimiter: Optional[str]) -> List[str]:
+    return [tok.strip() for tok in line.split(delimiter)]
+
+
+def _is_numeric(tokens: Sequence[str]) -> bool:
+    try:
+        [float(tok) for tok in tokens if tok]
+    except ValueError:
+        return False
+    return True
+
+
+def read_text(
+    path: str,
+    names: Optional[Sequence[str]] = None,
+    kind: str = "phase",
+    time_format: str = "s",
+    delimiter: Optional[str] = None,
+    comments: str = "#",
+    cache_dir: Optional[str] = None,
+    block_rows: int = 1 << 20,
+) -> Recording:
+    """Text log (CSV with delimiter=',', whitespace by default) via a binary cache.
+
+    The first non-comment line is taken as a header when it is not numeric;
+    its clock-column labels are the default ``names``. The file is parsed
+    block_rows lines at a time into ``<file>.<hash>.f8`` (in ``cache_dir``,
+    default next to the file) with time already in seconds from the first
+    sample, and the sidecar ``.json`` records the source size/mtime, so the
+    text is parsed only once. The returned Recording maps the cache.
+    """
+    n_time = _check(kind, time_format)
+    options = {"names": list(names) if names is not None else None, "kind": kind, "time_format": time_format,
+               "delimiter": delimiter, "comments": comments}
+    data_path, meta_path = _cache_paths(path, cache_dir, options)
+    stat = os.stat(path)
+    source = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+    if os.path.exists(meta_path) and os.path.exists(data_path):
+        with open(meta_path, encoding="utf-8") as fh:
+            meta = json.load(fh)
+        if meta["source"] == source:
+            return _open_cache(data_path, meta)
+
+    tmp = data_path + ".tmp"
+    n_rows = 0
+    origin = None
+    with open(path, encoding="utf-8") as src, open(tmp, "wb") as dst:
+        lines = (ln for ln in src if ln.strip() and not ln.lstrip().startswith(comments))
+        first = next(lines, None)
+        if first is not None:
+            tokens = _split_header(first.split(comments)[0], delimiter)
+            if not _is_numeric(tokens):
+                if names is None:
+                    names = tokens[n_time:]
+            else:
+                lines = itertools.chain([first], lines)
+        while True:
+            block = list(itertools.islice(lines, int(block_rows)))
+            if not block:
+                break
+            raw = np.loadtxt(block, delimiter=delimiter, comments=comments, ndmin=2, dtype=float)
+            if names is None:
+                names = [f"c{j}" for j in range(1, raw.shape[1] - n_time + 1)]
+            if raw.shape[1] != n_time + len(names):
+                raise ValueError(f"{path}: expected {n_time + len(names)} columns, found {raw.shape[1]}")
+            if origin is None:
+                origin = _origin(raw[0], time_format)
+            out = np.empty((raw.shape[0], 1 + len(names)), dtype="<f8")
+            out[:, 0] = _time_seconds(raw, time_format, origin)
+            out[:, 1:] = raw[:, n_time:]
+            out.tofile(dst)
+            n_rows += raw.shape[0]
+    os.replace(tmp, data_path)
+    meta = {
+        "source": source,
+        "path": os.path.abspath(path),
+        "names": list(names or []),
+        "kind": kind,
+        "rows": n_rows,
+        "t0_mjd": _t0_mjd(origin, time_format) if origin is not None else None,
+    }
+    with open(meta_path + ".tmp", "w", encoding="utf-8") as fh:
+        json.dump(meta, fh)
+    os.replace(meta_path + ".tmp", meta_path)
+    return _open_cache(data_path, meta)
+
+
+def _open_cache(data_path: str, meta: Dict) -> Recording:
+    names = meta["names"]
+    if meta["rows"] == 0:
+        records = np.empty((0, 1 + len(names)))
+    else:
+        records = np.memmap(data_path, dtype="<f8", mode="r", shape=(meta["rows"], 1 + len(names)))
+    return Recording(records[:, 0], {name: records[:, 1 + j] for j, name in enumerate(names)}, meta["kind"], meta["t0_mjd"])
+
+
+def open_recording(path: str, names: Optional[Sequence[str]] = None, **kwargs) -> Recording:
+    """open_npy for .npy, read_text for .txt/.csv/.dat/.tsv, open_binary otherwise."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".npy":
+        return open_npy(path, names, **kwargs)
+    if ext in (".txt", ".csv", ".dat", ".tsv"):
+        if ext == ".csv":
+            kwargs.setdefault("delimiter", ",")
+        return read_text(path, names, **kwargs)
+    if names is None:
+        raise ValueError("names are required for raw binary files")
+    return open_binary(path, names, **kwargs)
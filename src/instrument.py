@@ -0,0 +1,160 @@
+"""Opt-in timing and throughput instrumentation (pure stdlib).
+
+Activate a report with the ``instrumented`` context manager; while it is
+active, run_clocks (including decimated recording), iter_run_clocks and
+storage.run_clocks_to_disk record per-clock wall time and call counts for
+ticking (``advance``), reading and array writes, and the analysis entry
+points record their call counts and wall time. Nothing is recorded, and
+only a context-variable lookup is paid, when no report is active.
+
+    with instrumented(progress=print, progress_every=100_000) as report:
+        ts = run_clocks(clocks, duration, dt)
+    print(report.to_json())
+"""
+from __future__ import annotations
+
+import contextvars
+import functools
+import json
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional
+
+_ACTIVE: contextvars.ContextVar[Optional["RunReport"]] = contextvars.ContextVar("clocksandbox_report", default=None)
+
+
+def active_report() -> Optional["RunReport"]:
+    """The report of the innermost active ``instrumented`` block, if any."""
+    return _ACTIVE.get()
+
+
+class RunReport:
+    """Accumulated instrumentation for one ``instrumented`` block."""
+
+    def __init__(
+        self,
+        progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+        progress_every: int = 100_000,
+        track_allocations: bool = False,
+    ) -> None:
+        if int(progress_every) < 1:
+            raise ValueError("progress_every must be >= 1")
+        self.progress = progress
+        self.progress_every = int(progress_every)
+        self.track_allocations = bool(track_allocations)
+        self.clocks: Dict[str, Dict[str, float]] = {}
+        self.calls: Dict[str, Dict[str, float]] = {}
+        self.steps = 0
+        self.run_wall_s = 0.0
+        self.arrays_allocated = 0
+        self.bytes_allocated = 0
+        self.peak_traced_bytes: Optional[int] = None
+        self._started = time.perf_counter()
+        self._wall_s: Optional[float] = None
+        self._next_beat = self.progress_every
+
+    # --- recording (called by the instrumented code) ---
+    def clock_stats(self, clock_type: str) -> Dict[str, float]:
+        stats = self.clocks.get(clock_type)
+        if stats is None:
+            stats = self.clocks[clock_type] = {
+                "instances": 0, "advance_calls": 0, "advance_s": 0.0, "read_calls": 0,
+                "read_s": 0.0, "write_s": 0.0, "steps": 0,
+            }
+        return stats
+
+    def record_call(self, name: str, seconds: float) -> None:
+        entry = self.calls.setdefault(name, {"calls": 0, "wall_s": 0.0})
+        entry["calls"] += 1
+        entry["wall_s"] += seconds
+
+    def record_array(self, nbytes: int) -> None:
+        self.arrays_allocated += 1
+        self.bytes_allocated += int(nbytes)
+
+    def record_steps(self, done: int, total: int, run_started: float) -> None:
+        """Update run progress and fire the heartbeat every progress_every steps."""
+        elapsed = time.perf_counter() - run_started
+        if self.progress is not None and done >= self._next_beat:
+            self.progress({
+                "steps_done": done, "n_steps": total, "elapsed_s": elapsed,
+                "steps_per_s": done / elapsed if elapsed > 0 else None,
+            })
+            self._next_beat = (done // self.progress_every + 1) * self.progress_every
+
+    def finish_run(self, n_steps: int, wall_s: float) -> None:
+        self.steps += n_steps
+        self.run_wall_s += wall_s
+        self._next_beat = self.progress_every
+
+    # --- output ---
+    def to_dict(self) -> Dict[str, Any]:
+        wall = self._wall_s if self._wall_s is not None else time.perf_counter() - self._started
+        return {
+            "wall_s": wall,
+            "steps": self.steps,
+            "run_wall_s": self.run_wall_s,
+            "steps_per_s": self.steps / self.run_wall_s if self.run_wall_s > 0 else None,
+            "clocks": {k: dict(v) for k, v in self.clocks.items()},
+            "calls": {k: dict(v) for k, v in self.calls.items()},
+            "allocations": {
+                "arrays": self.arrays_allocated,
+                "bytes": self.bytes_allocated,
+                "peak_traced_bytes": self.peak_traced_bytes,
+            },
+        }
+
+    def to_json(self, **kwargs: Any) -> str:
+        return json.dumps(self.to_dict(), **kwargs)
+
+
+@contextmanager
+def instrumented(
+    progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+    progress_every: int = 100_000,
+    track_allocations: bool = False,
+) -> Iterator[RunReport]:
+    """Activate a RunReport for the enclosed block.
+
+    Parameters
+    ----------
+    progress : callable | None
+        Heartbeat callback receiving {'steps_done', 'n_steps', 'elapsed_s',
+        'steps_per_s'} about every progress_every simulated steps.
+    track_allocations : bool
+        Also record the tracemalloc peak over the block (slows NumPy code).
+    """
+    report = RunReport(progress, progress_every, track_allocations)
+    started_tracing = False
+    if track_allocations and not tracemalloc.is_tracing():
+        tracemalloc.start()
+        started_tracing = True
+    token = _ACTIVE.set(report)
+    try:
+        yield report
+    finally:
+        _ACTIVE.reset(token)
+        report._wall_s = time.perf_counter() - report._started
+        if track_allocations:
+            report.peak_traced_bytes = tracemalloc.get_traced_memory()[1]
+            if started_tracing:
+                tracemalloc.stop()
+
+
+def timed(fn: Callable) -> Callable:
+    """Record call count and wall time of fn in the active report, if any."""
+    name = fn.__name__
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        report = _ACTIVE.get()
+        if report is None:
+            return fn(*args, **kwargs)
+        t0 = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            report.record_call(name, time.perf_counter() - t0)
+
+    return wrapper
@@ -0,0 +1,383 @@
+"""Kalman-filter ensemble time scale with optional clock steering.
+
+Every clock i carries the two-state model of phase x_i [s] (time error)
+and fractional frequency y_i, stepped every dt = τ:
+
+    x_k = x_{k-1} + τ y_{k-1} + w_x,    y_k = y_{k-1} + w_y,
+
+with white FM (``sigma_wf``, σ_y at τ = 1 s, as NoisyOscillatorClock) and
+random-walk FM (``sigma_rw`` per sqrt(s), as RandomWalkFreqClock). The
+time scale follows the "Kalman plus weights" form of the basic time scale
+equation: its offset from the measurement reference at step k is
+
+    e_k = Σ_i w_i (z_ik - x̂_i,k|k-1),
+
+where z_ik is clock i's reading against the reference (its time error
+here) and x̂_i,k|k-1 the predicted offset of clock i from the time scale.
+Each clock's state (x̂_i, ŷ_i) relative to the time scale is then updated
+with its own Kalman gain from the innovation z_ik - e_k - x̂_i,k|k-1. The
+weights are the inverse predicted phase variances.
+
+Gains and covariances are the steady-state solution of each clock's
+Riccati equation, found for all clocks at once by a doubling iteration.
+With fixed gains the filter is linear and time-invariant, so a block of B
+steps is solved exactly with matrix products over all clocks and all
+blocks of a chunk. The only sequential part is one (2N, 2N) product per
+block, which carries the filter state from block to block. Results do not
+depend on the chunking beyond rounding.
+
+With ``steer_tau`` every clock is also steered toward the time scale by a
+first-order servo. The applied frequency correction is the estimated
+frequency plus the estimated residual offset divided by steer_tau. The
+disciplined clocks' time errors are returned as 'steered'.
+"""
+from __future__ import annotations
+
+from collections.abc import Mapping
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .analysis import _dict_chunks
+from .clocks._kernels import iir_lowpass
+from .instrument import timed
+from .offsets import OffsetTrace, time_error
+
+_DOUBLING_STEPS = 200
+_CHUNK = 1 << 14
+
+
+def steady_state_gains(sigma_wf, sigma_rw, dt: float, meas_sigma=1e-15) -> Tuple[np.ndarray, np.ndarray]:
+    """Steady-state Kalman gains K (N, 2) and predicted covariances P (N, 2, 2).
+
+    Solves P = Φ P Φᵀ - Φ P hᵀ (h P hᵀ + R)⁻¹ h P Φᵀ + Q for every clock at
+    once with the structure-preserving doubling algorithm, which converges
+    quadratically however long the filter's time constant is.
+    """
+    sigma_wf, sigma_rw, meas_sigma = np.broadcast_arrays(
+        np.asarray(sigma_wf, dtype=float), np.asarray(sigma_rw, dtype=float), np.asarray(meas_sigma, dtype=float)
+    )
+    sigma_wf, sigma_rw, meas_sigma = (np.atleast_1d(a) for a in (sigma_wf, sigma_rw, meas_sigma))
+    tau = float(dt)
+    if tau <= 0:
+        raise ValueError("dt must be positive")
+    if np.any(sigma_wf < 0) or np.any(sigma_rw < 0):
+        raise ValueError("noise levels must be >= 0")
+    if np.any(meas_sigma <= 0):
+        raise ValueError("meas_sigma must be > 0")
+    n = sigma_wf.size
+    q_rw = np.square(sigma_rw) * tau  # variance of one frequency step
+    q = np.empty((n, 2, 2))
+    q[:, 0, 0] = np.square(sigma_wf) * tau + q_rw * tau * tau
+    q[:, 0, 1] = q[:, 1, 0] = q_rw * tau
+    q[:, 1, 1] = q_rw
+    r = np.square(meas_sigma)
+
+    # doubling for X = Aᵀ X (I + G X)⁻¹ A + H with A = Φᵀ, G = hᵀ R⁻¹ h, H = Q
+    a = np.broadcast_to(np.array([[1.0, 0.0], [tau, 1.0]]), (n, 2, 2)).copy()
+    g = np.zeros((n, 2, 2))
+    g[:, 0, 0] = 1.0 / r
+    h = q.copy()
+    eye = np.eye(2)
+    for _ in range(_DOUBLING_STEPS):
+        inv = np.linalg.inv(eye + g @ h)
+        a_inv = a @ inv
+        h_new = h + np.swapaxes(a, 1, 2) @ h @ inv @ a
+        g = g + a_inv @ g @ np.swapaxes(a, 1, 2)
+        a = a_inv @ a
+        done = np.allclose(h_new, h, rtol=1e-12, atol=0.0)
+        h = h_new
+        if done:
+            break
+    else:  # pragma: no cover - only for degenerate noise models
+        raise ValueError("Riccati doubling did not converge")
+    p = 0.5 * (h + np.swapaxes(h, 1, 2))
+    s = p[:, 0, 0] + r
+    gains = p[:, :, 0] / s[:, None]
+    return gains, p
+
+
+def clock_noise(clocks, dt: float) -> Tuple[np.ndarray, np.ndarray]:
+    """(sigma_wf, sigma_rw) per trace row from the built-in clocks' metadata.
+
+    IdealClock maps to (0, 0), a ClockEnsemble to one entry per member. A
+    FlickerLikeFreqClock's low-passed frequency behaves as a random walk
+    with steps a * sigma_w / sqrt(dt) on time scales below dt / a, and is
+    modelled as such. Other models raise ValueError; pass the noise levels
+    explicitly for them.
+    """
+    wf, rw = [], []
+    for clock in clocks:
+        meta = clock.get_metadata()
+        kind = meta.get("model", meta["type"])
+        n = int(meta.get("n_members", 1))
+        zeros = np.zeros(n)
+
+        def param(*names):
+            name = next(k for k in names if k in meta)
+            return np.broadcast_to(np.asarray(meta[name], dtype=float), (n,))
+
+        if kind == "IdealClock":
+            pair = (zeros, zeros)
+        elif kind == "NoisyOscillatorClock":
+            pair = (param("sigma_y_tau1s", "sigma_y"), zeros)
+        elif kind == "RandomWalkFreqClock":
+            pair = (zeros, param("sigma_rw_per_sqrt_s", "sigma_rw"))
+        elif kind == "FlickerLikeFreqClock":
+            pair = (zeros, param("a") * param("sigma_w_tau1s", "sigma_w") / float(dt))
+        else:
+            raise ValueError(f"No two-state noise model for {kind}; pass sigma_wf and sigma_rw")
+        wf.append(pair[0])
+        rw.append(pair[1])
+    return np.concatenate(wf), np.concatenate(rw)
+
+
+class KalmanTimeScale:
+    """Ensemble time scale over a chunk stream, all clocks filtered together.
+
+    Parameters
+    ----------
+    keys : list[str]
+        'clock_*' keys to combine; ClockEnsemble entries contribute one row
+        per member.
+    sigma_wf, sigma_rw : float or array-like
+        White-FM σ_y at 1 s and random-walk-FM level per sqrt(s), per row
+        or one value for all rows (see clock_noise for the built-in clocks).
+    dt : float
+        Sampling interval [s]; the chunks must be sampled on this grid.
+    meas_sigma : float or array-like
+        Phase measurement noise [s] (> 0).
+    weights : array-like | None
+        Fixed ensemble weights (normalized to sum 1); default: inverse
+        predicted phase variances.
+    steer_tau : float | None
+        Time constant [s] (>= dt) of the servo steering each clock to the
+        time scale; None disables steering.
+    block : int
+        Steps solved together per block.
+    """
+
+    def __init__(
+        self,
+        keys: Sequence[str],
+        sigma_wf,
+        sigma_rw,
+        dt: float,
+        meas_sigma=1e-15,
+        weights=None,
+        steer_tau: Optional[float] = None,
+        block: int = 32,
+    ) -> None:
+        if int(block) < 1:
+            raise ValueError("block must be >= 1")
+        self._keys = list(keys)
+        self.dt = float(dt)
+        self.gains, self.covariance = steady_state_gains(sigma_wf, sigma_rw, self.dt, meas_sigma)
+        self._weights_in = weights
+        if weights is not None and self.n_clocks == 1 and np.size(weights) > 1:
+            self.gains = np.repeat(self.gains, np.size(weights), axis=0)
+            self.covariance = np.repeat(self.covariance, np.size(weights), axis=0)
+        self._set_weights()
+        if steer_tau is not None and float(steer_tau) < self.dt:
+            raise ValueError("steer_tau must be >= dt")
+        self.steer_tau = None if steer_tau is None else float(steer_tau)
+        self.block = int(block)
+        self._mats: Dict[int, dict] = {}
+        self.state = None  # (N, 2): filtered (x̂, ŷ) of each clock relative to the time scale
+        self._servo = None  # (correction c, servo input u) of the last sample
+        self._last_t = None
+
+    @property
+    def n_clocks(self) -> int:
+        return self.gains.shape[0]
+
+    def _set_weights(self) -> None:
+        n = self.n_clocks
+        if self._weights_in is None:
+            w = 1.0 / np.maximum(self.covariance[:, 0, 0], np.finfo(float).tiny)
+        else:
+            w = np.broadcast_to(np.asarray(self._weights_in, dtype=float), (n,))
+        if np.sum(w) <= 0:
+            raise ValueError("weights must have a positive sum")
+        self.weights = w / np.sum(w)
+
+    def _matrices(self, length: int) -> dict:
+        """Block operators for L steps (cached per L).
+
+        Within a block, clock i's innovations are ν_i = S_i (z_i - e) - V_i s0_i,
+        with S_i (L, L) unit lower triangular and V_i (L, 2) the response to
+        the block-start state s0_i. The weights make Σ w_i ν_i = 0, which
+        gives e = D⁻¹ (Σ w_i S_i z_i - Σ w_i V_i s0_i) with D = Σ w_i S_i.
+        """
+        if length in self._mats:
+            return self._mats[length]
+        k1, k2 = self.gains[:, 0], self.gains[:, 1]
+        tau = self.dt
+        n = self.n_clocks
+        f = np.empty((n, 2, 2))  # closed-loop transition (I - K h) Φ
+        f[:, 0, 0] = 1.0 - k1
+        f[:, 0, 1] = tau * (1.0 - k1)
+        f[:, 1, 0] = -k2
+        f[:, 1, 1] = 1.0 - tau * k2
+        rows = np.empty((length, n, 2))  # hΦ Fʲ
+        power = np.broadcast_to(np.eye(2), (n, 2, 2))
+        for j in range(length):
+            rows[j] = np.array([1.0, tau]) @ power
+            power = power @ f
+        v = np.ascontiguousarray(rows.transpose(1, 0, 2))
+        a = np.einsum("jnk,nk->nj", rows, self.gains)  # a[:, d] = hΦ Fᵈ K
+        lag = np.subtract.outer(np.arange(length), np.arange(length))
+        s = np.where(lag > 0, -a[:, np.clip(lag - 1, 0, None)], (lag == 0).astype(float))
+        d_inv = np.linalg.inv(np.tensordot(self.weights, s, axes=1))
+        weighted_v = (self.weights[:, None, None] * v).transpose(1, 0, 2).reshape(length, 2 * n)
+        m_e = d_inv @ weighted_v  # e_s = m_e @ s0 for flat (x̂_0, ŷ_0, x̂_1, ...) states
+        s_last, s_sum = s[:, -1, :], s.sum(axis=1)
+
+        # block map of the start state (z = 0): x̂_end = e_s[-1] - (1 - k1) ν_last, ŷ_end = ŷ_0 + k2 Σ ν
+        select = np.eye(2 * n).reshape(n, 2, 2 * n)
+        nu_last = s_last @ m_e - np.einsum("ik,ikc->ic", v[:, -1, :], select)
+        nu_sum = s_sum @ m_e - np.einsum("ik,ikc->ic", v.sum(axis=1), select)
+        psi = np.stack((m_e[-1] - (1.0 - k1)[:, None] * nu_last, select[:, 1] + k2[:, None] * nu_sum), axis=1)
+        self._mats[length] = {
+            "s_t": np.ascontiguousarray(s.transpose(0, 2, 1)), "v_t": np.ascontiguousarray(v.transpose(0, 2, 1)),
+            "d_inv_t": np.ascontiguousarray(d_inv.T), "m_e": m_e, "s_last": s_last, "s_sum": s_sum,
+            "psi": psi.reshape(2 * n, 2 * n),
+        }
+        return self._mats[length]
+
+    def _blocks(self, z: np.ndarray):
+        """Filter z (N, nb * L) in nb blocks of L steps from self.state."""
+        n, m = z.shape
+        length = min(self.block, m)
+        nb = m // length
+        mats = self._matrices(length)
+        zb = z.reshape(n, nb, length)
+        k1, k2 = self.gains[:, 0, None], self.gains[:, 1, None]
+
+        # part driven by z with zero start states, all blocks at once
+        az = np.matmul(zb, mats["s_t"])  # rows of S_i z_i
+        e_z = np.tensordot(self.weights, az, axes=1) @ mats["d_inv_t"]  # (nb, L)
+        nu_last = az[:, :, -1] - (e_z @ mats["s_last"].T).T
+        nu_sum = az.sum(axis=2) - (e_z @ mats["s_sum"].T).T
+        c = np.stack((zb[:, :, -1] - e_z[:, -1] - (1.0 - k1) * nu_last, k2 * nu_sum), axis=1).reshape(2 * n, nb)
+
+        starts = np.empty((2 * n, nb))
+        psi = mats["psi"]
+        state = self.state.reshape(2 * n)
+        for b in range(nb):  # the only sequential step: carry the state across blocks
+            starts[:, b] = state
+            state = psi @ state + c[:, b]
+        self.state = state.reshape(n, 2)
+
+        e = e_z - (mats["m_e"] @ starts).T
+        s0 = starts.reshape(n, 2, nb).transpose(0, 2, 1)  # (N, nb, 2)
+        nu = az
+        nu -= np.matmul(e, mats["s_t"])
+        nu -= np.matmul(s0, mats["v_t"])
+        x_hat = zb - e
+        x_hat -= (1.0 - k1)[:, :, None] * nu
+        y_hat = np.cumsum(nu, axis=2)
+        y_hat *= k2[:, :, None]
+        y_hat += s0[:, :, 1, None]
+        return e.reshape(m), x_hat.reshape(n, m), y_hat.reshape(n, m)
+
+    def _rows(self, t: np.ndarray, chunk) -> np.ndarray:
+        z = np.concatenate([np.atleast_2d(time_error(t, chunk[k])) for k in self._keys], axis=0)
+        if self.n_clocks == 1 and z.shape[0] > 1 and self.state is None:
+            # scalar noise levels: the same model for every row
+            self.gains = np.repeat(self.gains, z.shape[0], axis=0)
+            self.covariance = np.repeat(self.covariance, z.shape[0], axis=0)
+            self._set_weights()
+        if z.shape[0] != self.n_clocks:
+            raise ValueError(f"{z.shape[0]} trace rows but {self.n_clocks} noise levels")
+        return z
+
+    def update(self, chunk: Dict[str, np.ndarray]) -> Dict[str, object]:
+        """Process one chunk.
+
+        Returns 'time', 'timescale' (OffsetTrace: time error of the time
+        scale against the chunk's reference), 'phase' and 'frequency'
+        ((N, n) estimates of each clock relative to the time scale) and,
+        when steering, 'steered' (OffsetTrace of the disciplined clocks'
+        time errors, (N, n)).
+        """
+        t = np.asarray(chunk["time"], dtype=float)
+        z = self._rows(t, chunk)
+        m = t.size
+        steps = np.diff(t) if self._last_t is None else np.diff(np.concatenate(([self._last_t], t)))
+        if steps.size and not np.allclose(steps, self.dt, rtol=1e-6, atol=0.0):
+            raise ValueError("time grid spacing does not match dt")
+        if m and self.state is None:
+            # start from the weighted mean: pred_0 = z_0 - w·z_0, so e_0 = w·z_0 and ν_0 = 0
+            self.state = np.stack((z[:, 0] - self.weights @ z[:, 0], np.zeros(self.n_clocks)), axis=1)
+        e = np.empty(m)
+        x_hat = np.empty((self.n_clocks, m))
+        y_hat = np.empty((self.n_clocks, m))
+        full = m // self.block * self.block
+        for k0, k1 in ((0, full), (full, m)):
+            if k1 > k0:
+                e[k0:k1], x_hat[:, k0:k1], y_hat[:, k0:k1] = self._blocks(z[:, k0:k1])
+        out = {"time": t, "timescale": OffsetTrace(e), "phase": x_hat, "frequency": y_hat}
+        if self.steer_tau is not None and m:
+            out["steered"] = OffsetTrace(z - self._steer(x_hat, y_hat))
+        if m:
+            self._last_t = t[-1]
+        return out
+
+    def _steer(self, x_hat: np.ndarray, y_hat: np.ndarray) -> np.ndarray:
+        """Corrections c_k = c_{k-1} + τ (ŷ_{k-1} + (x̂_{k-1} - c_{k-1}) / steer_tau), c_0 = 0."""
+        a = self.dt / self.steer_tau
+        u = x_hat + self.steer_tau * y_hat
+        c_prev, u_prev = self._servo if self._servo is not None else (np.zeros(self.n_clocks), np.zeros(self.n_clocks))
+        u_in = np.concatenate((u_prev[:, None], u[:, :-1]), axis=1)
+        c = iir_lowpass(c_prev, u_in, a)
+        self._servo = (c[:, -1].copy(), u[:, -1].copy())
+        return c
+
+
+@timed
+def kalman_time_scale(
+    timeseries_dict,
+    keys: Sequence[str],
+    sigma_wf,
+    sigma_rw,
+    dt: Optional[float] = None,
+    chunk_size: int = _CHUNK,
+    **options,
+) -> Dict[str, object]:
+    """KalmanTimeScale over a whole run_clocks dict (or a chunk stream), concatenated.
+
+    dt defaults to the first time step. ``options`` go to KalmanTimeScale
+    (meas_sigma, weights, steer_tau, block). Besides the per-sample outputs
+    of update(), the result holds 'weights', 'gains' and the final 'state'.
+    """
+    if isinstance(timeseries_dict, Mapping):
+        t = timeseries_dict["time"]
+        if dt is None:
+            dt = float(t[1] - t[0])
+        chunks: Iterable = _dict_chunks(timeseries_dict, int(chunk_size))
+    else:
+        chunks = iter(timeseries_dict)
+        if dt is None:
+            first = next(chunks)
+            dt = float(first["time"][1] - first["time"][0])
+            chunks = _prepend(first, chunks)
+    scale = KalmanTimeScale(keys, sigma_wf, sigma_rw, dt, **options)
+    parts = [scale.update(chunk) for chunk in chunks]
+    if not parts:
+        raise ValueError("chunk stream is empty")
+    out = {
+        "time": np.concatenate([p["time"] for p in parts]),
+        "timescale": OffsetTrace.concatenate(p["timescale"] for p in parts),
+        "phase": np.concatenate([p["phase"] for p in parts], axis=1),
+        "frequency": np.concatenate([p["frequency"] for p in parts], axis=1),
+    }
+    if scale.steer_tau is not None:
+        out["steered"] = OffsetTrace.concatenate(p["steered"] for p in parts if "steered" in p)
+    out.update(weights=scale.weights, gains=scale.gains, state=scale.state)
+    return out
+
+
+def _prepend(first, rest):
+    yield first
+    yield from rest
@@ -0,0 +1,190 @@
+"""Offset representation: clock traces stored as time error x = reading - time.
+
+A run_clocks trace holds readings of order the run length (10^6 s for a
+long run) whose interesting part is ~10^-12 s/s smaller, so differencing
+two readings (compare_clocks, fractional_frequency_from_time) cancels most
+of the float64 mantissa and each accumulated reading also carries the
+rounding of every earlier step. In the offset representation the runner
+integrates the time error directly from each clock's fractional
+frequency (Clock.advance_frequency),
+
+    x_k = x_{k-1} + dt * y_k,
+
+with compensated summation (compensated_cumsum), so x is accurate to its
+own magnitude and differences of x need no cancellation.
+
+OffsetTrace holds such a trace as float64, or as float32 residuals against
+a float64 base per block of ``block`` samples (half the memory, precision
+relative to the excursion within a block rather than to the absolute
+offset). run_clocks(..., representation="offset" | "offset32") returns
+one per clock; compare_clocks, compare_clocks_chunks, pairwise_metrics,
+fractional_frequency_from_time, iter_fractional_frequency and
+consensus_weighted_average accept them in place of reading arrays.
+"""
+from __future__ import annotations
+
+from typing import Iterable, Optional, Tuple
+
+import numpy as np
+
+REPRESENTATIONS = ("elapsed", "offset", "offset32")
+
+# Samples per float64 base of a float32 OffsetTrace.
+_BASE_BLOCK = 1 << 12
+
+
+def compensated_cumsum(s0, c0, d) -> Tuple[np.ndarray, np.ndarray]:
+    """Running sum of ``d`` along the last axis with a TwoSum error term.
+
+    Returns (s, c) where s is the plain running sum started at s0 and c the
+    running sum of its rounding errors started at c0; s + c is the
+    compensated total after each element. Every element depends only on
+    its predecessor, so carrying (s[..., -1], c[..., -1]) into the next
+    call gives the same result for any split of ``d``.
+    """
+    d = np.asarray(d, dtype=float)
+    s = np.array(d)
+    s[..., 0] += s0
+    np.cumsum(s, axis=-1, out=s)
+    prev = np.empty_like(s)
+    prev[..., 0] = s0
+    prev[..., 1:] = s[..., :-1]
+    # TwoSum(prev, d): exact error of s = prev + d
+    bb = s - prev
+    c = (prev - (s - bb)) + (d - bb)
+    c[..., 0] += c0
+    np.cumsum(c, axis=-1, out=c)
+    return s, c
+
+
+class OffsetIntegrator:
+    """Per-clock compensated time-error state carried across blocks."""
+
+    def __init__(self, x0) -> None:
+        self.s = np.asarray(x0, dtype=float).copy()
+        self.c = np.zeros_like(self.s)
+
+    def integrate(self, y, dt: float) -> np.ndarray:
+        """Time errors after each tick of a frequency block y."""
+        y = np.asarray(y, dtype=float)
+        if y.shape[-1] == 0:
+            return np.empty(y.shape)
+        s, c = compensated_cumsum(self.s, self.c, float(dt) * y)
+        self.s, self.c = s[..., -1].copy(), c[..., -1].copy()
+        s += c
+        return s
+
+
+class OffsetTrace:
+    """Time-error trace x [s] (last axis = samples), float64 or float32 + base.
+
+    Use ``offsets()`` for the float64 time errors and ``elapsed(time)`` for
+    readings. np.asarray() is refused so that reading-based code cannot
+    mistake x for readings.
+    """
+
+    __slots__ = ("data", "base", "block")
+
+    def __init__(self, data, base=None, block: int = _BASE_BLOCK) -> None:
+        self.data = data
+        self.base = base
+        self.block = int(block)
+
+    @classmethod
+    def empty(cls, shape, dtype=np.float64, block: int = _BASE_BLOCK) -> "OffsetTrace":
+        """Trace to be filled front to back with write()."""
+        dtype = np.dtype(dtype)
+        if dtype == np.float64:
+            return cls(np.empty(shape, dtype=float))
+        if dtype != np.float32:
+            raise ValueError("dtype must be float64 or float32")
+        shape = tuple(shape)
+        n_blocks = -(-shape[-1] // int(block))
+        return cls(np.empty(shape, dtype=np.float32), np.zeros(shape[:-1] + (n_blocks,)), block)
+
+    @classmethod
+    def from_offsets(cls, x, dtype=np.float64, block: int = _BASE_BLOCK) -> "OffsetTrace":
+        x = np.asarray(x, dtype=float)
+        if np.dtype(dtype) == np.float64:
+            return cls(x)
+        trace = cls.empty(x.shape, dtype, block)
+        trace.write(0, x)
+        return trace
+
+    @property
+    def shape(self) -> tuple:
+        return self.data.shape
+
+    @property
+    def dtype(self) -> np.dtype:
+        return self.data.dtype
+
+    @property
+    def size(self) -> int:
+        return self.data.size
+
+    @property
+    def nbytes(self) -> int:
+        return self.data.nbytes + (0 if self.base is None else self.base.nbytes)
+
+    def __len__(self) -> int:
+        return self.shape[-1]
+
+    def __array__(self, dtype=None, copy=None):
+        raise TypeError("OffsetTrace holds time errors, not readings; use .offsets() or .elapsed(time)")
+
+    def write(self, k0: int, x) -> None:
+        """Store time errors x at samples k0, k0 + 1, ... (sequential fill)."""
+        x = np.asarray(x, dtype=float)
+        k0 = int(k0)
+        k1 = k0 + x.shape[-1]
+        if self.base is None:
+            self.data[..., k0:k1] = x
+            return
+        b = self.block
+        first = -(-k0 // b)  # blocks starting inside [k0, k1) take their first value as base
+        for j in range(first, -(-k1 // b)):
+            self.base[..., j] = x[..., j * b - k0]
+        idx = np.arange(k0, k1) // b
+        self.data[..., k0:k1] = x - self.base[..., idx]
+
+    def offsets(self, k0: int = 0, k1: Optional[int] = None) -> np.ndarray:
+        """float64 time errors of samples k0..k1-1."""
+        k1 = self.shape[-1] if k1 is None else int(k1)
+        if self.base is None:
+            return np.asarray(self.data[..., k0:k1], dtype=float)
+        idx = np.arange(k0, k1) // self.block
+        return self.base[..., idx] + self.data[..., k0:k1]
+
+    def elapsed(self, time_s) -> np.ndarray:
+        """Readings time + x (rounded to float64 again)."""
+        return np.asarray(time_s, dtype=float) + self.offsets()
+
+    @staticmethod
+    def concatenate(parts: Iterable["OffsetTrace"]) -> "OffsetTrace":
+        parts = list(parts)
+        x = np.concatenate([p.offsets() for p in parts], axis=-1)
+        return OffsetTrace.from_offsets(x, parts[0].dtype, parts[0].block)
+
+
+def time_error(time_s, trace) -> np.ndarray:
+    """x = reading - time [s] of a reading array or an OffsetTrace."""
+    if isinstance(trace, OffsetTrace):
+        return trace.offsets()
+    return np.asarray(trace, dtype=float) - np.asarray(time_s, dtype=float)
+
+
+def to_offsets(timeseries_dict, dtype=np.float64):
+    """Convert a reading-based run_clocks dict to OffsetTraces (x = reading - time).
+
+    Only the representation changes; the rounding already in the readings
+    is kept. Use run_clocks(..., representation="offset") for exact traces.
+    """
+    t = np.asarray(timeseries_dict["time"], dtype=float)
+    out = {}
+    for key, value in timeseries_dict.items():
+        if key.startswith("clock_") and key[6:].isdigit() and not isinstance(value, OffsetTrace):
+            out[key] = OffsetTrace.from_offsets(time_error(t, value), dtype)
+        else:
+            out[key] = value
+    return out
@@ -0,0 +1,426 @@
+"""Process-pool drivers for many independent simulations.
+
+run_sweep fans a parameter grid out over worker processes. Every scenario
+gets its clock seeds from numpy.random.SeedSequence spawned in grid order,
+so results do not depend on worker count or completion order. Traces, when
+kept, are written by the worker straight into shared memory allocated by
+the parent rather than being pickled back.
+
+run_segmented splits one long run of counter-mode clocks (rng="counter")
+into time segments simulated on different workers; boundary states come
+from a scan over per-segment summaries, so the stitched traces equal a
+serial run_clocks bit-for-bit.
+
+run_branches simulates a shared warm-up once, forks every clock at its end
+(Clock.fork) and runs the what-if continuations on the pool.
+"""
+from __future__ import annotations
+
+import inspect
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from multiprocessing import shared_memory
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from .analysis import (
+    _block_steps,
+    _n_steps,
+    _step_block,
+    _time_slice,
+    compare_clocks,
+    consensus_weighted_average,
+    iter_run_clocks,
+    run_clocks,
+)
+from .clocks.counter import SEGMENT_STEPS, scan_boundaries
+from .core import Clock, ClockSnapshot, fork_clocks
+from .instrument import timed
+
+ClockFactory = Callable[..., Clock]
+
+
+@dataclass
+class SweepResult:
+    """Tidy metrics table (one row per scenario and clock) plus optional traces."""
+
+    rows: List[Dict[str, Any]]
+    scenarios: List[Dict[str, Any]]
+    traces: Dict[int, Dict[str, np.ndarray]] = field(default_factory=dict)
+
+    def to_pandas(self):
+        """Return rows as a pandas DataFrame (requires pandas)."""
+        import pandas as pd
+        return pd.DataFrame(self.rows)
+
+
+def _int_seed(seq: np.random.SeedSequence) -> int:
+    return int(seq.generate_state(1, dtype=np.uint64)[0])
+
+
+def _call_factory(factory: ClockFactory, params: Mapping[str, Any], seed: int) -> Clock:
+    """Call factory with the grid parameters (and seed) its signature accepts."""
+    try:
+        sig = inspect.signature(factory)
+    except (TypeError, ValueError):  # pragma: no cover - builtins without signature
+        return factory(seed=seed, **params)
+    accepts_any = any(p.kind is p.VAR_KEYWORD for p in sig.parameters.values())
+    kwargs = {k: v for k, v in params.items() if accepts_any or k in sig.parameters}
+    if accepts_any or "seed" in sig.parameters:
+        kwargs["seed"] = seed
+    return factory(**kwargs)
+
+
+def _scenario_metrics(ts: Dict[str, np.ndarray], clocks: Sequence[Clock], method: str, tau) -> List[Dict[str, Any]]:
+    """Metrics of every clock_i (i >= 1) and of their consensus vs clock_0."""
+    keys = [f"clock_{i}" for i in range(1, len(clocks))]
+    rows = []
+    weights = None
+    cons = None
+    if len(keys) >= 2:
+        cons = consensus_weighted_average(ts, keys, method=method, tau=tau)
+        weights = cons["weights"]
+    for j, key in enumerate(keys):
+        row = {"clock": key, "type": clocks[j + 1].get_metadata().get("type")}
+        row.update(compare_clocks(ts["time"], ts["clock_0"], ts[key]))
+        row["weight"] = weights[j] if weights is not None else 1.0
+        rows.append(row)
+    if cons is not None:
+        row = {"clock": "consensus", "type": method}
+        row.update(compare_clocks(ts["time"], ts["clock_0"], cons["consensus"]))
+        row["weight"] = None
+        rows.append(row)
+    return rows
+
+
+def _run_scenario(task: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Worker entry point: simulate one scenario and return its metric rows."""
+    params = task["params"]
+    clocks = [_call_factory(f, params, s) for f, s in zip(task["factories"], task["seeds"])]
+    n_samples = task["n_samples"]
+    shm = None
+    if task["shm_name"] is not None:
+        shm = shared_memory.SharedMemory(name=task["shm_name"])
+        block = np.ndarray((len(clocks) + 1, n_samples), dtype=float, buffer=shm.buf)
+    else:
+        block = np.empty((len(clocks) + 1, n_samples), dtype=float)
+    try:
+        dt = float(task["dt"])
+        n_steps = n_samples - 1
+        block_steps = _block_steps(clocks)
+        for k0 in range(0, n_samples, block_steps):
+            k1 = min(k0 + block_steps, n_samples)
+            block[0, k0:k1] = _time_slice(k0, k1, n_steps, dt)
+            for i, c in enumerate(clocks):
+                _step_block(block[i + 1, k0:k1], c.read_time, c.advance, k0, dt)
+        ts = {"time": block[0]}
+        ts.update({f"clock_{i}": block[i + 1] for i in range(len(clocks))})
+        return _scenario_metrics(ts, clocks, task["method"], task["tau"])
+    finally:
+        del block
+        if shm is not None:
+            shm.close()
+
+
+@timed
+def run_sweep(
+    factories: Sequence[ClockFactory],
+    grid: Mapping[str, Sequence[Any]],
+    duration: float = 86_400.0,
+    dt: float = 1.0,
+    seed: Optional[int] = 0,
+    n_replicates: int = 1,
+    n_workers: Optional[int] = None,
+    keep_traces: bool = False,
+    method: str = "inv_var_frac",
+    tau: Optional[float] = None,
+) -> SweepResult:
+    """Run every scenario of a parameter grid on a process pool.
+
+    Parameters
+    ----------
+    factories : sequence of callables
+        One per clock; factories[0] builds the reference (clock_0). Each is
+        called with the grid parameters its signature accepts plus ``seed``
+        if accepted, so clock classes can be passed directly.
+    grid : mapping name -> values
+        Cartesian product of values defines the scenarios. The names
+        'duration' and 'dt' override the defaults per scenario.
+    seed : int | None
+        Parent seed; scenario k (in grid order, replicates innermost) uses
+        the k-th child of SeedSequence(seed), one grandchild per clock.
+    n_replicates : int
+        Independent seed replicates per grid point.
+    n_workers : int | None
+        Pool size (None -> os.cpu_count()); 0 runs in-process.
+    keep_traces : bool
+        Return each scenario's run_clocks dict, transferred via shared memory.
+    method, tau
+        Passed to consensus_weighted_average for scenarios with two or more
+        clocks besides the reference.
+
+    Returns
+    -------
+    SweepResult with one row per (scenario, clock) and a 'consensus' row,
+    each holding the scenario parameters and the compare_clocks metrics.
+
+    Every scenario's duration and dt are checked as in run_clocks before
+    any is dispatched; a non-finite or non-positive one raises ValueError
+    naming the scenario.
+    """
+    if not factories:
+        raise ValueError("need at least one clock factory")
+    names = list(grid)
+    points = list(itertools.product(*(grid[name] for name in names)))
+    scenario_seeds = np.random.SeedSequence(seed).spawn(len(points) * int(n_replicates))
+
+    # validate every scenario here, so a bad one fails before any worker starts
+    scenarios, tasks, buffers = [], [], []
+    for idx, (values, rep) in enumerate(itertools.product(points, range(int(n_replicates)))):
+        params = dict(zip(names, values))
+        s_duration = float(params.pop("duration", duration))
+        s_dt = float(params.pop("dt", dt))
+        try:
+            n_samples = _n_steps(s_duration, s_dt) + 1
+        except ValueError as exc:
+            raise ValueError(f"scenario {idx} (duration={s_duration}, dt={s_dt}): {exc}") from None
+        seeds = [_int_seed(child) for child in scenario_seeds[idx].spawn(len(factories))]
+        scenarios.append({"scenario": idx, "replicate": rep, **params, "duration": s_duration, "dt": s_dt})
+        tasks.append({
+            "params": params, "factories": list(factories), "seeds": seeds,
+            "duration": s_duration, "dt": s_dt, "n_samples": n_samples,
+            "shm_name": None, "method": method, "tau": tau,
+        })
+
+    try:
+        for task in tasks:
+            shm = None
+            if keep_traces:
+                nbytes = (len(factories) + 1) * task["n_samples"] * np.dtype(float).itemsize
+                shm = shared_memory.SharedMemory(create=True, size=nbytes)
+                task["shm_name"] = shm.name
+            buffers.append(shm)
+
+        if n_workers == 0:
+            results = [_run_scenario(task) for task in tasks]
+        else:
+            with ProcessPoolExecutor(max_workers=n_workers) as pool:
+                results = list(pool.map(_run_scenario, tasks))
+
+        rows, traces = [], {}
+        for scenario, task, shm, metric_rows in zip(scenarios, tasks, buffers, results):
+            rows.extend({**scenario, **row} for row in metric_rows)
+            if shm is not None:
+                block = np.ndarray((len(factories) + 1, task["n_samples"]), dtype=float, buffer=shm.buf)
+                ts = {"time": block[0].copy()}
+                ts.update({f"clock_{i}": block[i + 1].copy() for i in range(len(factories))})
+                traces[scenario["scenario"]] = ts
+                del block
+    finally:
+        for shm in buffers:
+            if shm is not None:
+                shm.close()
+                shm.unlink()
+    return SweepResult(rows=rows, scenarios=scenarios, traces=traces)
+
+
+def _segment_summaries(clock: Clock, segments: Sequence[Tuple[int, int]], dt: float) -> List[Tuple[float, ...]]:
+    """Worker: end-of-segment terms for (segment index, n_steps) pairs."""
+    return [clock.segment_summary(seg, n, dt) for seg, n in segments]
+
+
+def _segment_traces(task: Dict[str, Any]) -> None:
+    """Worker: simulate segments [s0, s1) of every clock from known boundary states."""
+    shm = shared_memory.SharedMemory(name=task["shm_name"])
+    try:
+        out = np.ndarray(task["shape"], dtype=float, buffer=shm.buf)
+        k0, k1 = task["k0"], task["k1"]
+        for row, clock, (step, elapsed, y) in zip(task["rows"], task["clocks"], task["starts"]):
+            clock.seek(step, elapsed, y)
+            out[row, k0 + 1:k1 + 1] = clock.advance(k1 - k0, task["dt"])
+        del out
+    finally:
+        shm.close()
+
+
+def _segment_state(clock: Clock):
+    """clock.segment_state() for counter-mode clocks, else None."""
+    accessor = getattr(clock, "segment_state", None)
+    return None if accessor is None else accessor()
+
+
+def _is_segmentable(clock: Clock) -> bool:
+    state = _segment_state(clock)
+    return state is not None and state[0] % SEGMENT_STEPS == 0
+
+
+@timed
+def run_segmented(
+    clocks: List[Clock],
+    duration: float,
+    dt: float,
+    n_workers: Optional[int] = None,
+    segments_per_task: int = 4,
+) -> Dict[str, np.ndarray]:
+    """run_clocks for counter-mode clocks with time segments on a process pool.
+
+    Pass 1 computes each segment's summary in parallel, a serial scan turns
+    them into boundary states (elapsed time and carried frequency state),
+    and pass 2 simulates every segment from its boundary state into shared
+    memory. The result equals run_clocks(clocks, duration, dt) exactly;
+    clocks not in counter mode (e.g. IdealClock) are stepped serially in the
+    parent. Clocks are left in their end state, as with run_clocks.
+
+    Parameters
+    ----------
+    segments_per_task : int
+        Consecutive SEGMENT_STEPS-step segments handled by one task.
+    n_workers : int | None
+        Pool size (None -> os.cpu_count()); 0 runs in-process.
+    """
+    duration = float(duration); dt = float(dt)
+    n_steps = _n_steps(duration, dt)
+    seg_lengths = [min(SEGMENT_STEPS, n_steps - k) for k in range(0, n_steps, SEGMENT_STEPS)]
+    per_task = max(1, int(segments_per_task))
+    groups = [list(range(g, min(g + per_task, len(seg_lengths)))) for g in range(0, len(seg_lengths), per_task)]
+    fast = [i for i, c in enumerate(clocks) if _is_segmentable(c)]
+    bases = {i: _segment_state(clocks[i]) for i in fast}
+
+    shape = (len(clocks), n_steps + 1)
+    shm = shared_memory.SharedMemory(create=True, size=max(1, shape[0] * shape[1] * np.dtype(float).itemsize))
+    try:
+        out = np.ndarray(shape, dtype=float, buffer=shm.buf)
+        for i, c in enumerate(clocks):
+            out[i, 0] = c.read_time()
+
+        def _map(fn, tasks):
+            if n_workers == 0:
+                return [fn(*t) if isinstance(t, tuple) else fn(t) for t in tasks]
+            with ProcessPoolExecutor(max_workers=n_workers) as pool:
+                futures = [pool.submit(fn, *t) if isinstance(t, tuple) else pool.submit(fn, t) for t in tasks]
+                return [f.result() for f in futures]
+
+        # pass 1: per-segment summaries
+        summary_tasks = []
+        for i in fast:
+            base_seg = bases[i][0] // SEGMENT_STEPS
+            for g in groups:
+                summary_tasks.append((clocks[i], [(base_seg + j, seg_lengths[j]) for j in g], dt))
+        summaries = _map(_segment_summaries, summary_tasks)
+
+        # scan: boundary states per clock and segment
+        starts = {}
+        for n, i in enumerate(fast):
+            flat = [s for part in summaries[n * len(groups):(n + 1) * len(groups)] for s in part]
+            starts[i] = scan_boundaries(flat, bases[i][1], bases[i][2])
+
+        # pass 2: traces from boundary states
+        trace_tasks = []
+        for g in groups:
+            k0 = g[0] * SEGMENT_STEPS
+            trace_tasks.append({
+                "shm_name": shm.name, "shape": shape, "dt": dt,
+                "k0": k0, "k1": k0 + sum(seg_lengths[j] for j in g),
+                "rows": fast, "clocks": [clocks[i] for i in fast],
+                "starts": [(bases[i][0] + k0,) + starts[i][g[0]] for i in fast],
+            })
+        _map(_segment_traces, trace_tasks)
+
+        # remaining clocks serially; leave every clock in its end state
+        for i, c in enumerate(clocks):
+            if i in bases:
+                last = len(seg_lengths) - 1
+                c.seek(bases[i][0] + last * SEGMENT_STEPS, *starts[i][last])
+                c.advance(seg_lengths[last], dt)
+            else:
+                for k in range(1, n_steps + 1, SEGMENT_STEPS):
+                    _step_block(out[i, k:k + SEGMENT_STEPS], c.read_time, c.advance, k, dt)
+
+        result = {"time": _time_slice(0, n_steps + 1, n_steps, dt)}
+        for i in range(len(clocks)):
+            result[f"clock_{i}"] = out[i].copy()
+        del out
+    finally:
+        shm.close()
+        shm.unlink()
+    return result
+
+
+@dataclass
+class BranchResult:
+    """Warm-up trace, end-of-warm-up snapshots and one trace per branch."""
+
+    warmup: Dict[str, np.ndarray]
+    snapshots: List[ClockSnapshot]
+    branches: List[Dict[str, np.ndarray]]
+
+
+def _run_branch(task: Dict[str, Any]) -> Dict[str, np.ndarray]:
+    """Worker: run one branch's forked clocks; time continues from the warm-up."""
+    ts = run_clocks(task["clocks"], task["duration"], task["dt"])
+    ts["time"] += task["t0"]
+    return ts
+
+
+@timed
+def run_branches(
+    clocks: List[Clock],
+    warmup: float,
+    duration: float,
+    dt: float,
+    branches: Union[int, Sequence[Callable[[List[Clock]], None]]] = 1,
+    independent: bool = False,
+    n_workers: Optional[int] = None,
+    keep_warmup: bool = True,
+) -> BranchResult:
+    """Simulate a common warm-up once, then many continuations in parallel.
+
+    Parameters
+    ----------
+    clocks : list of Clock
+        Advanced through the warm-up in place and left at its end.
+    warmup, duration : float
+        Warm-up length and per-branch length [s].
+    branches : int or sequence of callables
+        Number of plain continuations, or one callable per branch that
+        receives the branch's forked clocks (e.g. to change a parameter)
+        before it runs. Callables run in the parent process.
+    independent : bool
+        True: each branch gets child noise streams spawned in branch order
+        (reproducible, distinct per branch); every clock must implement
+        Clock.fork_streams. False (default): every branch continues the
+        warm-up's own streams, which works for any clock.
+    n_workers : int | None
+        Pool size (None -> os.cpu_count()); 0 runs in-process.
+    keep_warmup : bool
+        Return the warm-up trace (otherwise it is streamed and discarded).
+
+    Returns
+    -------
+    BranchResult; each branch is a run_clocks dict whose 'time' starts at
+    the warm-up end, with the clocks' readings there as first sample.
+    """
+    warmup = float(warmup); dt = float(dt)
+    if keep_warmup:
+        prefix = run_clocks(clocks, warmup, dt)
+    else:
+        for _ in iter_run_clocks(clocks, warmup, dt):
+            pass
+        prefix = {}
+    t0 = _n_steps(warmup, dt) * dt
+    modifiers = [None] * int(branches) if isinstance(branches, int) else list(branches)
+
+    tasks = []
+    for modify in modifiers:
+        forked = fork_clocks(clocks, independent=independent)
+        if modify is not None:
+            modify(forked)
+        tasks.append({"clocks": forked, "duration": float(duration), "dt": dt, "t0": t0})
+    if n_workers == 0:
+        results = [_run_branch(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=n_workers) as pool:
+            results = list(pool.map(_run_branch, tasks))
+    return BranchResult(warmup=prefix, snapshots=[c.snapshot() for c in clocks], branches=results)
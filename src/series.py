@@ -0,0 +1,250 @@
+"""Memoizing container for run_clocks results.
+
+An analysis pass over one run usually derives the same intermediates again
+and again: every consensus method differences each clock to fractional
+frequency, every fractional_frequency_from_time call re-checks the time
+grid, compare_clocks re-subtracts the same pair and every ADEV request
+rebuilds the phase prefix sums. ``TimeSeries`` wraps a run_clocks dict
+(arrays, memory-mapped arrays or offsets.OffsetTrace values) and computes
+each of these once, on first use:
+
+- ``time_error(key)``: x = reading - time [s].
+- ``fractional_frequency(key, dt=None)``: y, as fractional_frequency_from_time.
+- ``difference(key_a, key_b)``: trace b - trace a, as compare_clocks takes it.
+- ``steps()`` / ``uniform_step()``: the checked time steps and the inferred
+  uniform dt.
+- ``phase(key, dt)`` / ``phase_sum(key, dt)``: the detrended phase and its
+  prefix sum that stability.stability works from; ``stability(keys, ...)``
+  evaluates any tau grid from them.
+
+A TimeSeries is a read-only Mapping, so every function that takes a
+run_clocks dict takes it too. compare_clocks, fractional_frequency_from_time,
+pairwise_metrics and consensus_weighted_average recognise it and use the
+cached series, with results identical to the plain dict:
+
+    ts = TimeSeries(run_clocks(clocks, duration, dt), max_bytes=2**30)
+    for method in ("inv_var_frac", "inv_oadev_tau", "n_cornered_hat"):
+        consensus_weighted_average(ts, ["clock_1", "clock_2"], method=method, tau=1.0)
+
+Cached arrays count against ``max_bytes``; the least recently used ones are
+dropped once the total exceeds it, and an array larger than the whole budget
+is returned without being kept.
+"""
+from __future__ import annotations
+
+from collections import OrderedDict
+from collections.abc import Mapping
+from typing import Callable, Dict, Hashable, Iterable, Iterator, Optional, Sequence
+
+import numpy as np
+
+from .offsets import OffsetTrace, time_error
+from .stability import KINDS, detrended_phase, phase_prefix_sum, stability_from_phase
+
+
+def _nbytes(value) -> int:
+    if isinstance(value, tuple):
+        return sum(_nbytes(v) for v in value)
+    return int(value.nbytes) if isinstance(value, np.ndarray) else 0
+
+
+def grid_denominator(steps: np.ndarray, dt: Optional[float]):
+    """Denominator of y = diff(x) / denom: the steps themselves, or dt checked against them.
+
+    Raises ValueError if dt is not positive or the steps differ from it by
+    more than 1e-6 relative. Shared by analysis.fractional_frequency_from_time
+    and TimeSeries.fractional_frequency.
+    """
+    if dt is None:
+        return steps
+    denom = float(dt)
+    if denom <= 0:
+        raise ValueError("dt must be positive")
+    if not np.allclose(steps, denom, rtol=1e-6, atol=0.0):
+        raise ValueError("time grid spacing does not match provided dt")
+    return denom
+
+
+class TimeSeries(Mapping):
+    """Read-only run_clocks dict that memoizes derived series.
+
+    Parameters
+    ----------
+    timeseries_dict : mapping
+        A run_clocks (or open_run / Recording.as_dict) result with a 'time'
+        entry. The arrays are referenced, not copied.
+    max_bytes : int
+        Budget for the cached arrays; least recently used entries are
+        evicted when a new one pushes the total above it.
+    """
+
+    def __init__(self, timeseries_dict, max_bytes: int = 2**30) -> None:
+        if "time" not in timeseries_dict:
+            raise ValueError("timeseries_dict needs a 'time' entry")
+        if int(max_bytes) < 0:
+            raise ValueError("max_bytes must be >= 0")
+        self._data = dict(timeseries_dict)
+        self.time = np.asarray(self._data["time"], dtype=float)
+        self.max_bytes = int(max_bytes)
+        self._cache: "OrderedDict[Hashable, object]" = OrderedDict()
+        self._cache_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __getitem__(self, key: str):
+        return self._data[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __repr__(self) -> str:
+        return f"TimeSeries(keys={list(self._data)}, cached={len(self._cache)}, cache_bytes={self._cache_bytes})"
+
+    # --- memo -------------------------------------------------------------
+
+    @property
+    def cache_bytes(self) -> int:
+        return self._cache_bytes
+
+    def cache_info(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self._cache),
+                "bytes": self._cache_bytes, "max_bytes": self.max_bytes}
+
+    def clear_cache(self) -> None:
+        self._cache.clear()
+        self._cache_bytes = 0
+
+    def _memo(self, key: Hashable, compute: Callable[[], object]):
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            self.hits += 1
+            return self._cache[key]
+        self.misses += 1
+        value = compute()
+        if isinstance(value, np.ndarray):
+            value.flags.writeable = False  # shared by every later caller
+        size = _nbytes(value)
+        if size <= self.max_bytes:
+            self._cache[key] = value
+            self._cache_bytes += size
+            while self._cache_bytes > self.max_bytes:
+                _, old = self._cache.popitem(last=False)
+                self._cache_bytes -= _nbytes(old)
+        return value
+
+    # --- time grid --------------------------------------------------------
+
+    def steps(self) -> np.ndarray:
+        """np.diff(time), checked to be strictly increasing."""
+        def compute():
+            steps = np.diff(self.time)
+            if np.any(steps <= 0):
+                raise ValueError("time grid must be strictly increasing")
+            return steps
+        return self._memo(("steps",), compute)
+
+    def denominator(self, dt: Optional[float] = None):
+        """The y = diff(x) / denom denominator of fractional_frequency_from_time."""
+        if dt is None:
+            return self.steps()
+        return self._memo(("grid", float(dt)), lambda: grid_denominator(self.steps(), dt))
+
+    def uniform_step(self) -> float:
+        """The step of a uniform grid (rtol 1e-9), as consensus_weighted_average infers it."""
+        def compute():
+            steps = self.steps()
+            if not np.allclose(steps, steps[0], rtol=1e-9, atol=0.0):
+                raise ValueError("time grid must be uniform or provide dt explicitly")
+            return float(steps[0])
+        return self._memo(("uniform",), compute)
+
+    # --- derived series ---------------------------------------------------
+
+    def is_offset(self, key: str) -> bool:
+        return isinstance(self._data[key], OffsetTrace)
+
+    def time_error(self, key: str) -> np.ndarray:
+        """x = reading - time [s] (the offsets of an OffsetTrace)."""
+        return self._memo(("x", key), lambda: time_error(self.time, self._data[key]))
+
+    def _rows(self, key: str, as_time_error: bool) -> np.ndarray:
+        if as_time_error:
+            return self.time_error(key)
+        return np.asarray(self._data[key], dtype=float)
+
+    def frequency(self, key: str, denom, as_time_error: bool) -> np.ndarray:
+        """diff(trace) / denom - rate, differencing time errors (rate 0) or readings (rate 1).
+
+        denom is a scalar dt or the steps() array; no grid check is made.
+        """
+        tag = "steps" if isinstance(denom, np.ndarray) else float(denom)
+        rate = 0.0 if as_time_error else 1.0
+        return self._memo(("y", key, tag, as_time_error),
+                          lambda: np.diff(self._rows(key, as_time_error), axis=-1) / denom - rate)
+
+    def fractional_frequency(self, key: str, dt: Optional[float] = None) -> np.ndarray:
+        """y of one trace; equals fractional_frequency_from_time(time, self[key], dt)."""
+        if tuple(np.shape(self._data[key])) != self.time.shape:
+            raise ValueError("time_s and elapsed_s must have the same shape")
+        if self.time.size < 2:
+            raise ValueError("need at least two samples to compute fractional frequency")
+        return self.frequency(key, self.denominator(dt), self.is_offset(key))
+
+    def difference(self, key_a: str, key_b: str) -> np.ndarray:
+        """Trace b - trace a; time errors if either is an OffsetTrace (as compare_clocks)."""
+        def compute():
+            if self.is_offset(key_a) or self.is_offset(key_b):
+                return self.time_error(key_b) - self.time_error(key_a)
+            return np.asarray(self._data[key_b], dtype=float) - np.asarray(self._data[key_a], dtype=float)
+        return self._memo(("diff", key_a, key_b), compute)
+
+    # --- stability --------------------------------------------------------
+
+    def phase(self, key: str, dt: float, as_time_error: Optional[bool] = None) -> np.ndarray:
+        """Detrended phase rows (n_rows, n) integrated from y at a uniform step dt."""
+        if as_time_error is None:
+            as_time_error = self.is_offset(key)
+        dt = float(dt)
+        return self._memo(("phase", key, dt, as_time_error),
+                          lambda: detrended_phase(self.frequency(key, dt, as_time_error), dt, "freq"))
+
+    def phase_sum(self, key: str, dt: float, as_time_error: Optional[bool] = None) -> np.ndarray:
+        """Prefix sum of phase(key, dt), used by MDEV and TDEV."""
+        if as_time_error is None:
+            as_time_error = self.is_offset(key)
+        dt = float(dt)
+        return self._memo(("phase_sum", key, dt, as_time_error),
+                          lambda: phase_prefix_sum(self.phase(key, dt, as_time_error)))
+
+    def stability(
+        self,
+        keys: Sequence[str],
+        dt: Optional[float] = None,
+        taus=None,
+        kinds: Iterable[str] = KINDS,
+        as_time_error: Optional[bool] = None,
+    ):
+        """stability.stability of the keys' fractional frequencies (one row per trace row).
+
+        dt defaults to uniform_step(). The phase and its prefix sum are
+        cached per key, so further tau grids or kinds cost only the stencil
+        passes. as_time_error=None differences each trace as
+        fractional_frequency does.
+        """
+        dt = self.uniform_step() if dt is None else float(dt)
+        if dt <= 0:
+            raise ValueError("dt must be positive")
+        kinds = tuple(kinds)
+        unknown = set(kinds) - set(KINDS)
+        if unknown:
+            raise ValueError(f"Unknown kinds: {sorted(unknown)}")
+        if isinstance(keys, str):
+            keys = [keys]
+        x = np.concatenate([self.phase(k, dt, as_time_error) for k in keys], axis=0)
+        s = None
+        if "mdev" in kinds or "tdev" in kinds:
+            s = np.concatenate([self.phase_sum(k, dt, as_time_error) for k in keys], axis=0)
+        return stability_from_phase(x, s, dt, taus, kinds, one_d=False)
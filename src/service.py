@@ -0,0 +1,363 @@
+"""Soft-real-time clock service: clocks advanced against the host monotonic clock.
+
+``ClockService`` (Phase II adapter, see docs/decisions.md) runs on asyncio.
+A ticker task wakes every ``tick_interval`` seconds and advances all clocks
+by however many dt steps the host clock has moved on since the last wake.
+The steps are taken as one Clock.advance block in a worker thread. Each
+tick then publishes an immutable ServiceSnapshot with the readings already
+encoded as a JSON line. A client request costs one attribute load and one
+socket write, and there is no lock between readers and the ticker; the new
+snapshot replaces the old one in a single reference assignment.
+
+Protocol (localhost TCP, or a Unix socket with ``path=``): newline-
+terminated requests ``read`` (the current snapshot as one JSON line with
+``step``, ``time_s``, ``host_s`` and ``readings``) and ``quit``.
+``connect`` opens a client connection and ``read_snapshot`` does one read.
+
+``load_clients`` is the client side of the load test: it opens N
+connections and reports p50/p99 read latency and reads/s.
+``run_load_test`` starts the service in a separate process and sweeps the
+client count (1 .. 10,000 by default). See benchmarks/service_load.py.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from .analysis import _block_steps
+from .core import Clock
+
+Address = Union[Tuple[str, int], str]
+
+_ERROR = b'{"error": "unknown request"}\n'
+_MAX_REQUEST = 1024  # bytes buffered without a newline before the request is rejected
+
+
+@dataclass(frozen=True)
+class ServiceSnapshot:
+    """Readings published by one ticker pass (immutable, shared by all readers)."""
+
+    step: int
+    time_s: float  # virtual time step * dt [s]
+    host_s: float  # time.monotonic() at publication
+    readings: tuple  # per clock: float, or tuple of member readings (ClockEnsemble)
+    payload: bytes  # JSON line returned to clients
+
+
+class ClockService:
+    """Serve read_time() of a set of clocks advancing in (scaled) host time.
+
+    Parameters
+    ----------
+    clocks : list of Clock
+        Only the ticker thread touches the clocks after start().
+    dt : float
+        Simulation step [s]; the clocks are at step floor(speed * elapsed / dt).
+    tick_interval : float
+        Host seconds between ticker wakes, i.e. the staleness bound of reads.
+    speed : float
+        Virtual seconds per host second.
+    host, port, path
+        Listen on TCP host:port (port 0 picks a free one) or, with ``path``,
+        on a Unix socket.
+    """
+
+    def __init__(
+        self,
+        clocks: Sequence[Clock],
+        dt: float = 1e-3,
+        tick_interval: float = 0.01,
+        speed: float = 1.0,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        path: Optional[str] = None,
+    ) -> None:
+        if dt <= 0 or tick_interval <= 0 or speed <= 0:
+            raise ValueError("dt, tick_interval and speed must be > 0")
+        self._clocks = list(clocks)
+        self._dt = float(dt)
+        self._tick_interval = float(tick_interval)
+        self._speed = float(speed)
+        self._host, self._port, self._path = host, int(port), path
+        self._step = 0
+        self._t0 = time.monotonic()
+        self._snapshot = self._publish()
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._ticker: Optional[asyncio.Task] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    @property
+    def snapshot(self) -> ServiceSnapshot:
+        """Latest published readings (lock-free: a single reference load)."""
+        return self._snapshot
+
+    @property
+    def address(self) -> Address:
+        """(host, port) or the Unix socket path once started."""
+        if self._server is None:
+            raise ValueError("service is not running")
+        if self._path is not None:
+            return self._path
+        return self._server.sockets[0].getsockname()[:2]
+
+    def _publish(self) -> ServiceSnapshot:
+        readings = []
+        for c in self._clocks:
+            value = c.read_time()
+            readings.append(tuple(np.asarray(value, dtype=float).tolist()) if np.ndim(value) else float(value))
+        time_s = self._step * self._dt
+        host_s = time.monotonic()
+        payload = json.dumps({"step": self._step, "time_s": time_s, "host_s": host_s, "readings": readings})
+        return ServiceSnapshot(self._step, time_s, host_s, tuple(readings), payload.encode() + b"\n")
+
+    def _advance_to(self, target: int) -> ServiceSnapshot:
+        """Ticker thread: advance every clock to step ``target`` in blocks."""
+        while self._step < target:
+            m = min(target - self._step, _block_steps(self._clocks))
+            for c in self._clocks:
+                c.advance(m, self._dt)
+            self._step += m
+        return self._publish()
+
+    async def _run_ticker(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            target = int((time.monotonic() - self._t0) * self._speed / self._dt)
+            if target > self._step:
+                self._snapshot = await loop.run_in_executor(self._executor, self._advance_to, target)
+            await asyncio.sleep(self._tick_interval)
+
+    async def start(self, backlog: int = 4096) -> None:
+        """Start the ticker and listen; clocks run from the current host time."""
+        if self._server is not None:
+            raise ValueError("service is already running")
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="clock-ticker")
+        self._t0 = time.monotonic() - self._step * self._dt / self._speed
+        loop = asyncio.get_running_loop()
+        if self._path is not None:
+            self._server = await loop.create_unix_server(lambda: _ReadProtocol(self), self._path, backlog=backlog)
+        else:
+            self._server = await loop.create_server(lambda: _ReadProtocol(self), self._host, self._port, backlog=backlog)
+        self._ticker = asyncio.create_task(self._run_ticker())
+
+    async def stop(self) -> None:
+        if self._server is None:
+            return
+        self._ticker.cancel()
+        try:
+            await self._ticker
+        except asyncio.CancelledError:
+            pass
+        self._server.close()
+        await self._server.wait_closed()
+        self._executor.shutdown(wait=True)
+        self._server = self._ticker = self._executor = None
+
+    async def __aenter__(self) -> "ClockService":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.stop()
+
+
+class _ReadProtocol(asyncio.Protocol):
+    """Per-connection handler: answer each request line from the current snapshot."""
+
+    def __init__(self, service: ClockService) -> None:
+        self._service = service
+        self._transport: Optional[asyncio.Transport] = None
+        self._pending = b""
+
+    def connection_made(self, transport: asyncio.BaseTransport) -> None:
+        self._transport = transport
+
+    def data_received(self, data: bytes) -> None:
+        lines = (self._pending + data).split(b"\n")
+        self._pending = lines.pop()
+        replies = []
+        for line in lines:
+            request = line.strip().lower()
+            if request == b"quit":
+                self._transport.write(b"".join(replies))
+                self._transport.close()
+                return
+            replies.append(self._service._snapshot.payload if request == b"read" else _ERROR)
+        if len(self._pending) > _MAX_REQUEST:
+            replies.append(_ERROR)
+            self._pending = b""
+        self._transport.write(b"".join(replies))
+
+
+async def connect(address: Address) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+    """Open a client connection to a ClockService at ``address``."""
+    if isinstance(address, str):
+        return await asyncio.open_unix_connection(address)
+    return await asyncio.open_connection(*address)
+
+
+async def read_snapshot(address: Address) -> Dict[str, Any]:
+    """One-shot client: connect, read the current snapshot, disconnect."""
+    reader, writer = await connect(address)
+    try:
+        writer.write(b"read\n")
+        await writer.drain()
+        return json.loads(await reader.readline())
+    finally:
+        writer.close()
+        await writer.wait_closed()
+
+
+def _raise_fd_limit(needed: int) -> None:
+    try:
+        import resource
+    except ImportError:  # not available on Windows
+        return
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft != resource.RLIM_INFINITY and soft < needed:
+        limit = needed if hard == resource.RLIM_INFINITY else min(needed, hard)
+        resource.setrlimit(resource.RLIMIT_NOFILE, (limit, hard))
+
+
+async def _client_latencies(
+    address: Address, n_clients: int, reads_per_client: int, interval_s: float, max_connecting: int = 256
+) -> Tuple[np.ndarray, float]:
+    """(n_clients, reads_per_client) read latencies [s] and the wall time of the reads."""
+    _raise_fd_limit(n_clients + 64)
+    gate = asyncio.Semaphore(max_connecting)
+    latencies = np.empty((n_clients, reads_per_client))
+    perf = time.perf_counter
+
+    async def open_gated():
+        async with gate:
+            return await connect(address)
+
+    async def client(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, row: np.ndarray, due: float) -> None:
+        try:
+            for j in range(reads_per_client):
+                if interval_s:
+                    await asyncio.sleep(max(0.0, due + j * interval_s - perf()))
+                t0 = perf()
+                writer.write(b"read\n")
+                await reader.readline()
+                row[j] = perf() - t0
+            writer.write(b"quit\n")
+        finally:
+            writer.close()
+
+    connections = await asyncio.gather(*(open_gated() for _ in range(n_clients)))
+    started = perf()
+    await asyncio.gather(*(
+        client(r, w, latencies[i], started + interval_s * i / n_clients) for i, (r, w) in enumerate(connections)
+    ))
+    return latencies, perf() - started
+
+
+def _summary(n_clients: int, latencies: np.ndarray, wall: float) -> Dict[str, float]:
+    us = latencies.ravel() * 1e6
+    return {
+        "clients": n_clients,
+        "reads": int(us.size),
+        "p50_us": float(np.percentile(us, 50)),
+        "p99_us": float(np.percentile(us, 99)),
+        "max_us": float(us.max()),
+        "reads_per_s": us.size / wall,
+        "wall_s": wall,
+    }
+
+
+async def load_clients(
+    address: Address,
+    n_clients: int,
+    reads_per_client: int = 100,
+    interval_s: float = 0.0,
+    max_connecting: int = 256,
+) -> Dict[str, float]:
+    """Run n_clients concurrent connections, each issuing reads_per_client reads.
+
+    With interval_s = 0 each client sends ``read`` as soon as the previous
+    reply arrives; otherwise client i reads on the schedule
+    i * interval_s / n_clients + j * interval_s (j = 0, 1, ...). Connections
+    are opened at most max_connecting at a time, and the reads start once
+    all are up. Returns clients, reads, p50_us, p99_us, max_us,
+    reads_per_s and wall_s.
+    """
+    n_clients = int(n_clients)
+    reads_per_client = int(reads_per_client)
+    if n_clients < 1 or reads_per_client < 1:
+        raise ValueError("n_clients and reads_per_client must be >= 1")
+    latencies, wall = await _client_latencies(address, n_clients, reads_per_client, float(interval_s), max_connecting)
+    return _summary(n_clients, latencies, wall)
+
+
+def _client_process(args) -> Tuple[np.ndarray, float]:
+    return asyncio.run(_client_latencies(*args))
+
+
+def _serve(clocks, options: Dict[str, Any], conn) -> None:
+    """Service process for run_load_test: report the address, run until told to stop."""
+
+    async def main() -> None:
+        async with ClockService(clocks, **options) as service:
+            conn.send(service.address)
+            await asyncio.get_running_loop().run_in_executor(None, conn.recv)
+
+    _raise_fd_limit(20_000)
+    asyncio.run(main())
+
+
+def run_load_test(
+    clocks: Sequence[Clock],
+    clients: Sequence[int] = (1, 10, 100, 1000, 10_000),
+    total_reads: int = 200_000,
+    rate: Optional[float] = None,
+    client_processes: int = 1,
+    **service_options,
+) -> List[Dict[str, float]]:
+    """Serve ``clocks`` from a child process and load it at each client count.
+
+    Every level issues about total_reads reads (at least 10 per client).
+    With rate=None clients read back to back (closed loop: measures
+    throughput, latency grows with queueing). With a total rate [reads/s]
+    each client paces itself to rate / n_clients, which shows the latency
+    at a fixed load as the number of clients grows. The service runs in
+    its own process; clients run in this one, or are split over
+    client_processes worker processes so that on a multi-core host the
+    client side does not bound the measurement. ``service_options`` go to
+    ClockService (dt, tick_interval, speed, path, ...).
+    """
+    parent, child = multiprocessing.Pipe()
+    proc = multiprocessing.Process(target=_serve, args=(list(clocks), service_options, child), daemon=True)
+    proc.start()
+    try:
+        address = parent.recv()
+        if isinstance(address, list):
+            address = tuple(address)
+        rows = []
+        for n in map(int, clients):
+            per_client = max(10, int(total_reads) // n)
+            interval = 0.0 if rate is None else n / float(rate)
+            shares = [k for k in np.diff(np.linspace(0, n, max(1, int(client_processes)) + 1).astype(int)) if k]
+            if len(shares) == 1:
+                latencies, wall = _client_process((address, n, per_client, interval))
+            else:
+                with ProcessPoolExecutor(max_workers=len(shares)) as pool:
+                    parts = list(pool.map(_client_process, [(address, k, per_client, interval) for k in shares]))
+                latencies = np.concatenate([lat for lat, _ in parts])
+                wall = max(w for _, w in parts)
+            row = _summary(n, latencies, wall)
+            row["rate"] = rate
+            rows.append(row)
+        return rows
+    finally:
+        parent.send("stop")
+        proc.join(timeout=10)
+        if proc.is_alive():
+            proc.terminate()
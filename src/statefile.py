@@ -0,0 +1,68 @@
+"""Clock states on disk without pickle.
+
+``dumps`` turns a value built from JSON types and ndarrays (such as a list
+of Clock.get_state() dicts) into the bytes of one .npz file: the arrays are
+stored as npz members and everything else as a JSON document that refers
+to them. ``loads`` reads it back with ``allow_pickle=False``, so loading a
+state file never executes code. The result cache (cache.py) and the
+checkpoints of run directories (storage.py) both use this format.
+"""
+from __future__ import annotations
+
+import io
+import json
+import zipfile
+from typing import Any, Dict
+
+import numpy as np
+
+_DOCUMENT = "__json__"
+
+# Errors raised by loads() for a truncated, corrupt or foreign file.
+LOAD_ERRORS = (OSError, ValueError, KeyError, EOFError, zipfile.BadZipFile)
+
+
+def _split_arrays(obj: Any, arrays: Dict[str, np.ndarray]) -> Any:
+    """obj with every ndarray replaced by a reference into ``arrays``."""
+    if isinstance(obj, np.ndarray):
+        name = f"a{len(arrays)}"
+        arrays[name] = obj
+        return {"__array__": name}
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, dict):
+        return {k: _split_arrays(v, arrays) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_split_arrays(v, arrays) for v in obj]
+    return obj
+
+
+def _join_arrays(obj: Any, arrays: Dict[str, np.ndarray]) -> Any:
+    """Inverse of _split_arrays."""
+    if isinstance(obj, dict):
+        if set(obj) == {"__array__"}:
+            return arrays[obj["__array__"]]
+        return {k: _join_arrays(v, arrays) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [_join_arrays(v, arrays) for v in obj]
+    return obj
+
+
+def dumps(obj: Any) -> bytes:
+    """Bytes of an .npz holding obj (tuples come back as lists).
+
+    Raises TypeError if obj holds values other than JSON types, NumPy
+    scalars and ndarrays.
+    """
+    arrays: Dict[str, np.ndarray] = {}
+    document = json.dumps(_split_arrays(obj, arrays))
+    buf = io.BytesIO()
+    np.savez(buf, **{_DOCUMENT: np.array(document)}, **arrays)
+    return buf.getvalue()
+
+
+def loads(data: bytes) -> Any:
+    """Inverse of dumps; raises one of LOAD_ERRORS for a file it cannot read."""
+    with np.load(io.BytesIO(data), allow_pickle=False) as npz:
+        arrays = {name: npz[name] for name in npz.files}
+    return _join_arrays(json.loads(str(arrays.pop(_DOCUMENT))), arrays)
@@ -0,0 +1,172 @@
+"""Run directories: run_clocks written straight to memory-mapped .npy files.
+
+``run_clocks_to_disk`` preallocates ``time.npy`` and one ``clock_i.npy`` per
+clock in a run directory and fills them block by block, so traces never
+have to fit in RAM. At regular intervals the mapped files are flushed and
+every clock's ``get_state()`` is written to ``checkpoint.npz`` (statefile
+format, no pickle), so a job
+that is killed can be resumed from the last checkpoint. Call again with
+freshly constructed, identical clocks and the same directory. The resumed
+traces are bit-identical to an uninterrupted run because block splits do
+not change any clock's output (see Clock.advance).
+
+Directory layout::
+
+    run.json         n_steps, dt, duration, keys, shapes, clock metadata, complete
+    time.npy         (n_steps + 1,)
+    clock_i.npy      (n_steps + 1,) or (M, n_steps + 1) for a ClockEnsemble
+    checkpoint.npz   {"k": samples written, "states": [clock.get_state(), ...]}
+"""
+from __future__ import annotations
+
+import json
+import os
+import time
+from typing import Dict, List
+
+import numpy as np
+
+from . import statefile
+from .analysis import _BLOCK_STEPS, _block_steps, _n_steps, _run_stats, _step_block, _time_slice, _trace_shape
+from .core import Clock
+
+_RUN_FILE = "run.json"
+_CHECKPOINT_FILE = "checkpoint.npz"
+
+
+def _write_atomic(path: str, data: bytes) -> None:
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as fh:
+        fh.write(data)
+        fh.flush()
+        os.fsync(fh.fileno())
+    os.replace(tmp, path)
+
+
+def open_run(directory: str, mode: str = "r") -> Dict[str, np.memmap]:
+    """Memory-map the traces of a run directory ('r' read-only, 'r+' writable)."""
+    with open(os.path.join(directory, _RUN_FILE), encoding="utf-8") as fh:
+        meta = json.load(fh)
+    return {key: np.load(os.path.join(directory, f"{key}.npy"), mmap_mode=mode) for key in meta["keys"]}
+
+
+def run_info(directory: str) -> Dict:
+    """run.json of a run directory plus the sample count of the last checkpoint."""
+    with open(os.path.join(directory, _RUN_FILE), encoding="utf-8") as fh:
+        meta = json.load(fh)
+    ckpt = os.path.join(directory, _CHECKPOINT_FILE)
+    if os.path.exists(ckpt):
+        with open(ckpt, "rb") as fh:
+            meta["checkpoint_samples"] = statefile.loads(fh.read())["k"]
+    else:
+        meta["checkpoint_samples"] = 0
+    return meta
+
+
+def run_clocks_to_disk(
+    clocks: List[Clock],
+    duration: float,
+    dt: float,
+    directory: str,
+    checkpoint_every: int = 16 * _BLOCK_STEPS,
+    resume: bool = True,
+) -> Dict[str, np.memmap]:
+    """run_clocks into memory-mapped files in ``directory``, with checkpoints.
+
+    Parameters
+    ----------
+    clocks : list of Clock
+        Clocks at their initial state. On resume they must be constructed
+        exactly as for the original run; their state is loaded from the
+        checkpoint.
+    checkpoint_every : int
+        Steps between checkpoints (flush + state dump); also the largest
+        block passed to Clock.advance is min(checkpoint_every, _BLOCK_STEPS),
+        with _BLOCK_STEPS divided by the largest ClockEnsemble's member count.
+    resume : bool
+        Continue an existing run in ``directory`` (ValueError if its
+        parameters differ). If False, an existing run is overwritten.
+
+    Returns
+    -------
+    dict 'time', 'clock_0', ... of read-only memmaps, usable directly by the
+    analysis functions. The clocks are left in their end-of-run state.
+    """
+    duration = float(duration); dt = float(dt)
+    n_steps = _n_steps(duration, dt)
+    checkpoint_every = int(checkpoint_every)
+    if checkpoint_every < 1:
+        raise ValueError("checkpoint_every must be >= 1")
+    os.makedirs(directory, exist_ok=True)
+    keys = ["time"] + [f"clock_{i}" for i in range(len(clocks))]
+    shapes = [[n_steps + 1]] + [list(_trace_shape(c, n_steps + 1)) for c in clocks]
+    meta = {
+        "n_steps": n_steps,
+        "duration": duration,
+        "dt": dt,
+        "keys": keys,
+        "shapes": shapes,
+        "clocks": [c.get_metadata() for c in clocks],
+        "complete": False,
+    }
+    run_path = os.path.join(directory, _RUN_FILE)
+    ckpt_path = os.path.join(directory, _CHECKPOINT_FILE)
+
+    k0 = 0
+    if resume and os.path.exists(run_path):
+        with open(run_path, encoding="utf-8") as fh:
+            old = json.load(fh)
+        expected = json.loads(json.dumps({**meta, "complete": old.get("complete")}, default=repr))
+        if old != expected:
+            raise ValueError(f"{directory} holds a different run; use resume=False to overwrite")
+        out = open_run(directory, "r+")
+        if os.path.exists(ckpt_path):
+            with open(ckpt_path, "rb") as fh:
+                ckpt = statefile.loads(fh.read())
+            for clock, state in zip(clocks, ckpt["states"]):
+                clock.set_state(state)
+            k0 = int(ckpt["k"])
+    else:
+        if os.path.exists(ckpt_path):
+            os.remove(ckpt_path)
+        out = {
+            key: np.lib.format.open_memmap(os.path.join(directory, f"{key}.npy"), mode="w+", dtype=float, shape=tuple(shape))
+            for key, shape in zip(keys, shapes)
+        }
+        _write_atomic(run_path, json.dumps(meta, default=repr).encode())
+
+    def checkpoint(k: int) -> None:
+        for arr in out.values():
+            arr.flush()
+        state = {"k": k, "states": [c.get_state() for c in clocks]}
+        _write_atomic(ckpt_path, statefile.dumps(state))
+
+    block = min(checkpoint_every, _block_steps(clocks))
+    next_checkpoint = k0 + checkpoint_every
+    report, stats = _run_stats(clocks)
+    run_started, first = time.perf_counter(), k0
+    while k0 <= n_steps:
+        k1 = min(k0 + block, n_steps + 1)
+        out["time"][k0:k1] = _time_slice(k0, k1, n_steps, dt)
+        for i, c in enumerate(clocks):
+            _step_block(out[f"clock_{i}"][..., k0:k1], c.read_time, c.advance, k0, dt, stats[i])
+        if report is not None:
+            report.record_steps(k1 - 1, n_steps, run_started)
+        k0 = k1
+        if k0 >= next_checkpoint and k0 <= n_steps:
+            checkpoint(k0)
+            next_checkpoint = k0 + checkpoint_every
+    if report is not None:
+        report.finish_run(max(k0 - max(first, 1), 0), time.perf_counter() - run_started)
+
+    if not _is_complete(run_path):
+        checkpoint(n_steps + 1)
+        meta["complete"] = True
+        _write_atomic(run_path, json.dumps(meta, default=repr).encode())
+    del out
+    return open_run(directory, "r")
+
+
+def _is_complete(run_path: str) -> bool:
+    with open(run_path, encoding="utf-8") as fh:
+        return bool(json.load(fh).get("complete"))
@@ -0,0 +1,57 @@
+"""Block stepping (Clock.advance) must reproduce per-tick traces exactly."""
+from __future__ import annotations
+
+import numpy as np
+
+from src.analysis import run_clocks
+from src.clocks.flicker_like import FlickerLikeFreqClock
+from src.clocks.ideal import IdealClock
+from src.clocks.noisy import NoisyOscillatorClock
+from src.clocks.random_walk import RandomWalkFreqClock
+
+
+def _make_clocks():
+    return [
+        IdealClock(),
+        NoisyOscillatorClock(sigma_y=1e-11, seed=1),
+        RandomWalkFreqClock(sigma_rw=2e-14, seed=2),
+        FlickerLikeFreqClock(sigma_w=5e-12, a=1e-2, seed=3),
+    ]
+
+
+def _per_tick(clock, n_steps, dt):
+    out = [clock.read_time()]
+    for _ in range(n_steps):
+        clock.tick(dt)
+        out.append(clock.read_time())
+    return np.asarray(out)
+
+
+def test_advance_matches_tick_bit_for_bit() -> None:
+    for ref, blk in zip(_make_clocks(), _make_clocks()):
+        expected = _per_tick(ref, 500, 0.1)
+        got = np.concatenate([[blk.read_time()], blk.advance(123, 0.1), blk.advance(377, 0.1)])
+        assert np.array_equal(expected, got), type(ref).__name__
+
+
+def test_run_clocks_matches_per_tick() -> None:
+    ts = run_clocks(_make_clocks(), duration=500.0, dt=1.0)
+    for i, ref in enumerate(_make_clocks()):
+        assert np.array_equal(ts[f"clock_{i}"], _per_tick(ref, 500, 1.0))
+
+
+def test_decimated_recording() -> None:
+    full = run_clocks(_make_clocks(), duration=2.0, dt=0.001)
+    last = run_clocks(_make_clocks(), duration=2.0, dt=0.001, record_every=100)
+    mean = run_clocks(_make_clocks(), duration=2.0, dt=0.001, record_every=100, reduce="mean")
+    minmax = run_clocks(_make_clocks(), duration=2.0, dt=0.001, record_every=100, reduce="minmax")
+    assert last["time"].shape == (21,)
+    assert np.array_equal(last["time"], full["time"][::100])
+    for i in range(4):
+        key = f"clock_{i}"
+        assert np.array_equal(last[key], full[key][::100])
+        intervals = full[key][1:].reshape(20, 100)
+        assert np.allclose(mean[key][1:], intervals.mean(axis=1), rtol=0, atol=1e-12)
+        err = (full[key] - full["time"])[1:].reshape(20, 100)
+        assert np.array_equal(minmax[f"{key}_min"][1:], err.min(axis=1))
+        assert np.array_equal(minmax[f"{key}_max"][1:], err.max(axis=1))
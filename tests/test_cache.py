@@ -0,0 +1,100 @@
+"""On-disk run_clocks result cache."""
+from __future__ import annotations
+
+import numpy as np
+
+from src import statefile
+from src.analysis import run_clocks
+from src.cache import ResultCache, result_key
+from src.clocks.correlated import CorrelatedNoise
+from src.clocks.ensemble import ClockEnsemble
+from src.clocks.ideal import IdealClock
+from src.clocks.noisy import NoisyOscillatorClock
+from src.clocks.power_law import PowerLawNoiseClock
+from src.clocks.random_walk import RandomWalkFreqClock
+
+
+def _make_clocks(seed=1):
+    return [IdealClock(), NoisyOscillatorClock(sigma_y=1e-11, seed=seed), RandomWalkFreqClock(sigma_rw=2e-14, seed=seed + 1)]
+
+
+def test_hit_matches_fresh_run_and_restores_state(tmp_path) -> None:
+    cache = ResultCache(str(tmp_path))
+    first = cache.run_clocks(_make_clocks(), duration=500.0, dt=1.0)
+    clocks = _make_clocks()
+    hit = cache.run_clocks(clocks, duration=500.0, dt=1.0)
+    assert isinstance(hit["clock_1"], np.memmap)
+    ref_clocks = _make_clocks()
+    ref = run_clocks(ref_clocks, duration=500.0, dt=1.0)
+    for key in ref:
+        assert np.array_equal(hit[key], ref[key])
+        assert np.array_equal(first[key], ref[key])
+    # clocks continue as if they had been run
+    for c, r in zip(clocks, ref_clocks):
+        assert np.array_equal(c.advance(10, 1.0), r.advance(10, 1.0))
+
+
+def test_states_are_stored_without_pickle(tmp_path) -> None:
+    def make():
+        return [PowerLawNoiseClock(alpha=-1.0, seed=4, block_size=256), ClockEnsemble("RandomWalkFreqClock", 3, seed=5)]
+
+    cache = ResultCache(str(tmp_path))
+    cache.run_clocks(make(), duration=300.0, dt=1.0)
+    assert not list(tmp_path.glob("*/*.pkl")) and list(tmp_path.glob("*/states.npz"))
+    clocks, ref_clocks = make(), make()
+    hit = cache.run_clocks(clocks, duration=300.0, dt=1.0)
+    assert not hit["clock_0"].flags.writeable
+    run_clocks(ref_clocks, duration=300.0, dt=1.0)
+    for c, r in zip(clocks, ref_clocks):
+        assert np.array_equal(c.advance(500, 1.0), r.advance(500, 1.0))
+
+
+def test_key_covers_parameters_seed_and_state() -> None:
+    base = result_key(_make_clocks(), 100.0, 1.0)
+    assert base == result_key(_make_clocks(), 100.0, 1.0)
+    assert base != result_key(_make_clocks(seed=5), 100.0, 1.0)
+    assert base != result_key(_make_clocks(), 100.0, 0.5)
+    stepped = _make_clocks()
+    stepped[1].tick(1.0)
+    assert base != result_key(stepped, 100.0, 1.0)
+
+
+def test_correlated_clocks_get_stable_keys(tmp_path) -> None:
+    def make():
+        source = CorrelatedNoise([[1.0, 0.5], [0.5, 1.0]], seed=3)
+        return [NoisyOscillatorClock(noise=source.channel(0)), RandomWalkFreqClock(noise=source.channel(1))]
+
+    assert result_key(make(), 100.0, 1.0) == result_key(make(), 100.0, 1.0)
+    cache = ResultCache(str(tmp_path))
+    cache.run_clocks(make(), 100.0, 1.0)
+    cache.run_clocks(make(), 100.0, 1.0)
+    assert len(cache) == 1
+
+
+def test_rejected_state_leaves_clocks_unchanged(tmp_path) -> None:
+    cache = ResultCache(str(tmp_path))
+    key = result_key(_make_clocks(), 100.0, 1.0)
+    cache.run_clocks(_make_clocks(), 100.0, 1.0)
+    states_path = tmp_path / key / "states.npz"
+    states = statefile.loads(states_path.read_bytes())
+    states[2] = {}
+    states_path.write_bytes(statefile.dumps(states))
+    clocks = _make_clocks()
+    before = [c.read_time() for c in clocks]
+    assert cache.get(key, clocks) is None
+    assert [c.read_time() for c in clocks] == before
+    ref = run_clocks(_make_clocks(), 100.0, 1.0)
+    assert np.array_equal(run_clocks(clocks, 100.0, 1.0)["clock_1"], ref["clock_1"])
+
+
+def test_lru_eviction(tmp_path) -> None:
+    cache = ResultCache(str(tmp_path))
+    cache.run_clocks(_make_clocks(1), 2000.0, 1.0)
+    entry = cache.size_bytes()
+    cache.max_bytes = int(2.5 * entry)
+    cache.run_clocks(_make_clocks(2), 2000.0, 1.0)
+    cache.run_clocks(_make_clocks(1), 2000.0, 1.0)  # hit: seed 1 becomes most recent
+    cache.run_clocks(_make_clocks(3), 2000.0, 1.0)
+    assert len(cache) == 2
+    assert result_key(_make_clocks(2), 2000.0, 1.0) not in cache
+    assert result_key(_make_clocks(1), 2000.0, 1.0) in cache
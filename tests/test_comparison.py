@@ -0,0 +1,64 @@
+"""Zero-copy BufferComparison."""
+from __future__ import annotations
+
+import mmap
+
+import numpy as np
+import pytest
+
+from src.analysis import compare_clocks, run_clocks
+from src.clocks.ideal import IdealClock
+from src.clocks.noisy import NoisyOscillatorClock
+from src.core import BufferComparison, Comparison
+
+
+def _run():
+    return run_clocks([IdealClock(), NoisyOscillatorClock(sigma_y=1e-11, seed=42)], duration=1000.0, dt=1.0)
+
+
+def test_matches_list_comparison_and_shares_memory() -> None:
+    ts = _run()
+    cmp = BufferComparison("Ideal", "Noisy", ts["time"], ts["clock_0"], ts["clock_1"])
+    legacy = Comparison("Ideal", "Noisy", ts["time"].tolist(), ts["clock_0"].tolist(), ts["clock_1"].tolist())
+    assert cmp.measure() == legacy.measure()
+    assert np.shares_memory(np.asarray(cmp.t_b_s), ts["clock_1"])
+    assert cmp.difference is cmp.difference
+
+    window = cmp[100:200]
+    assert len(window) == 100
+    assert np.shares_memory(np.asarray(window.t_b_s), ts["clock_1"])
+    assert window.measure() == compare_clocks(ts["time"][100:200], ts["clock_0"][100:200], ts["clock_1"][100:200])
+
+
+def test_accepts_raw_mmap_buffers() -> None:
+    ts = _run()
+    n = ts["time"].size
+    buf = mmap.mmap(-1, 3 * 8 * n)
+    view = np.frombuffer(buf, dtype=float).reshape(3, n)
+    view[0], view[1], view[2] = ts["time"], ts["clock_0"], ts["clock_1"]
+    raw = memoryview(buf)
+    cmp = BufferComparison("a", "b", raw[:8 * n], raw[8 * n:16 * n], raw[16 * n:])
+    assert cmp.measure() == compare_clocks(ts["time"], ts["clock_0"], ts["clock_1"])
+    del view, cmp, raw
+    buf.close()
+
+
+def test_integer_time_is_copied_and_typed_or_2d_buffers_are_rejected() -> None:
+    ts = _run()
+    steps = np.arange(ts["time"].size)  # int64 time axis, as compare_clocks accepts
+    cmp = BufferComparison("a", "b", steps, ts["clock_0"], ts["clock_1"])
+    assert cmp.measure() == compare_clocks(steps, ts["clock_0"], ts["clock_1"])
+    for bad in (np.zeros(8 * steps.size, dtype=np.uint8), np.zeros(8 * steps.size, dtype=np.int8),
+                np.stack([ts["clock_0"], ts["clock_1"]])):
+        with pytest.raises(ValueError):
+            BufferComparison("a", "b", steps, bad, ts["clock_1"])
+
+
+def test_big_endian_float_buffers_are_byteswapped() -> None:
+    ts = _run()
+    big = [np.asarray(ts[k], dtype=">f8") for k in ("time", "clock_0", "clock_1")]
+    cmp = BufferComparison("a", "b", *big)
+    assert cmp.measure() == compare_clocks(ts["time"], ts["clock_0"], ts["clock_1"])
+    a32, b32 = ts["clock_0"].astype(np.float32), ts["clock_1"].astype(np.float32)
+    single = BufferComparison("a", "b", ts["time"], a32.astype(">f4"), b32.astype("<f4"))
+    assert single.measure() == compare_clocks(ts["time"], a32, b32)
@@ -1,7 +1,16 @@
 """Tests for consensus helpers."""
 from __future__ import annotations
 
-from src.analysis import consensus_weighted_average, run_clocks
+import numpy as np
+
+from src.analysis import (
+    SlidingWindowConsensus,
+    consensus_sliding_window,
+    consensus_weighted_average,
+    iter_run_clocks,
+    n_cornered_hat,
+    run_clocks,
+)
 from src.clocks.flicker_like import FlickerLikeFreqClock
 from src.clocks.ideal import IdealClock
 from src.clocks.noisy import NoisyOscillatorClock
@@ -16,3 +25,66 @@ def test_consensus_weights_sum_to_one() -> None:
     ts = run_clocks([ideal, white, rw, fl], duration=100.0, dt=1.0)
     consensus = consensus_weighted_average(ts, ["clock_1", "clock_2", "clock_3"])
     assert abs(sum(consensus["weights"]) - 1.0) < 1e-12
+
+
+def test_n_cornered_hat_recovers_variances_despite_common_error() -> None:
+    rng = np.random.default_rng(0)
+    sigma = np.array([1.0, 2.0, 3.0, 0.5, 1.5])
+    y = rng.normal(0.0, 1.0, (5, 100_000)) * sigma[:, None] + rng.normal(0.0, 5.0, 100_000)
+    hat = n_cornered_hat(y, covariance=True)
+    assert np.allclose(np.sqrt(hat["var"]), sigma, rtol=0.02)
+    assert np.allclose(np.diag(hat["covariance"]), hat["var"], rtol=1e-6)
+    assert np.allclose(hat["pair_var"], hat["pair_var"].T)
+
+
+def test_n_cornered_hat_consensus_weights_sum_to_one() -> None:
+    ts = run_clocks(
+        [IdealClock(), NoisyOscillatorClock(sigma_y=1e-11, seed=1),
+         NoisyOscillatorClock(sigma_y=3e-11, seed=2), NoisyOscillatorClock(sigma_y=2e-11, seed=3)],
+        duration=1000.0, dt=1.0,
+    )
+    for covariance in (False, True):
+        cons = consensus_weighted_average(ts, ["clock_1", "clock_2", "clock_3"], method="n_cornered_hat",
+                                          covariance=covariance)
+        assert abs(sum(cons["weights"]) - 1.0) < 1e-12
+        assert cons["weights"][0] > cons["weights"][2] > cons["weights"][1]
+
+    # two equal good clocks and a bad one: a slightly negative estimate must not take all the weight
+    ts = run_clocks(
+        [IdealClock(), NoisyOscillatorClock(sigma_y=1e-11, seed=1),
+         NoisyOscillatorClock(sigma_y=1e-11, seed=2), NoisyOscillatorClock(sigma_y=1e-9, seed=3)],
+        duration=200.0, dt=1.0,
+    )
+    cons = consensus_weighted_average(ts, ["clock_1", "clock_2", "clock_3"], method="n_cornered_hat")
+    assert cons["detail"]["negative_var"] == [0]
+    assert isinstance(cons["detail"]["pair_var_frac"], list)
+    assert 0.3 < cons["weights"][0] < 0.7 and cons["weights"][2] < 1e-2
+
+
+def test_sliding_window_consensus_chunked_and_gaps() -> None:
+    def clocks():
+        return [IdealClock(), NoisyOscillatorClock(sigma_y=1e-11, seed=1),
+                NoisyOscillatorClock(sigma_y=3e-11, seed=2), RandomWalkFreqClock(sigma_rw=2e-14, seed=3)]
+
+    keys = ["clock_1", "clock_2", "clock_3"]
+    ts = run_clocks(clocks(), duration=2000.0, dt=1.0)
+    whole = consensus_sliding_window(ts, keys, window=100)
+    assert np.allclose(whole["weights"].sum(axis=0), 1.0)
+
+    stream = SlidingWindowConsensus(keys, window=100)
+    parts = [stream.update(c) for c in iter_run_clocks(clocks(), duration=2000.0, dt=1.0, chunk_size=137)]
+    assert np.allclose(np.concatenate([p["consensus"] for p in parts]), whole["consensus"], rtol=0.0, atol=1e-9)
+    assert np.allclose(np.concatenate([p["weights"] for p in parts], axis=1), whole["weights"])
+    # running sums agree with the variance of the trailing window itself
+    y = np.diff(np.vstack([ts[k] for k in keys]), axis=1) - 1.0
+    inv = 1.0 / np.var(y[:, -101:-1], axis=1, ddof=1)
+    assert np.allclose(whole["weights"][:, -1], inv / inv.sum(), rtol=1e-9)
+
+    gappy = dict(ts)
+    gappy["clock_2"] = ts["clock_2"].copy()
+    gappy["clock_2"][500:800] = np.nan
+    out = consensus_sliding_window(gappy, keys, window=100)
+    assert np.all(out["weights"][1, 500:802] == 0.0)
+    assert out["weights"][1, 900] > 0.0
+    assert np.all(np.isfinite(out["consensus"]))
+    assert np.max(np.abs(np.diff(out["consensus"]) - 1.0)) < 1e-9
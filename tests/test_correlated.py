@@ -0,0 +1,72 @@
+"""Correlated noise shared by several clocks."""
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from src.analysis import run_clocks
+from src.clocks.correlated import CorrelatedNoise, correlation_factor
+from src.clocks.ensemble import ClockEnsemble
+from src.clocks.flicker_like import FlickerLikeFreqClock
+from src.clocks.noisy import NoisyOscillatorClock
+from src.clocks.random_walk import RandomWalkFreqClock
+from src.core import fork_clocks
+
+CORR = np.array([[1.0, 0.8, 0.3], [0.8, 1.0, 0.5], [0.3, 0.5, 1.0]])
+
+
+def _make_clocks(source):
+    return [
+        NoisyOscillatorClock(sigma_y=1e-11, noise=source.channel(0)),
+        RandomWalkFreqClock(sigma_rw=2e-14, noise=source.channel(1)),
+        FlickerLikeFreqClock(sigma_w=5e-12, a=1e-2, noise=source.channel(2)),
+    ]
+
+
+def test_channels_have_requested_correlation() -> None:
+    source = CorrelatedNoise(4.0 * CORR, seed=1)  # covariance -> same correlation
+    z = np.array([ch.standard_normal(200_000) for ch in source.channels()])
+    assert np.allclose(np.corrcoef(z), CORR, atol=0.01)
+    assert np.allclose(np.std(z, axis=1), 1.0, atol=0.01)
+
+
+def test_block_and_tick_stepping_agree() -> None:
+    block = run_clocks(_make_clocks(CorrelatedNoise(CORR, seed=2, block_size=64)), 300.0, 1.0)
+    clocks = _make_clocks(CorrelatedNoise(CORR, seed=2, block_size=64))
+    ticks = [[c.read_time()] for c in clocks]
+    for _ in range(300):
+        for c, trace in zip(clocks, ticks):
+            c.tick(1.0)
+            trace.append(c.read_time())
+    for i, trace in enumerate(ticks):
+        assert np.array_equal(block[f"clock_{i}"], trace)
+
+
+def test_ensemble_correlation_and_factor_cache() -> None:
+    m = 40
+    corr = np.full((m, m), 0.5) + 0.5 * np.eye(m)
+    assert correlation_factor(corr) is correlation_factor(corr.copy())
+    ens = ClockEnsemble("NoisyOscillatorClock", m, seed=3, correlation=corr, sigma_y=1.0)
+    y = np.diff(ens.advance(20_000, 1.0), axis=1) - 1.0
+    c = np.corrcoef(y)
+    assert abs(np.mean(c[~np.eye(m, dtype=bool)]) - 0.5) < 0.02
+    with pytest.raises(ValueError):
+        ClockEnsemble("NoisyOscillatorClock", 3, correlation=corr)
+    with pytest.raises(ValueError):
+        NoisyOscillatorClock(noise=CorrelatedNoise(CORR).channel(0), rng="counter")
+
+
+def test_forked_clock_does_not_buffer_its_siblings_columns() -> None:
+    clocks = _make_clocks(CorrelatedNoise(CORR, seed=4, block_size=64))
+    run_clocks(clocks, 100.0, 1.0)
+    child = clocks[0].fork()
+    for _ in range(20):
+        child.advance(1000, 1.0)
+    assert child._rng._source._buf.shape[1] <= 1000 + 64
+
+    # forked together, the copies share one source and continue the originals
+    together = fork_clocks(clocks)
+    assert len({id(c._rng._source) for c in together}) == 1
+    ref = run_clocks(clocks, 50.0, 1.0)
+    out = run_clocks(together, 50.0, 1.0)
+    assert all(np.array_equal(ref[k], out[k]) for k in ref)
@@ -0,0 +1,45 @@
+"""ClockEnsemble members must match standalone clocks seeded from the same parent."""
+from __future__ import annotations
+
+import numpy as np
+
+from src.analysis import _BLOCK_STEPS, run_clocks
+from src.clocks.ensemble import ClockEnsemble
+from src.clocks.ideal import IdealClock
+
+
+def test_ensemble_members_match_standalone_clocks() -> None:
+    cases = [
+        ("NoisyOscillatorClock", {"sigma_y": [1e-11, 2e-11, 3e-11]}),
+        ("RandomWalkFreqClock", {"sigma_rw": 2e-14}),
+        ("FlickerLikeFreqClock", {"sigma_w": 5e-12, "a": [1e-3, 1e-2, 1e-3]}),
+    ]
+    for model, params in cases:
+        ens = ClockEnsemble(model, 3, seed=7, **params)
+        ts = run_clocks([IdealClock(), ens], duration=200.0, dt=0.5)
+        assert ts["clock_1"].shape == (3, 401)
+        for i in range(3):
+            ref = run_clocks([ens.member_clock(i)], duration=200.0, dt=0.5)
+            assert np.array_equal(ts["clock_1"][i], ref["clock_0"]), (model, i)
+
+
+def test_ensemble_seeds_are_deterministic() -> None:
+    a = ClockEnsemble("NoisyOscillatorClock", 4, seed=1, sigma_y=1e-11).advance(50, 1.0)
+    b = ClockEnsemble("NoisyOscillatorClock", 4, seed=1, sigma_y=1e-11).advance(50, 1.0)
+    assert np.array_equal(a, b)
+    assert not np.array_equal(a[0], a[1])
+
+
+def test_large_ensembles_advance_in_member_scaled_blocks() -> None:
+    m = 512
+    block = _BLOCK_STEPS // m
+    for model in ("RandomWalkFreqClock", "FlickerLikeFreqClock"):
+        ens = ClockEnsemble(model, m, seed=2)
+        calls = []
+        inner = ens._standard_normal
+        ens._standard_normal = lambda n: calls.append(n) or inner(n)
+        ts = run_clocks([ens], duration=float(3 * block + 5), dt=1.0)
+        assert max(calls) <= block
+        ref = ClockEnsemble(model, m, seed=2)
+        parts = [ref.read_time()[:, None]] + [ref.advance(n, 1.0) for n in (7, 2 * block + 100, block - 102)]
+        assert np.array_equal(ts["clock_0"], np.concatenate(parts, axis=1)), model
@@ -0,0 +1,72 @@
+"""Memory-mapped ingest of recorded comparison data."""
+from __future__ import annotations
+
+import numpy as np
+
+from src.analysis import compare_clocks, compare_clocks_chunks, consensus_weighted_average, fractional_frequency_from_time
+from src.ingest import open_binary, open_npy, open_recording
+
+
+def _log(n=2000, gap_at=1200, gap=10.0, seed=0):
+    rng = np.random.default_rng(seed)
+    t = np.arange(n, dtype=float)
+    t[gap_at:] += gap
+    x = np.cumsum(rng.normal(0.0, 1e-11, (n, 3)), axis=0)
+    return t, x
+
+
+def test_text_binary_and_npy_recordings_feed_analysis(tmp_path) -> None:
+    t, x = _log()
+    csv = tmp_path / "log.csv"
+    with open(csv, "w", encoding="utf-8") as fh:
+        fh.write("# phase log\nmjd,A,B,C\n")
+        for k in range(len(t)):
+            fh.write(f"{60000.5 + t[k] / 86400.0:.12f},{x[k, 0]:.17g},{x[k, 1]:.17g},{x[k, 2]:.17g}\n")
+
+    rec = open_recording(str(csv), time_format="mjd")
+    cached = sorted(p.name for p in tmp_path.iterdir() if p.suffix in (".f8", ".json"))
+    again = open_recording(str(csv), time_format="mjd")
+    assert len(cached) == 2 and isinstance(again.time, np.memmap)
+    assert rec.names == ["A", "B", "C"] and rec.t0_mjd == 60000.5
+    assert np.allclose(rec.time, t, atol=1e-6)
+    assert list(rec.index.gaps) == [1200] and rec.index.missing_samples == 10
+
+    d = rec.as_dict()
+    whole = compare_clocks(d["time"], d["clock_1"], d["clock_2"])
+    chunked = compare_clocks_chunks(rec.iter_chunks(333), "clock_1", "clock_2")
+    assert all(np.isclose(whole[k], chunked[k], rtol=1e-9, atol=0) for k in whole)
+    seg = rec.segment(0).as_dict()
+    assert np.array_equal(fractional_frequency_from_time(seg["time"], seg["clock_1"], dt=1.0), np.diff(x[:1200, 0]))
+    assert len(consensus_weighted_average(seg, ["clock_1", "clock_2", "clock_3"], dt=1.0)["weights"]) == 3
+
+    np.column_stack([t, x]).astype("<f8").tofile(tmp_path / "log.bin")
+    np.save(tmp_path / "log.npy", np.column_stack([t, x]))
+    binary = open_binary(str(tmp_path / "log.bin"), ["A", "B", "C"])
+    assert isinstance(binary.columns["A"], np.memmap) and np.shares_memory(binary.columns["A"], binary.time.base)
+    assert np.array_equal(open_npy(str(tmp_path / "log.npy")).columns["c2"], x[:, 1])
+
+
+def test_frequency_log_integrates_to_phase_across_chunks(tmp_path) -> None:
+    t, _ = _log(gap_at=0, gap=0.0)
+    y = np.random.default_rng(1).normal(0.0, 1e-11, t.size)
+    np.column_stack([t, y]).tofile(tmp_path / "freq.bin")
+    rec = open_binary(str(tmp_path / "freq.bin"), ["A"], kind="frequency")
+
+    x = rec.as_dict()["clock_1"].offsets()
+    chunked = np.concatenate([c["clock_1"].offsets() for c in rec.iter_chunks(333)])
+    assert x[0] == 0.0 and np.array_equal(x, chunked)
+    assert np.allclose(fractional_frequency_from_time(rec.time, rec.as_dict()["clock_1"]), y[1:], rtol=0, atol=1e-24)
+
+
+def test_converted_time_axis_is_memory_mapped(tmp_path) -> None:
+    t, x = _log()
+    mjd = 60000.5 + t / 86400.0
+    np.column_stack([mjd, x]).astype("<f8").tofile(tmp_path / "log.bin")
+    cache = tmp_path / "cache"
+    cache.mkdir()
+    rec = open_binary(str(tmp_path / "log.bin"), ["A", "B", "C"], time_format="mjd", cache_dir=str(cache))
+    assert isinstance(rec.time, np.memmap) and rec.time.filename.startswith(str(cache))
+    assert np.allclose(rec.time, t, atol=1e-5) and rec.t0_mjd == 60000.5
+    assert np.shares_memory(rec.as_dict()["time"], rec.time)
+    again = open_binary(str(tmp_path / "log.bin"), ["A", "B", "C"], time_format="mjd", cache_dir=str(cache))
+    assert again.time.filename == rec.time.filename and len(list(cache.iterdir())) == 2
@@ -0,0 +1,50 @@
+"""Opt-in run/analysis instrumentation."""
+from __future__ import annotations
+
+import json
+
+import numpy as np
+
+from src.analysis import compare_clocks, run_clocks
+from src.clocks.ideal import IdealClock
+from src.clocks.noisy import NoisyOscillatorClock
+from src.instrument import active_report, instrumented
+from src.storage import run_clocks_to_disk
+
+
+def _make_clocks():
+    return [IdealClock(), NoisyOscillatorClock(sigma_y=1e-11, seed=1), NoisyOscillatorClock(sigma_y=1e-11, seed=2)]
+
+
+def test_report_contents_and_unchanged_traces() -> None:
+    beats = []
+    with instrumented(progress=beats.append, progress_every=250) as report:
+        ts = run_clocks(_make_clocks(), duration=1000.0, dt=1.0)
+        compare_clocks(ts["time"], ts["clock_0"], ts["clock_1"])
+    assert active_report() is None
+
+    ref = run_clocks(_make_clocks(), duration=1000.0, dt=1.0)
+    for key in ref:
+        assert np.array_equal(ts[key], ref[key])
+
+    out = json.loads(report.to_json())
+    assert out["steps"] == 1000
+    assert out["clocks"]["NoisyOscillatorClock"]["instances"] == 2
+    assert out["clocks"]["NoisyOscillatorClock"]["steps"] == 2000
+    assert out["clocks"]["IdealClock"]["read_calls"] == 1
+    assert out["calls"]["run_clocks"]["calls"] == 1
+    assert out["calls"]["compare_clocks"]["calls"] == 1
+    assert out["allocations"]["arrays"] > 0
+    done = [b["steps_done"] for b in beats]
+    assert len(done) == 4 and done[-1] == 1000
+    assert all(0 < b - a <= 250 for a, b in zip(done, done[1:]))
+
+
+def test_every_runner_is_instrumented(tmp_path) -> None:
+    with instrumented() as report:
+        run_clocks(_make_clocks(), duration=1000.0, dt=1.0, record_every=10, reduce="mean")
+        run_clocks_to_disk(_make_clocks(), 1000.0, 1.0, str(tmp_path / "run"), checkpoint_every=300)
+    out = report.to_dict()
+    assert out["steps"] == 2000
+    noisy = out["clocks"]["NoisyOscillatorClock"]
+    assert noisy["instances"] == 4 and noisy["steps"] == 4000 and noisy["read_calls"] == 4
@@ -0,0 +1,78 @@
+"""Kalman ensemble time scale: block solution, chunking, stability and steering."""
+from __future__ import annotations
+
+import numpy as np
+
+from src.analysis import run_clocks
+from src.clocks.ensemble import ClockEnsemble
+from src.clocks.noisy import NoisyOscillatorClock
+from src.clocks.random_walk import RandomWalkFreqClock
+from src.kalman import KalmanTimeScale, clock_noise, kalman_time_scale, steady_state_gains
+from src.offsets import OffsetTrace
+from src.stability import stability
+
+DT = 0.1
+
+
+def _reference_filter(z, gains, weights):
+    """The Kalman-plus-weights recursion one step at a time."""
+    n_clocks, n = z.shape
+    x, y = z[:, 0] - weights @ z[:, 0], np.zeros(n_clocks)
+    e, x_hat, y_hat = np.empty(n), np.empty((n_clocks, n)), np.empty((n_clocks, n))
+    for k in range(n):
+        pred = x + DT * y
+        e[k] = weights @ (z[:, k] - pred)
+        nu = z[:, k] - e[k] - pred
+        x, y = pred + gains[:, 0] * nu, y + gains[:, 1] * nu
+        x_hat[:, k], y_hat[:, k] = x, y
+    return e, x_hat, y_hat
+
+
+def test_block_solution_matches_step_recursion_for_any_chunking() -> None:
+    rng = np.random.default_rng(0)
+    sigma_wf = np.array([0.0, 3e-12, 1e-11, 5e-12])
+    sigma_rw = np.array([1e-14, 0.0, 1e-13, 3e-14])
+    z = np.cumsum(rng.normal(scale=1e-12, size=(4, 700)), axis=1)
+    d = {"time": np.arange(700) * DT, "clock_0": OffsetTrace(z[:2]), "clock_1": OffsetTrace(z[2:])}
+    keys = ["clock_0", "clock_1"]
+
+    whole = kalman_time_scale(d, keys, sigma_wf, sigma_rw, meas_sigma=1e-13)
+    e, x_hat, y_hat = _reference_filter(z, whole["gains"], whole["weights"])
+    assert np.allclose(whole["timescale"].offsets(), e, rtol=0.0, atol=1e-12 * np.abs(e).max())
+    assert np.allclose(whole["phase"], x_hat, rtol=0.0, atol=1e-12 * np.abs(x_hat).max())
+    assert np.allclose(whole["frequency"], y_hat, rtol=0.0, atol=1e-12 * np.abs(y_hat).max())
+
+    # a chunk stream with ragged chunks and another block length gives the same result
+    scale = KalmanTimeScale(keys, sigma_wf, sigma_rw, DT, meas_sigma=1e-13, block=7)
+    chunks = [scale.update({"time": d["time"][k0:k0 + 333], "clock_0": OffsetTrace(z[:2, k0:k0 + 333]),
+                            "clock_1": OffsetTrace(z[2:, k0:k0 + 333])}) for k0 in range(0, 700, 333)]
+    streamed = np.concatenate([c["timescale"].offsets() for c in chunks])
+    assert np.allclose(streamed, e, rtol=0.0, atol=1e-12 * np.abs(e).max())
+    assert np.allclose(scale.state, whole["state"], rtol=1e-9, atol=0.0)
+
+    # steady-state gains solve the Riccati equation
+    gains, p = steady_state_gains(sigma_wf, sigma_rw, DT, 1e-13)
+    phi = np.array([[1.0, DT], [0.0, 1.0]])
+    filtered = p - gains[:, :, None] * p[:, None, 0, :]
+    q_rw = sigma_rw**2 * DT
+    q = np.stack([np.stack([sigma_wf**2 * DT + q_rw * DT**2, q_rw * DT], -1),
+                  np.stack([q_rw * DT, q_rw], -1)], 1)
+    assert np.allclose(phi @ filtered @ phi.T + q, p, rtol=1e-9, atol=0.0)
+
+
+def test_time_scale_beats_its_clocks_and_steering_follows_it() -> None:
+    clocks = [ClockEnsemble(RandomWalkFreqClock, 8, seed=3, sigma_rw=1e-12), NoisyOscillatorClock(sigma_y=1e-11, seed=1)]
+    d = run_clocks(clocks, 200.0, 1e-2, representation="offset")
+    keys = ["clock_0", "clock_1"]
+    sigma_wf, sigma_rw = clock_noise(clocks, 1e-2)
+    assert sigma_rw.tolist() == [1e-12] * 8 + [0.0] and sigma_wf[-1] == 1e-11
+
+    result = kalman_time_scale(d, keys, sigma_wf, sigma_rw, steer_tau=1.0, chunk_size=4096)
+    e = result["timescale"].offsets()
+    z = np.concatenate([np.atleast_2d(d[k].offsets()) for k in keys], axis=0)
+    adev = lambda x: stability(np.diff(x, axis=-1) / 1e-2, 1e-2, taus=[10.0], kinds=("oadev",))["oadev"][1]
+    assert adev(e).max() < 0.5 * adev(z).min()
+
+    steered = result["steered"].offsets()
+    assert steered.shape == z.shape
+    assert np.all(np.abs(steered - e).max(axis=1) < 0.1 * np.abs(z - e).max(axis=1))
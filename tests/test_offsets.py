@@ -0,0 +1,77 @@
+"""Offset (time-error) representation of run_clocks traces."""
+from __future__ import annotations
+
+import math
+
+import numpy as np
+import pytest
+
+from src.analysis import (
+    compare_clocks,
+    concatenate_chunks,
+    consensus_weighted_average,
+    fractional_frequency_from_time,
+    iter_run_clocks,
+    pairwise_metrics,
+    run_clocks,
+)
+from src.clocks.ensemble import ClockEnsemble
+from src.clocks.ideal import IdealClock
+from src.clocks.noisy import NoisyOscillatorClock
+from src.clocks.random_walk import RandomWalkFreqClock
+from src.offsets import OffsetTrace, to_offsets
+
+
+def _make_clocks():
+    return [
+        IdealClock(),
+        NoisyOscillatorClock(sigma_y=1e-11, seed=1),
+        RandomWalkFreqClock(sigma_rw=2e-14, seed=2, rng="counter"),
+        ClockEnsemble(NoisyOscillatorClock, 3, seed=3, sigma_y=1e-12),
+    ]
+
+
+def test_offsets_are_exact_and_split_invariant() -> None:
+    n = 200_000
+    ts = run_clocks(_make_clocks(), duration=float(n), dt=1.0, representation="offset")
+    chunks = concatenate_chunks(iter_run_clocks(_make_clocks(), float(n), 1.0, chunk_size=9999, representation="offset"))
+    for key in ("clock_0", "clock_1", "clock_2", "clock_3"):
+        assert np.array_equal(ts[key].offsets(), chunks[key].offsets()), key
+
+    y = NoisyOscillatorClock(sigma_y=1e-11, seed=1).advance_frequency(n, 1.0)
+    x = ts["clock_1"].offsets()
+    assert x[-1] == math.fsum(y)
+    assert np.max(np.abs(fractional_frequency_from_time(ts["time"], ts["clock_1"], dt=1.0) - y)) < 1e-22
+    # readings carry their rounding; the offset form does not
+    readings = run_clocks(_make_clocks(), duration=float(n), dt=1.0)
+    assert np.allclose(x, readings["clock_1"] - readings["time"], rtol=0, atol=1e-8)
+    assert np.all(ts["clock_0"].offsets() == 0.0)
+
+    packed = run_clocks(_make_clocks(), duration=float(n), dt=1.0, representation="offset32")
+    assert packed["clock_3"].nbytes < 0.51 * ts["clock_3"].nbytes
+    for key in ("clock_1", "clock_2", "clock_3"):
+        scale = np.max(np.abs(np.diff(ts[key].offsets()[..., ::4096], axis=-1)))
+        assert np.max(np.abs(packed[key].offsets() - ts[key].offsets())) <= 1e-7 * scale
+
+
+def test_analysis_accepts_offset_traces() -> None:
+    ts = run_clocks(_make_clocks()[:3], duration=1000.0, dt=1.0)
+    off = to_offsets(ts)
+    m_read = compare_clocks(ts["time"], ts["clock_0"], ts["clock_1"])
+    m_off = compare_clocks(off["time"], off["clock_0"], off["clock_1"])
+    assert m_off.keys() == m_read.keys()
+    assert all(np.isclose(m_off[k], m_read[k], rtol=1e-9, atol=1e-18) for k in m_read)
+    mixed = compare_clocks(ts["time"], ts["clock_0"], off["clock_1"])
+    assert all(np.isclose(mixed[k], m_off[k], rtol=1e-12, atol=0) for k in m_read)
+
+    pm = pairwise_metrics(off["time"], off)
+    assert np.isclose(pm["std_offset_s"][0, 1], m_read["std_offset_s"], rtol=1e-9)
+    cons = consensus_weighted_average(off, ["clock_1", "clock_2"])
+    ref = consensus_weighted_average(ts, ["clock_1", "clock_2"])
+    assert np.allclose(cons["weights"], ref["weights"], rtol=1e-6)
+    assert isinstance(cons["consensus"], OffsetTrace)
+
+    with pytest.raises(TypeError):
+        np.asarray(off["clock_1"])
+    with pytest.raises(ValueError):
+        run_clocks(_make_clocks(), duration=10.0, dt=1.0, record_every=2, representation="offset")
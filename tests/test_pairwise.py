@@ -0,0 +1,30 @@
+"""All-pairs clock comparison in one pass."""
+from __future__ import annotations
+
+import numpy as np
+
+from src.analysis import compare_clocks, pairwise_metrics, run_clocks
+from src.clocks.flicker_like import FlickerLikeFreqClock
+from src.clocks.ideal import IdealClock
+from src.clocks.noisy import NoisyOscillatorClock
+from src.clocks.random_walk import RandomWalkFreqClock
+
+
+def _make_clocks():
+    return [
+        IdealClock(),
+        NoisyOscillatorClock(sigma_y=1e-11, seed=1),
+        RandomWalkFreqClock(sigma_rw=2e-14, seed=2),
+        FlickerLikeFreqClock(sigma_w=5e-12, a=1e-3, seed=3),
+    ]
+
+
+def test_pairwise_metrics_match_compare_clocks() -> None:
+    ts = run_clocks(_make_clocks(), duration=2000.0, dt=1.0)
+    pair = pairwise_metrics(ts["time"], ts)
+    assert pair["std_offset_s"].shape == (4, 4)
+    for i in range(4):
+        for j in range(4):
+            ref = compare_clocks(ts["time"], ts[f"clock_{i}"], ts[f"clock_{j}"])
+            for key, value in ref.items():
+                assert np.isclose(pair[key][i, j], value, rtol=1e-9, atol=1e-20)
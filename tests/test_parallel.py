@@ -0,0 +1,131 @@
+"""Process-pool drivers are deterministic regardless of worker count."""
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from src.analysis import run_clocks
+from src.clocks.flicker_like import FlickerLikeFreqClock
+from src.clocks.ideal import IdealClock
+from src.clocks.noisy import NoisyOscillatorClock
+from src.clocks.random_walk import RandomWalkFreqClock
+from src.clocks.counter import SEGMENT_STEPS
+from src.core import Clock
+from src.parallel import _int_seed, run_branches, run_segmented, run_sweep
+
+FACTORIES = [IdealClock, NoisyOscillatorClock, RandomWalkFreqClock, FlickerLikeFreqClock]
+GRID = {"sigma_y": [1e-11, 3e-11], "sigma_rw": [2e-14], "a": [1e-3, 1e-2]}
+
+
+def test_sweep_independent_of_worker_count() -> None:
+    serial = run_sweep(FACTORIES, GRID, duration=200.0, dt=1.0, seed=5, n_workers=0, keep_traces=True)
+    pooled = run_sweep(FACTORIES, GRID, duration=200.0, dt=1.0, seed=5, n_workers=2, keep_traces=True)
+    assert len(serial.rows) == 4 * 4  # 4 scenarios x (3 clocks + consensus)
+    assert serial.rows == pooled.rows
+    for k, ts in serial.traces.items():
+        for key in ts:
+            assert np.array_equal(ts[key], pooled.traces[k][key])
+
+
+def test_sweep_traces_match_direct_run() -> None:
+    res = run_sweep([IdealClock, NoisyOscillatorClock], {"sigma_y": [1e-11]}, duration=50.0, dt=0.5,
+                    seed=1, n_workers=0, keep_traces=True)
+    seeds = [_int_seed(s) for s in np.random.SeedSequence(1).spawn(1)[0].spawn(2)]
+    ref = run_clocks([IdealClock(), NoisyOscillatorClock(1e-11, seed=seeds[1])], duration=50.0, dt=0.5)
+    assert np.array_equal(res.traces[0]["clock_1"], ref["clock_1"])
+
+    for bad in ({"dt": [1.0, 0.0]}, {"duration": [50.0, float("nan")]}, {"duration": [float("inf")]}):
+        with pytest.raises(ValueError, match="scenario"):
+            run_sweep([IdealClock, NoisyOscillatorClock], bad, duration=50.0, dt=0.5, n_workers=2, keep_traces=True)
+
+
+def _counter_clocks():
+    return [
+        IdealClock(),
+        NoisyOscillatorClock(sigma_y=1e-11, seed=1, rng="counter"),
+        RandomWalkFreqClock(sigma_rw=2e-14, seed=2, rng="counter"),
+        FlickerLikeFreqClock(sigma_w=5e-12, a=1e-2, seed=3, rng="counter"),
+    ]
+
+
+def test_counter_mode_tick_matches_block_stepping() -> None:
+    n = SEGMENT_STEPS + 50  # crosses a segment boundary
+    ts = run_clocks(_counter_clocks(), duration=n * 0.5, dt=0.5)
+    for i, clock in enumerate(_counter_clocks()[1:], start=1):
+        readings = [clock.read_time()]
+        for _ in range(n):
+            clock.tick(0.5)
+            readings.append(clock.read_time())
+        assert np.array_equal(np.asarray(readings), ts[f"clock_{i}"])
+
+
+def test_segmented_run_matches_serial() -> None:
+    duration = 2.5 * SEGMENT_STEPS
+    serial = run_clocks(_counter_clocks(), duration=duration, dt=1.0)
+    for n_workers in (0, 2):
+        clocks = _counter_clocks()
+        stitched = run_segmented(clocks, duration=duration, dt=1.0, n_workers=n_workers, segments_per_task=1)
+        for key in serial:
+            assert np.array_equal(stitched[key], serial[key]), key
+        assert clocks[3].read_time() == serial["clock_3"][-1]
+        assert clocks[3].segment_state()[:2] == (int(duration), serial["clock_3"][-1])
+    assert FlickerLikeFreqClock(seed=3).segment_state() is None
+
+
+def _branch_clocks():
+    return [IdealClock(), RandomWalkFreqClock(sigma_rw=2e-14, seed=2), FlickerLikeFreqClock(sigma_w=5e-12, seed=3)]
+
+
+class _DriftClock(Clock):
+    """A user-defined clock with no fork_streams override."""
+
+    def __init__(self) -> None:
+        self._t = 0.0
+
+    def tick(self, dt: float) -> None:
+        self._t += dt * (1.0 + 1e-9)
+
+    def read_time(self) -> float:
+        return self._t
+
+    def get_uncertainty(self) -> float:
+        return 0.0
+
+    def get_metadata(self) -> dict:
+        return {"type": "DriftClock"}
+
+
+def test_fork_and_restore() -> None:
+    clock = RandomWalkFreqClock(sigma_rw=2e-14, seed=2)
+    clock.advance(100, 1.0)
+    snap = clock.snapshot()
+    same, child_a, child_b = clock.fork(), clock.fork(independent=True), clock.fork(independent=True)
+    ahead = clock.advance(50, 1.0)
+    assert np.array_equal(same.advance(50, 1.0), ahead)
+    clock.restore(snap)
+    assert np.array_equal(clock.advance(50, 1.0), ahead)
+    a, b = child_a.advance(50, 1.0), child_b.advance(50, 1.0)
+    assert not np.array_equal(a, ahead) and not np.array_equal(a, b)
+
+
+def test_branches_continue_warmup() -> None:
+    full = run_clocks(_branch_clocks(), duration=300.0, dt=1.0)
+    res = run_branches(_branch_clocks(), warmup=200.0, duration=100.0, dt=1.0, branches=2, n_workers=0)
+    for key in full:
+        assert np.array_equal(res.warmup[key], full[key][:201])
+        for branch in res.branches:
+            assert np.array_equal(branch[key], full[key][200:])
+
+    serial = run_branches(_branch_clocks(), 200.0, 100.0, 1.0, branches=3, independent=True, n_workers=0)
+    pooled = run_branches(_branch_clocks(), 200.0, 100.0, 1.0, branches=3, independent=True, n_workers=2)
+    for s_ts, p_ts in zip(serial.branches, pooled.branches):
+        for key in s_ts:
+            assert np.array_equal(s_ts[key], p_ts[key])
+    assert not np.array_equal(serial.branches[0]["clock_1"], serial.branches[1]["clock_1"])
+
+    custom = run_branches([_DriftClock()], 10.0, 5.0, 1.0, branches=2, n_workers=0)
+    assert np.array_equal(custom.branches[0]["clock_0"], custom.branches[1]["clock_0"])
+    drift = _DriftClock()
+    with pytest.raises(ValueError, match="fork_streams"):
+        drift.fork(independent=True)
+    assert drift.fork().read_time() == drift.read_time()
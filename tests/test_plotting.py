@@ -0,0 +1,37 @@
+"""Min/max decimation and headless plotting of long traces."""
+from __future__ import annotations
+
+import numpy as np
+
+from src.analysis import decimate_minmax, iter_run_clocks, plot_adev_with_uncertainties, plot_comparison
+from src.clocks.ensemble import ClockEnsemble
+from src.clocks.ideal import IdealClock
+from src.clocks.noisy import NoisyOscillatorClock
+from src.offsets import OffsetTrace
+
+
+def test_decimate_minmax_keeps_extremes_for_any_chunking(tmp_path) -> None:
+    n = 100_003
+    x = np.cumsum(np.random.default_rng(0).normal(size=n))
+    np.save(tmp_path / "x.npy", np.vstack([np.arange(n) * 1e-3, x]))
+    data = np.load(tmp_path / "x.npy", mmap_mode="r")
+
+    t_d, x_d = decimate_minmax(data[0], data[1], max_points=1000, chunk_size=4096)
+    assert 500 <= t_d.size <= 1000 and np.all(np.diff(t_d) >= 0)
+    assert x_d.max() == x.max() and x_d.min() == x.min()
+    assert t_d[0] == 0.0 and x_d[-1] == x[-1]
+    same = decimate_minmax(data[0], OffsetTrace(x), max_points=1000, chunk_size=777)
+    assert np.array_equal(same[0], t_d) and np.array_equal(same[1], x_d)
+    short = decimate_minmax(np.arange(10.0), x[:10])
+    assert np.array_equal(short[1], x[:10])
+
+
+def test_plots_render_to_files(tmp_path) -> None:
+    clocks = [IdealClock(), NoisyOscillatorClock(sigma_y=1e-11, seed=1), ClockEnsemble(NoisyOscillatorClock, 2, seed=2)]
+    plot_comparison(iter_run_clocks(clocks, 20.0, 1e-3, chunk_size=3000), max_points=500, path=tmp_path / "cmp.png")
+    t = np.arange(50_000) * 1e-3
+    plot_comparison({"time": t, "clock_0": t, "clock_1": t + 1e-9 * np.sin(t)}, path=tmp_path / "cmp.svg")
+    plot_adev_with_uncertainties([1.0, 10.0], [1e-11, 3e-12], [1e-12, 3e-13], path=tmp_path / "adev.png")
+    assert (tmp_path / "cmp.png").read_bytes()[:4] == b"\x89PNG"
+    assert b"<svg" in (tmp_path / "cmp.svg").read_bytes()[:500]
+    assert (tmp_path / "adev.png").stat().st_size > 0
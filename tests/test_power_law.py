@@ -0,0 +1,46 @@
+"""Kasdin-Walter power-law noise clock."""
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from src.clocks.power_law import PowerLawNoiseClock, _white_variance, power_law_noise
+from src.stability import oadev
+
+
+@pytest.mark.parametrize("alpha", [-2.0, -1.5, -1.0, 0.0, 1.0, 2.0])
+def test_block_splits_and_forks_are_consistent(alpha) -> None:
+    whole = PowerLawNoiseClock(1e-22, alpha, seed=1, block_size=256)
+    split = PowerLawNoiseClock(1e-22, alpha, seed=1, block_size=256)
+    ref = whole.advance(1000, 1.0)
+    parts = [split.advance(n, 1.0) for n in (1, 255, 1, 300)]
+    for _ in range(443):
+        split.tick(1.0)
+        parts.append([split.read_time()])
+    assert np.array_equal(ref, np.concatenate(parts))
+
+    snap = whole.snapshot()
+    same, indep = whole.fork(), whole.fork(independent=True)
+    ahead = whole.advance(400, 1.0)
+    assert np.array_equal(same.advance(400, 1.0), ahead)
+    assert not np.array_equal(indep.advance(400, 1.0), ahead)
+    whole.restore(snap)
+    assert np.array_equal(whole.advance(400, 1.0), ahead)
+
+
+@pytest.mark.parametrize(
+    "alpha, h, adev2",
+    [
+        (0.0, 1e-22, lambda tau: 1e-22 / (2.0 * tau)),
+        (-1.0, 1e-26, lambda tau: 2.0 * np.log(2.0) * 1e-26 + 0.0 * tau),
+        (-2.0, 1e-30, lambda tau: 2.0 * np.pi**2 / 3.0 * 1e-30 * tau),
+    ],
+)
+def test_allan_deviation_matches_h_alpha(alpha, h, adev2) -> None:
+    taus = [10.0, 100.0, 1000.0]
+    whole = power_law_noise(1 << 18, alpha, h, dt=1.0, seed=3)
+    clock = PowerLawNoiseClock(h, alpha, seed=4, block_size=1 << 14)
+    streamed = clock._unit_noise(1 << 18) * np.sqrt(_white_variance(h, alpha, 1.0))
+    for y in (whole, streamed):
+        t, dev, _ = oadev(y, 1.0, taus=taus)
+        assert np.allclose(dev / np.sqrt(adev2(t)), 1.0, atol=0.15)
@@ -0,0 +1,62 @@
+"""Memoizing TimeSeries container: identical results, cache reuse and budget."""
+from __future__ import annotations
+
+import numpy as np
+
+from src.analysis import (
+    compare_clocks,
+    consensus_weighted_average,
+    fractional_frequency_from_time,
+    pairwise_metrics,
+    run_clocks,
+)
+from src.clocks.ideal import IdealClock
+from src.clocks.noisy import NoisyOscillatorClock
+from src.clocks.random_walk import RandomWalkFreqClock
+from src.series import TimeSeries
+
+KEYS = ["clock_1", "clock_2", "clock_3"]
+
+
+def _make_clocks():
+    return [
+        IdealClock(),
+        NoisyOscillatorClock(sigma_y=1e-11, seed=1),
+        RandomWalkFreqClock(sigma_rw=1e-13, seed=2),
+        NoisyOscillatorClock(sigma_y=3e-11, seed=3),
+    ]
+
+
+def test_time_series_matches_plain_dict_and_reuses_intermediates() -> None:
+    for representation in ("elapsed", "offset"):
+        d = run_clocks(_make_clocks(), 200.0, 1e-2, representation=representation)
+        ts = TimeSeries(d)
+        for method in ("inv_var_frac", "inv_oadev_tau", "n_cornered_hat"):
+            plain = consensus_weighted_average(d, KEYS, method=method, tau=1.0)
+            memo = consensus_weighted_average(ts, KEYS, method=method, tau=1.0)
+            assert plain["weights"] == memo["weights"]
+        assert compare_clocks(d["time"], d["clock_1"], d["clock_2"]) == compare_clocks(ts, "clock_1", "clock_2")
+        y = fractional_frequency_from_time(d["time"], d["clock_1"], dt=1e-2)
+        assert np.array_equal(y, fractional_frequency_from_time(ts, "clock_1", dt=1e-2))
+        plain, memo = pairwise_metrics(d["time"], d), pairwise_metrics(ts)
+        assert all(np.array_equal(plain[k], memo[k]) for k in plain)
+
+        misses = ts.misses
+        consensus_weighted_average(ts, KEYS, method="inv_var_frac")
+        ts.stability(KEYS, taus=[0.1, 1.0, 10.0], kinds=("oadev", "mdev"))
+        taus, dev, _ = ts.stability(KEYS, taus=[2.0], kinds=("oadev",))["oadev"]
+        assert dev.shape == (3, 1) and ts.misses == misses + len(KEYS)  # only the mdev prefix sums are new
+
+
+def test_cache_budget_evicts_least_recently_used() -> None:
+    d = run_clocks(_make_clocks(), 100.0, 1e-2)
+    entry = d["time"].nbytes
+    ts = TimeSeries(d, max_bytes=2 * entry)
+    for k in KEYS:
+        ts.time_error(k)
+    assert ts.cache_bytes <= 2 * entry and ts.cache_info()["entries"] == 2
+    hits = ts.hits
+    ts.time_error("clock_3")
+    ts.time_error("clock_1")
+    assert ts.hits == hits + 1
+    assert np.array_equal(ts.time_error("clock_1"), d["clock_1"] - d["time"])
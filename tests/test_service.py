@@ -0,0 +1,44 @@
+"""Asyncio clock service: snapshots, protocol and load-test client."""
+from __future__ import annotations
+
+import asyncio
+
+import numpy as np
+
+from src.clocks.ensemble import ClockEnsemble
+from src.clocks.ideal import IdealClock
+from src.clocks.noisy import NoisyOscillatorClock
+from src.service import ClockService, connect, load_clients, read_snapshot
+
+
+def _make_clocks():
+    return [IdealClock(), NoisyOscillatorClock(sigma_y=1e-11, seed=1), ClockEnsemble(NoisyOscillatorClock, 2, seed=2)]
+
+
+def test_service_serves_advancing_snapshots() -> None:
+    async def scenario():
+        async with ClockService(_make_clocks(), dt=1e-3, tick_interval=0.005, speed=10.0) as service:
+            await asyncio.sleep(0.1)
+            first = await read_snapshot(service.address)
+            await asyncio.sleep(0.1)
+            second = await read_snapshot(service.address)
+            reader, writer = await connect(service.address)
+            writer.write(b"bogus\nread\nquit\n")
+            replies = [await reader.readline() for _ in range(2)]
+            writer.close()
+            await writer.wait_closed()
+            stats = await load_clients(service.address, 20, 5)
+        return first, second, replies, stats
+
+    first, second, replies, stats = asyncio.run(scenario())
+    assert 0 < first["step"] < second["step"]
+    assert b"error" in replies[0] and b"readings" in replies[1]
+    assert stats["reads"] == 100 and stats["p50_us"] <= stats["p99_us"]
+
+    # readings are exactly those of the clocks stepped to the published step
+    ref = _make_clocks()
+    for c in ref:
+        c.advance(second["step"], 1e-3)
+    assert second["readings"][1] == ref[1].read_time()
+    assert second["readings"][2] == ref[2].read_time().tolist()
+    assert np.isclose(second["time_s"], second["step"] * 1e-3)
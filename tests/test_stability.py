@@ -0,0 +1,69 @@
+"""Native stability engine validated against allantools."""
+from __future__ import annotations
+
+import allantools as at
+import numpy as np
+
+from src.analysis import consensus_weighted_average, run_clocks
+from src.clocks.flicker_like import FlickerLikeFreqClock
+from src.clocks.noisy import NoisyOscillatorClock
+from src.clocks.random_walk import RandomWalkFreqClock
+from src.stability import OnlineAllanDeviation, detrended_phase, oadev, phase_prefix_sum, stability, stability_from_phase
+
+REFERENCE = {"oadev": at.oadev, "mdev": at.mdev, "tdev": at.tdev, "ohdev": at.ohdev}
+
+
+def test_matches_allantools_for_freq_and_phase() -> None:
+    rng = np.random.default_rng(0)
+    y = np.vstack([rng.normal(0.0, 1e-11, 4000), np.cumsum(rng.normal(0.0, 1e-14, 4000))])
+    x = np.cumsum(rng.normal(0.0, 1e-11, 4000)) + 1e-9 * np.arange(4000)
+    for taus in (None, [0.5, 1.5, 10.0, 200.0, 1000.0]):
+        got_y = stability(y, 0.5, taus)
+        got_x = stability(x, 0.5, taus, data_type="phase")
+        for kind, fn in REFERENCE.items():
+            ref_taus = None if taus is None else np.asarray(taus)
+            taus_s, dev, err = got_y[kind]
+            for i, row in enumerate(y):
+                ref = fn(row, rate=2.0, data_type="freq", taus=ref_taus)
+                assert np.allclose(taus_s, ref[0]), kind
+                assert np.allclose(dev[i], ref[1], rtol=1e-8, atol=0.0), kind
+                assert np.allclose(err[i], ref[2], rtol=1e-8, atol=0.0), kind
+            ref = fn(x, rate=2.0, data_type="phase", taus=ref_taus)
+            assert np.allclose(got_x[kind][1], ref[1], rtol=1e-8, atol=0.0), kind
+
+    # the public phase helpers reproduce stability() exactly
+    phase = detrended_phase(y, 0.5, "freq")
+    split = stability_from_phase(phase, phase_prefix_sum(phase), 0.5, None)
+    whole = stability(y, 0.5)
+    assert all(np.array_equal(split[k][1], whole[k][1]) for k in REFERENCE)
+
+
+def test_inv_oadev_tau_weights_match_allantools() -> None:
+    clocks = [
+        NoisyOscillatorClock(sigma_y=1e-11, seed=1),
+        RandomWalkFreqClock(sigma_rw=2e-14, seed=2),
+        FlickerLikeFreqClock(sigma_w=5e-12, a=1e-3, seed=3),
+    ]
+    ts = run_clocks(clocks, duration=500.0, dt=1.0)
+    keys = ["clock_1", "clock_2"]
+    cons = consensus_weighted_average(ts, keys, method="inv_oadev_tau", tau=10.0)
+    for key, sigma in zip(keys, cons["detail"]["sigma_y_tau"]):
+        y = np.diff(ts[key]) - 1.0
+        ref = at.oadev(y, rate=1.0, data_type="freq", taus=np.array([10.0]))[1][0]
+        assert np.isclose(sigma, ref, rtol=1e-8, atol=0.0)
+
+
+def test_online_adev_is_chunking_invariant() -> None:
+    rng = np.random.default_rng(1)
+    y = rng.normal(1e-9, 1e-11, (3, 5000))
+    ref = oadev(y, 0.5, taus=0.5 * 2.0 ** np.arange(10))
+    whole = OnlineAllanDeviation(dt=0.5, max_tau=0.5 * 2 ** 9)
+    whole.update(y)
+    pieces = OnlineAllanDeviation(dt=0.5, max_tau=0.5 * 2 ** 9)
+    for chunk in np.array_split(y, 41, axis=-1):
+        pieces.update(chunk)
+    for est in (whole, pieces):
+        taus_s, dev, err = est.result()
+        assert np.allclose(taus_s, ref[0])
+        assert np.allclose(dev, ref[1], rtol=1e-12, atol=0.0)
+        assert np.allclose(err, ref[2], rtol=1e-12, atol=0.0)
@@ -0,0 +1,77 @@
+"""Memory-mapped run directories with checkpoint/resume."""
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from src.analysis import compare_clocks, run_clocks
+from src.clocks.ensemble import ClockEnsemble
+from src.clocks.flicker_like import FlickerLikeFreqClock
+from src.clocks.ideal import IdealClock
+from src.clocks.noisy import NoisyOscillatorClock
+from src.clocks.random_walk import RandomWalkFreqClock
+from src.storage import open_run, run_clocks_to_disk, run_info
+
+
+class _Interrupted(RuntimeError):
+    pass
+
+
+class _CrashingRandomWalk(RandomWalkFreqClock):
+    """Raises after a number of advance() calls, like a killed job."""
+
+    def __init__(self, crash_after, **kwargs):
+        super().__init__(**kwargs)
+        self._calls_left = crash_after
+
+    def advance(self, n_steps, dt):
+        if self._calls_left == 0:
+            raise _Interrupted()
+        self._calls_left -= 1
+        return super().advance(n_steps, dt)
+
+
+def _make_clocks(rw=None):
+    return [
+        IdealClock(),
+        NoisyOscillatorClock(sigma_y=1e-11, seed=1),
+        rw or RandomWalkFreqClock(sigma_rw=2e-14, seed=2),
+        FlickerLikeFreqClock(sigma_w=5e-12, a=1e-2, seed=3, rng="counter"),
+        ClockEnsemble("NoisyOscillatorClock", 3, seed=4, sigma_y=1e-11),
+    ]
+
+
+def test_resume_after_interrupt_is_bit_identical(tmp_path):
+    run_dir = str(tmp_path / "run")
+    crashing = _CrashingRandomWalk(crash_after=7, sigma_rw=2e-14, seed=2)
+    with pytest.raises(_Interrupted):
+        run_clocks_to_disk(_make_clocks(crashing), 5000.0, 1.0, run_dir, checkpoint_every=300)
+    info = run_info(run_dir)
+    assert not info["complete"] and 0 < info["checkpoint_samples"] < 5001
+    assert (tmp_path / "run" / "checkpoint.npz").exists() and not list((tmp_path / "run").glob("*.pkl"))
+
+    clocks = _make_clocks()
+    ts = run_clocks_to_disk(clocks, 5000.0, 1.0, run_dir, checkpoint_every=300)
+    ref_clocks = _make_clocks()
+    ref = run_clocks(ref_clocks, 5000.0, 1.0)
+    for key in ref:
+        assert isinstance(ts[key], np.memmap)
+        assert np.array_equal(ts[key], ref[key])
+    assert run_info(run_dir)["complete"]
+    for c, r in zip(clocks, ref_clocks):
+        assert np.array_equal(np.asarray(c.advance(5, 1.0)), np.asarray(r.advance(5, 1.0)))
+
+    # analysis reads the mapped arrays directly
+    again = open_run(run_dir)
+    assert compare_clocks(again["time"], again["clock_0"], again["clock_1"]) == compare_clocks(
+        ref["time"], ref["clock_0"], ref["clock_1"]
+    )
+
+
+def test_resume_rejects_different_run(tmp_path):
+    run_dir = str(tmp_path / "run")
+    run_clocks_to_disk(_make_clocks(), 100.0, 1.0, run_dir)
+    with pytest.raises(ValueError):
+        run_clocks_to_disk(_make_clocks(), 200.0, 1.0, run_dir)
+    ts = run_clocks_to_disk(_make_clocks(), 200.0, 1.0, run_dir, resume=False)
+    assert ts["time"].shape == (201,)
@@ -0,0 +1,63 @@
+"""Chunked run_clocks stream and its one-pass consumers."""
+from __future__ import annotations
+
+import numpy as np
+
+from src.analysis import (
+    compare_clocks,
+    compare_clocks_chunks,
+    concatenate_chunks,
+    consensus_weighted_average,
+    consensus_weights_chunks,
+    fractional_frequency_from_time,
+    iter_consensus,
+    iter_fractional_frequency,
+    iter_run_clocks,
+    run_clocks,
+)
+from src.clocks.flicker_like import FlickerLikeFreqClock
+from src.clocks.ideal import IdealClock
+from src.clocks.noisy import NoisyOscillatorClock
+from src.clocks.random_walk import RandomWalkFreqClock
+
+KEYS = ["clock_1", "clock_2", "clock_3"]
+
+
+def _make_clocks():
+    return [
+        IdealClock(),
+        NoisyOscillatorClock(sigma_y=1e-11, seed=1),
+        RandomWalkFreqClock(sigma_rw=2e-14, seed=2),
+        FlickerLikeFreqClock(sigma_w=5e-12, a=1e-3, seed=3),
+    ]
+
+
+def _chunks():
+    return iter_run_clocks(_make_clocks(), duration=100.0, dt=0.1, chunk_size=97)
+
+
+def test_chunks_concatenate_to_run_clocks() -> None:
+    ts = run_clocks(_make_clocks(), duration=100.0, dt=0.1)
+    joined = concatenate_chunks(_chunks())
+    assert joined.keys() == ts.keys()
+    for key in ts:
+        assert np.array_equal(joined[key], ts[key]), key
+    assert np.array_equal(ts["time"], np.linspace(0.0, 100.0, 1001))
+
+
+def test_chunk_consumers_match_in_memory_versions() -> None:
+    ts = run_clocks(_make_clocks(), duration=100.0, dt=0.1)
+
+    ref = compare_clocks(ts["time"], ts["clock_0"], ts["clock_2"])
+    got = compare_clocks_chunks(_chunks(), "clock_0", "clock_2")
+    for key in ref:
+        assert np.isclose(got[key], ref[key], rtol=1e-9, atol=0.0), key
+
+    y = np.concatenate(list(iter_fractional_frequency(_chunks(), "clock_1", dt=0.1)))
+    assert np.array_equal(y, fractional_frequency_from_time(ts["time"], ts["clock_1"], dt=0.1))
+
+    cons = consensus_weighted_average(ts, KEYS)
+    w = consensus_weights_chunks(_chunks(), KEYS)["weights"]
+    assert np.allclose(w, cons["weights"], rtol=1e-9, atol=0.0)
+    series = np.concatenate([c["consensus"] for c in iter_consensus(_chunks(), KEYS, cons["weights"])])
+    assert np.array_equal(series, cons["consensus"])